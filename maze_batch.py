@@ -0,0 +1,110 @@
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from maze_model import MazeModel, ALGORITHMS
+
+try:
+    import resource
+except ImportError:          # Not available on Windows
+    resource = None
+
+# Batch generate-and-solve driver. Jobs are (size, density, seed) triples spread
+# across a process pool; one JSON object per job is written in job order, so the
+# output for a given job list is the same whatever the worker count (apart from
+# the timings). Example:
+#   python maze_batch.py --sizes 101 201 --densities 0 0.1 --seeds 0-999 -o results.jsonl
+
+
+def run_job(job, algorithm="a_star", trace_memory=False):
+    # Generate and solve one maze; returns the result record
+    # worker_peak_rss_kb is the peak resident size of the process that ran the
+    # job over its whole life so far (None where resource is missing), not this
+    # job's own; trace_memory adds the job's peak Python allocations
+    size, density, seed = job
+    model = MazeModel()
+    if trace_memory:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    model.generate_maze(size, size, density, seed=seed)
+    generate_time = time.perf_counter() - start_time
+    path = model.solve(algorithm)
+    record = {
+        "size": size,
+        "density": density,
+        "seed": seed,
+        "algorithm": algorithm,
+        "generate_seconds": generate_time,
+        "solve_seconds": model.time,
+        "iterations": model.iterations,
+        "path_length": len(path) if path else 0,
+        "worker_peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+    }
+    if trace_memory:
+        record["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return record
+
+
+def _run_job(args):
+    # Pool entry point: imap passes a single argument
+    return run_job(*args)
+
+
+def make_jobs(sizes, densities, seeds):
+    # Every (size, density, seed) combination, seeds varying fastest
+    return [(size, density, seed) for size in sizes for density in densities for seed in seeds]
+
+
+def run_batch(jobs, algorithm="a_star", workers=None, chunksize=None, trace_memory=False):
+    # Yield result records in job order, solving on up to workers processes
+    # Jobs are handed out in chunks so the per-task pickling overhead stays small
+    # next to the work, while still leaving several chunks per worker to balance
+    workers = workers or multiprocessing.cpu_count()
+    tasks = [(job, algorithm, trace_memory) for job in jobs]
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _run_job(task)
+        return
+    if chunksize is None:
+        chunksize = max(1, len(tasks) // (workers * 8))
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(_run_job, tasks, chunksize)
+
+
+def parse_seeds(values):
+    # Seeds are given as numbers or inclusive ranges like 0-999
+    seeds = []
+    for value in values:
+        first, _, last = value.partition("-")
+        seeds.extend(range(int(first), int(last or first) + 1))
+    return seeds
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Generate and solve mazes in bulk, writing JSONL results")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[101])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--seeds", nargs="+", default=["0-99"], help="seeds or inclusive ranges, e.g. 0-999")
+    parser.add_argument("--algorithm", choices=sorted(ALGORITHMS.values()), default="a_star")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--chunksize", type=int, default=None)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="also report tracemalloc peaks (slows the timings)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    jobs = make_jobs(args.sizes, args.densities, parse_seeds(args.seeds))
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for record in run_batch(jobs, args.algorithm, args.workers, args.chunksize, args.trace_memory):
+            out.write(json.dumps(record) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
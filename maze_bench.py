@@ -0,0 +1,395 @@
+import heapq
+import json
+import platform
+import sys
+import time
+from statistics import median
+import maze_search
+import maze_cache
+import maze_junctions
+import maze_routing
+from maze_grid import Grid, PATH, WALL
+from maze_model import MazeModel
+
+# Benchmarks for the maze solvers. Run directly:
+#   python maze_bench.py [size] [trials]        reference A* vs the engine
+#   python maze_bench.py suite [options]        seeded corpus, regression gate
+#   python maze_bench.py route [options]        multi-checkpoint routing
+# The suite times generation and solving separately with perf_counter, after a
+# warmup, keeping the best of several repeats. --save-baseline writes the
+# results to a JSON file; --baseline compares against one and exits with
+# status 1 if any solver's throughput fell by more than --threshold. --cache
+# also times replaying each solve from a maze_cache.SolutionCache.
+
+# Solver engines by MazeModel method name
+ENGINES = {
+    "a_star": maze_search.AStarSearch,
+    "jump_point_search": maze_search.JumpPointSearch,
+    "bidirectional": maze_search.BidirectionalSearch,
+    "junction_search": maze_junctions.JunctionSearch,
+}
+
+
+# SearchStats counters reported per suite case
+COUNTERS = ("expanded", "pushes", "pops", "stale_pops", "neighbor_checks", "peak_frontier")
+
+
+# Hand-built corpora, written as MazeModel methods (see test_maze_solver.py)
+def generate_best_case_maze(self, rows, cols):
+    # Open room with a walled border; start and end sit on the border corners
+    maze = Grid(rows, cols, PATH)
+    for r in (0, rows - 1):
+        maze.cells[r * cols:(r + 1) * cols] = bytes([WALL]) * cols
+    for r in range(rows):
+        maze.set(r, 0, WALL)
+        maze.set(r, cols - 1, WALL)
+    self.maze = maze
+    self.start = (0, 0)
+    self.end = (rows-1, cols-1)
+    self.path = []
+    self.visited = set()
+
+
+def generate_worst_case_maze(self, rows, cols):
+    # Concentric rings with the end in the centre
+    if rows % 2 == 0: rows += 1
+    if cols % 2 == 0: cols += 1
+    maze = [[1 for _ in range(cols)] for _ in range(rows)]
+    for i in range(min(rows, cols) // 2):
+        for j in range(i, cols - i): maze[i][j] = 0
+        for j in range(i, cols - i): maze[rows-1-i][j] = 0
+        for j in range(i, rows - i): maze[j][i] = 0
+        for j in range(i, rows - i): maze[j][cols-1-i] = 0
+    center_x, center_y = rows // 2, cols // 2
+    maze[center_x][center_y] = 0
+    self.maze = Grid.from_rows(maze)
+    self.start = (0, 0)
+    self.end = (center_x, center_y)
+    self.path = []
+    self.visited = set()
+
+
+def generate_unsolvable_maze(self, rows, cols, seed=None):
+    # A normal maze with the end cell walled in
+    self.generate_maze(rows, cols, 0.1, seed=seed)
+    self.maze.set(self.end[0], self.end[1], WALL)
+
+
+def generate_blocked_maze(self, rows, cols):
+    # Nothing but walls between start and end
+    self.maze = Grid(rows, cols)
+    self.maze.set(0, 0, PATH)
+    self.maze.set(rows-1, cols-1, PATH)
+    self.start = (0, 0)
+    self.end = (rows-1, cols-1)
+    self.path = []
+    self.visited = set()
+
+
+# Suite corpus: (name, generator, size, density, seeds). Only generate_maze and
+# generate_unsolvable_maze use the seed; the others are fixed shapes.
+SUITE = [
+    ("random", "generate_maze", 101, 0.1, range(5)),
+    ("random-large", "generate_maze", 301, 0.1, range(3)),
+    ("open", "generate_maze", 301, 0.5, range(3)),
+    ("best", "generate_best_case_maze", 101, 0.0, range(1)),
+    ("spiral", "generate_worst_case_maze", 101, 0.0, range(1)),
+    ("unsolvable", "generate_unsolvable_maze", 101, 0.0, range(3)),
+    ("blocked", "generate_blocked_maze", 101, 0.0, range(1)),
+]
+QUICK_SUITE = [(name, gen, min(size, 41), density, seeds) for name, gen, size, density, seeds in SUITE]
+
+GENERATORS = {
+    "generate_best_case_maze": generate_best_case_maze,
+    "generate_worst_case_maze": generate_worst_case_maze,
+    "generate_unsolvable_maze": generate_unsolvable_maze,
+    "generate_blocked_maze": generate_blocked_maze,
+}
+
+
+def reference_a_star(grid, start, end):
+    # The original tuple/dict based A*, kept as the baseline for comparisons
+    # Returns (path length, iterations) the way MazeModel.a_star counted them
+    def heuristic(a, b):
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    cells, cols = grid.cells, grid.cols
+    visited = set()
+    iterations = 0
+    queue = [(0, start)]
+    g_score = {start: 0}
+    f_score = {start: heuristic(start, end)}
+    came_from = {}
+    while queue:
+        current = heapq.heappop(queue)[1]
+        if current == end:
+            length = 1
+            while current in came_from:
+                length += 1
+                current = came_from[current]
+            return length, iterations
+        visited.add(current)
+        iterations += 1
+        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+            neighbor = (current[0] + dx, current[1] + dy)
+            if (0 <= neighbor[0] < len(grid) and
+                0 <= neighbor[1] < len(grid[0]) and
+                cells[neighbor[0] * cols + neighbor[1]] == PATH and
+                neighbor not in visited):
+                tentative_g = g_score[current] + 1
+                if neighbor not in g_score or tentative_g < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g
+                    f_score[neighbor] = tentative_g + heuristic(neighbor, end)
+                    heapq.heappush(queue, (f_score[neighbor], neighbor))
+    return 0, iterations
+
+
+def bench_astar(size=1001, trials=3, density=0.1):
+    # Time the reference A* against the flat-index engine on the same mazes
+    # Returns a list of (seed, reference seconds, engine seconds, path length)
+    results = []
+    model = MazeModel()
+    for seed in range(trials):
+        model.generate_maze(size, size, density, seed=seed)
+        grid = model.maze
+
+        start_time = time.perf_counter()
+        ref_length, _ = reference_a_star(grid, model.start, model.end)
+        ref_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        path = maze_search.AStarSearch(grid, grid.index(model.start), grid.index(model.end)).run()
+        engine_time = time.perf_counter() - start_time
+
+        length = len(path) if path else 0
+        if length != ref_length:
+            raise AssertionError(f"seed {seed}: engine path {length} != reference {ref_length}")
+        results.append((seed, ref_time, engine_time, length))
+    return results
+
+
+def bench_routing(size=301, checkpoints=8, trials=3, density=0.1, workers=None):
+    # Time the pairwise distances of a multi-checkpoint route as one A* per
+    # pair against maze_routing's multi-target BFS matrix, then the whole
+    # MazeModel.multi_goal solve. Checkpoints are random open cells drawn
+    # from the seed. Returns a list of (seed, A* pairs seconds, matrix
+    # seconds, route seconds, route length)
+    import random
+    results = []
+    model = MazeModel()
+    model.route_workers = workers
+    for seed in range(trials):
+        model.generate_maze(size, size, density, seed=seed)
+        grid = model.maze
+        open_cells = [grid.cell(index) for index, value in enumerate(grid.cells) if value == PATH]
+        model.checkpoints = random.Random(seed).sample(open_cells[1:-1], checkpoints)
+        nodes = [grid.index(cell) for cell in [model.start] + model.checkpoints + [model.end]]
+
+        start_time = time.perf_counter()
+        pairs = {}
+        for i, a in enumerate(nodes):
+            for b in nodes[i + 1:]:
+                path = maze_search.AStarSearch(grid, a, b).run()
+                pairs[a, b] = len(path) - 1 if path else -1
+        pairs_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        matrix = maze_routing.distance_matrix(grid, nodes, workers)
+        matrix_time = time.perf_counter() - start_time
+        for i, a in enumerate(nodes):
+            for j, b in enumerate(nodes[i + 1:], i + 1):
+                if matrix[i][j] != pairs[a, b]:
+                    raise AssertionError(f"seed {seed}: BFS distance {matrix[i][j]} != A* {pairs[a, b]}")
+
+        start_time = time.perf_counter()
+        path = model.solve("multi_goal")
+        route_time = time.perf_counter() - start_time
+        results.append((seed, pairs_time, matrix_time, route_time, len(path) - 1 if path else -1))
+    return results
+
+
+def route_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="maze_bench.py route", description="Multi-checkpoint routing benchmark")
+    parser.add_argument("--size", type=int, default=301)
+    parser.add_argument("--checkpoints", type=int, default=8)
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=None, help="processes for the matrix (default: automatic)")
+    args = parser.parse_args(argv)
+    print(f"Routing through {args.checkpoints} checkpoints on {args.size}x{args.size} mazes")
+    for seed, pairs_time, matrix_time, route_time, length in bench_routing(
+            args.size, args.checkpoints, args.trials, args.density, args.workers):
+        print(f"seed {seed}: A* pairs={pairs_time:.3f}s BFS matrix={matrix_time:.3f}s "
+              f"speed-up={pairs_time / matrix_time:.2f}x route={route_time:.3f}s length={length}")
+    return 0
+
+
+def generate(model, generator, size, density, seed):
+    # Build one corpus maze into model
+    if generator == "generate_maze":
+        model.generate_maze(size, size, density, seed=seed)
+    elif generator == "generate_unsolvable_maze":
+        generate_unsolvable_maze(model, size, size, seed)
+    else:
+        GENERATORS[generator](model, size, size)
+
+
+def best_time(func, warmup=1, repeats=5, min_seconds=0.005):
+    # Best and median perf_counter time of one func() call over repeats, after
+    # warmup untimed calls. Each repeat loops func enough times to last at least
+    # min_seconds, so microsecond cases are not lost in timer noise.
+    for _ in range(warmup):
+        func()
+    number = 1
+    while True:
+        start_time = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start_time
+        if elapsed >= min_seconds:
+            break
+        number *= 10 if elapsed < min_seconds / 10 else 2
+    times = [elapsed / number]
+    for _ in range(repeats - 1):
+        start_time = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - start_time) / number)
+    return min(times), median(times)
+
+
+def run_suite(suite=SUITE, algorithms=tuple(ENGINES), warmup=1, repeats=5, trace_memory=False, cache=None):
+    # Time every case of the suite; returns {"case/algorithm": result} where
+    # throughput is the number of corpus mazes solved per second (best times).
+    # Search counters are summed over the corpus (peak_frontier and peak_memory
+    # are maxima) and come from a separate run, so they do not skew the timings.
+    # With a SolutionCache, cached_seconds is the time to replay the corpus from
+    # it through MazeModel.solve and cache_hits the hits that took.
+    results = {}
+    model = MazeModel()
+    for name, generator, size, density, seeds in suite:
+        mazes = []
+        generate_total = 0.0
+        for seed in seeds:
+            generate_best, _ = best_time(lambda: generate(model, generator, size, density, seed), 0, repeats, 0)
+            generate_total += generate_best
+            grid = model.maze
+            mazes.append((grid, grid.index(model.start), grid.index(model.end)))
+        for algorithm in algorithms:
+            engine = ENGINES[algorithm]
+            best_total = median_total = 0.0
+            path_cells = 0
+            counters = dict.fromkeys(COUNTERS, 0)
+            cached_total = 0.0
+            hits = cache.hits if cache is not None else 0
+            for grid, start, end in mazes:
+                best, middle = best_time(lambda: engine(grid, start, end).run(), warmup, repeats)
+                best_total += best
+                median_total += middle
+                # One more, untimed, instrumented run for the search counters
+                stats = maze_search.SearchStats(trace_memory)
+                path = engine(grid, start, end, stats).run()
+                path_cells += len(path) if path else 0
+                for counter in COUNTERS:
+                    counters[counter] += getattr(stats, counter)
+                counters["peak_frontier"] = max(counters["peak_frontier"], stats.peak_frontier)
+                if trace_memory:
+                    counters["peak_memory"] = max(counters.get("peak_memory", 0), stats.peak_memory)
+                if cache is not None:
+                    replay = MazeModel()
+                    replay.cache = cache
+                    replay.maze, replay.start, replay.end = grid, grid.cell(start), grid.cell(end)
+                    replay.solve(algorithm)  # Fills the cache unless an earlier run did
+                    best, _ = best_time(lambda: replay.solve(algorithm), 0, repeats)
+                    cached_total += best
+            if cache is not None:
+                counters["cached_seconds"] = cached_total
+                counters["cache_hits"] = cache.hits - hits
+            results[f"{name}/{algorithm}"] = {
+                "size": size,
+                "mazes": len(mazes),
+                "generate_seconds": generate_total,
+                "solve_seconds": best_total,
+                "solve_median_seconds": median_total,
+                "path_cells": path_cells,
+                "throughput": len(mazes) / best_total if best_total else float("inf"),
+                **counters,
+            }
+    return results
+
+
+def save_baseline(path, results):
+    with open(path, "w") as f:
+        json.dump({"python": platform.python_version(), "results": results}, f, indent=1, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(results, baseline, threshold=0.1):
+    # Cases whose throughput dropped by more than threshold (a fraction) against
+    # the baseline, as (key, baseline throughput, current throughput)
+    regressions = []
+    for key, result in results.items():
+        if key in baseline:
+            before = baseline[key]["throughput"]
+            if result["throughput"] < before * (1 - threshold):
+                regressions.append((key, before, result["throughput"]))
+    return regressions
+
+
+def suite_main(argv):
+    import argparse
+    parser = argparse.ArgumentParser(prog="maze_bench.py suite", description="Seeded solver benchmark suite")
+    parser.add_argument("--baseline", help="compare against this baseline file")
+    parser.add_argument("--save-baseline", help="write the results to this baseline file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed throughput drop (default 0.1)")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--algorithms", nargs="+", choices=sorted(ENGINES), default=list(ENGINES))
+    parser.add_argument("--quick", action="store_true", help="small mazes only")
+    parser.add_argument("--memory", action="store_true", help="also report peak traced memory per case")
+    parser.add_argument("--cache", action="store_true", help="also time replaying each solve from a SolutionCache")
+    parser.add_argument("--cache-dir", help="disk tier for --cache (kept between runs)")
+    args = parser.parse_args(argv)
+
+    cache = maze_cache.SolutionCache(directory=args.cache_dir) if args.cache or args.cache_dir else None
+    results = run_suite(QUICK_SUITE if args.quick else SUITE, args.algorithms, args.warmup, args.repeats,
+                        args.memory, cache)
+    for key, result in results.items():
+        extra = f" mem={result['peak_memory']}B" if args.memory else ""
+        if cache is not None:
+            extra += f" cached={result['cached_seconds']:.4f}s hits={result['cache_hits']}"
+        print(f"{key:30} gen={result['generate_seconds']:.4f}s solve={result['solve_seconds']:.4f}s "
+              f"(median {result['solve_median_seconds']:.4f}s) expanded={result['expanded']} "
+              f"pushes={result['pushes']} stale={result['stale_pops']} checks={result['neighbor_checks']} "
+              f"frontier={result['peak_frontier']}{extra} {result['throughput']:.1f} mazes/s")
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results)
+    if args.baseline:
+        regressions = compare(results, load_baseline(args.baseline), args.threshold)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before:.1f} -> {after:.1f} mazes/s")
+        return 1 if regressions else 0
+    return 0
+
+
+def main(argv):
+    if argv and argv[0] == "suite":
+        return suite_main(argv[1:])
+    if argv and argv[0] == "route":
+        return route_main(argv[1:])
+    size = int(argv[0]) if argv else 1001
+    trials = int(argv[1]) if len(argv) > 1 else 3
+    print(f"A* on {size}x{size} mazes: reference vs flat-index engine")
+    for seed, ref_time, engine_time, length in bench_astar(size, trials):
+        print(f"seed {seed}: reference={ref_time:.3f}s engine={engine_time:.3f}s "
+              f"speed-up={ref_time / engine_time:.2f}x path={length}")
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+from array import array
+from collections import OrderedDict
+from maze_io import pack_bits, unpack_bits, index_typecode
+
+# Content-addressed cache of solved mazes. The key is a blake2b digest of the
+# grid cells plus start, end and algorithm, so an identical maze hits however
+# it was produced (regenerated from a seed, loaded from a file, solved again).
+# Entries are kept serialized: the path and any multi_goal route as packed
+# indices, the visited cells as bitmaps and the search counters as JSON. The in-memory tier evicts the
+# least recently used entries once it holds more than max_bytes; entries can
+# also be written to a directory and are read back from there on a miss.
+
+ENTRY = struct.Struct("<4sQQQQ")  # magic, iterations, path length, stats JSON length, route length
+ENTRY_MAGIC = b"MZS2"
+
+
+def cache_key(grid, start, end, algorithm):
+    # Hex digest identifying one (maze, start, end, algorithm) query
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(struct.pack("<QQQQ", grid.rows, grid.cols, start, end))
+    digest.update(algorithm.encode())
+    digest.update(grid.cells)
+    return digest.hexdigest()
+
+
+class CachedSolution:
+    # A decoded cache entry; path is a list of linear indices or None, visited
+    # and visited_back are bytearrays with 1 for every cell reached
+    def __init__(self, path, visited, visited_back, iterations, stats=None, route=()):
+        self.path = path
+        self.visited = visited
+        self.visited_back = visited_back
+        self.iterations = iterations
+        self.stats = stats           # SearchStats.as_dict() of the original solve, or None
+        self.route = list(route)     # multi_goal visiting order as linear indices, else empty
+
+    def encode(self):
+        size = len(self.visited)
+        indices = array(index_typecode(size), self.path or ())
+        route = array(index_typecode(size), self.route)
+        if sys.byteorder != "little":
+            indices.byteswap()
+            route.byteswap()
+        stats = json.dumps(self.stats).encode() if self.stats is not None else b""
+        header = ENTRY.pack(ENTRY_MAGIC, self.iterations, len(self.path) if self.path is not None else 2**64 - 1,
+                            len(stats), len(route))
+        return b"".join((header, indices.tobytes(), pack_bits(self.visited), pack_bits(self.visited_back), stats,
+                         route.tobytes()))
+
+    @classmethod
+    def decode(cls, data, size):
+        # Inverse of encode for a maze with size cells
+        magic, iterations, path_length, stats_length, route_length = ENTRY.unpack_from(data, 0)
+        if magic != ENTRY_MAGIC:
+            raise ValueError("not a cached maze solution")
+        offset = ENTRY.size
+        path = None
+        if path_length != 2**64 - 1:
+            indices = array(index_typecode(size))
+            end = offset + path_length * indices.itemsize
+            indices.frombytes(data[offset:end])
+            if sys.byteorder != "little":
+                indices.byteswap()
+            path = indices.tolist()
+            offset = end
+        bitmap = (size + 7) // 8
+        visited = unpack_bits(data[offset:offset + bitmap], size)
+        visited_back = unpack_bits(data[offset + bitmap:offset + 2 * bitmap], size)
+        offset += 2 * bitmap
+        stats = json.loads(data[offset:offset + stats_length]) if stats_length else None
+        offset += stats_length
+        route = array(index_typecode(size))
+        route.frombytes(data[offset:offset + route_length * route.itemsize])
+        if sys.byteorder != "little":
+            route.byteswap()
+        return cls(path, visited, visited_back, iterations, stats, route)
+
+
+class SolutionCache:
+    # LRU cache of encoded solutions bounded by max_bytes, with an optional disk tier
+    def __init__(self, max_bytes=64 << 20, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()  # Key -> encoded entry, least recently used first
+        self.bytes = 0               # Total size of the in-memory entries
+        self.hits = 0                # Lookups answered from memory
+        self.disk_hits = 0           # Lookups answered from the disk tier
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries or (self.directory is not None and os.path.exists(self.disk_path(key)))
+
+    def disk_path(self, key):
+        return os.path.join(self.directory, key + ".sol")
+
+    def get(self, key, size):
+        # Decoded entry for key in a maze of size cells, and where it came from
+        # ("memory" or "disk"); (None, None) on a miss
+        data = self.entries.get(key)
+        if data is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return CachedSolution.decode(data, size), "memory"
+        if self.directory is not None:
+            try:
+                with open(self.disk_path(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                pass
+            else:
+                try:
+                    solution = CachedSolution.decode(data, size)
+                except (ValueError, struct.error):
+                    pass  # An older entry format: a miss, rewritten by the next put
+                else:
+                    self.disk_hits += 1
+                    self.store(key, data)
+                    return solution, "disk"
+        self.misses += 1
+        return None, None
+
+    def put(self, key, solution):
+        data = solution.encode()
+        self.store(key, data)
+        if self.directory is not None:
+            tmp = self.disk_path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.disk_path(key))
+
+    def store(self, key, data):
+        # Add to the memory tier, evicting least recently used entries
+        if len(data) > self.max_bytes:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old)
+        self.entries[key] = data
+        self.bytes += len(data)
+        while self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def clear(self):
+        # Empty the memory tier (the disk tier is left alone)
+        self.entries.clear()
+        self.bytes = 0
+
+    def counters(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "evictions": self.evictions, "entries": len(self.entries), "bytes": self.bytes}
@@ -0,0 +1,116 @@
+from maze_grid import PATH, index_array
+
+# Goal distance fields: one breadth-first search from a fixed goal answers the
+# distance from any start cell in O(1) and its shortest path in O(path length)
+# by walking downhill. A field remembers the grid version it was built from,
+# so callers can tell when an edit made through Grid.set has invalidated it.
+
+
+class DistanceField:
+    # BFS distances (in moves) from goal to every cell, -1 where unreachable
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = goal             # Linear index the distances are measured to
+        self.version = getattr(grid, "version", 0)
+        self.dist = self.build()
+
+    def build(self):
+        grid = self.grid
+        cells, rows, cols = grid.cells, grid.rows, grid.cols
+        dist = index_array(rows * cols)
+        goal = self.goal
+        if cells[goal] != PATH:
+            return dist
+        dist[goal] = 0
+        frontier = [goal]
+        offsets = ((1, 0, 1), (cols, 1, 0), (-1, 0, -1), (-cols, -1, 0))
+        level = 0
+        while frontier:
+            level += 1
+            next_frontier = []
+            append = next_frontier.append
+            for current in frontier:
+                row, col = divmod(current, cols)
+                for step, dr, dc in offsets:
+                    if 0 <= row + dr < rows and 0 <= col + dc < cols:
+                        neighbor = current + step
+                        if dist[neighbor] < 0 and cells[neighbor] == PATH:
+                            dist[neighbor] = level
+                            append(neighbor)
+            frontier = next_frontier
+        return dist
+
+    def is_current(self, grid=None, goal=None):
+        # True while the field still describes grid (default: its own) and goal
+        grid = self.grid if grid is None else grid
+        goal = self.goal if goal is None else goal
+        return grid is self.grid and goal == self.goal and getattr(grid, "version", 0) == self.version
+
+    def distance(self, start):
+        # Moves from start to the goal, or -1 if the goal cannot be reached
+        # A walled start still counts if it touches the goal's region, as in the solvers
+        d = self.dist[start]
+        if d >= 0 or start == self.goal:
+            return d
+        best = -1
+        for neighbor in self.neighbors(start):
+            nd = self.dist[neighbor]
+            if nd >= 0 and (best < 0 or nd + 1 < best):
+                best = nd + 1
+        return best
+
+    def path(self, start):
+        # Shortest path from start to the goal as linear indices, or None
+        d = self.distance(start)
+        if d < 0:
+            return None
+        dist = self.dist
+        path = [start]
+        current = start
+        while d:
+            d -= 1
+            for neighbor in self.neighbors(current):
+                if dist[neighbor] == d:
+                    current = neighbor
+                    break
+            path.append(current)
+        return path
+
+    def neighbors(self, index):
+        rows, cols = self.grid.rows, self.grid.cols
+        row, col = divmod(index, cols)
+        if col + 1 < cols: yield index + 1
+        if row + 1 < rows: yield index + cols
+        if col > 0: yield index - 1
+        if row > 0: yield index - cols
+
+    def distances(self, starts):
+        # Batch form of distance()
+        return [self.distance(start) for start in starts]
+
+    def paths(self, starts):
+        # Batch form of path(); walks that meet reuse the rest of the earlier path
+        dist = self.dist
+        known = {}                   # Cell -> (path, position) on a path already built
+        results = []
+        for start in starts:
+            d = self.distance(start)
+            if d < 0:
+                results.append(None)
+                continue
+            path = [start]
+            current = start
+            while d and current not in known:
+                d -= 1
+                for neighbor in self.neighbors(current):
+                    if dist[neighbor] == d:
+                        current = neighbor
+                        break
+                path.append(current)
+            if d and current in known:
+                shared, position = known[current]
+                path.extend(shared[position + 1:])
+            for position, cell in enumerate(path):
+                known.setdefault(cell, (path, position))
+            results.append(path)
+        return results
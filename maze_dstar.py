@@ -0,0 +1,146 @@
+import heapq
+from maze_grid import PATH, index_array
+
+# Incremental replanning with Lifelong Planning A* (LPA*), the fixed-start form
+# of D* Lite. The planner keeps its g-values and queue between searches; after
+# cells change, update_cell marks the cells whose best predecessor may differ
+# and steps() repairs only the part of the search those changes reach. Each
+# repaired cell is yielded, like the maze_search engines yield expansions.
+
+
+class LifelongPlanner:
+    # LPA* from start to goal on a Grid with unit moves
+    def __init__(self, grid, start, goal, stats=None):
+        self.grid = grid
+        self.start = start           # Linear index of the start cell
+        self.goal = goal             # Linear index of the goal cell
+        self.stats = stats           # maze_search.SearchStats for the next search, or None
+        self.version = getattr(grid, "version", 0)
+        self.path = None             # Indices from start to goal after the last search
+        self.expanded = 0            # Cells expanded, over all searches
+        self.first_expanded = None   # Cells the first (full) search expanded: the cost of starting over
+        self.owner = None            # Single frontier (kept for the engine interface)
+        size = grid.rows * grid.cols
+        self.inf = size + 1          # Larger than any path; all g/rhs values are capped here
+        self.g = index_array(size, self.inf)
+        self.rhs = index_array(size, self.inf)
+        self.shift = (2 * self.inf).bit_length()
+        self.mask = (1 << self.shift) - 1
+        self.rhs[start] = 0
+        self.heap = [self.key(start)]
+
+    def heuristic(self, index):
+        cols = self.grid.cols
+        r, c = divmod(index, cols)
+        goal_r, goal_c = divmod(self.goal, cols)
+        return abs(r - goal_r) + abs(c - goal_c)
+
+    def key(self, index):
+        # Queue entry packing (min(g, rhs) + h, min(g, rhs), index) into one int
+        best = min(self.g[index], self.rhs[index])
+        return (((best + self.heuristic(index)) << self.shift | best) << self.shift) | index
+
+    def neighbors(self, index):
+        rows, cols = self.grid.rows, self.grid.cols
+        row, col = divmod(index, cols)
+        if col + 1 < cols: yield index + 1
+        if row + 1 < rows: yield index + cols
+        if col > 0: yield index - 1
+        if row > 0: yield index - cols
+
+    def update_vertex(self, index):
+        # Recompute rhs from the neighbors and queue the cell if inconsistent
+        if index != self.start:
+            best = self.inf
+            if self.grid.cells[index] == PATH:
+                g = self.g
+                for neighbor in self.neighbors(index):
+                    if g[neighbor] < best:
+                        best = g[neighbor]
+                best = min(best + 1, self.inf)
+            self.rhs[index] = best
+        if self.g[index] != self.rhs[index]:
+            heapq.heappush(self.heap, self.key(index))
+
+    def update_cell(self, index):
+        # Tell the planner that a cell was opened or walled; call steps() to repair
+        self.update_vertex(index)
+        for neighbor in self.neighbors(index):
+            self.update_vertex(neighbor)
+        self.version = getattr(self.grid, "version", 0)
+
+    def is_current(self, grid):
+        return grid is self.grid and getattr(grid, "version", 0) == self.version
+
+    def run(self):
+        for _ in self.steps():
+            pass
+        return self.path
+
+    def steps(self):
+        if self.stats is None:
+            return self.search()
+        return self.stats.record(self, self.search())
+
+    def search(self):
+        # Expand inconsistent cells until the goal is consistent and nothing in
+        # the queue can improve it; yields each expanded cell
+        g, rhs, heap, goal, inf = self.g, self.rhs, self.heap, self.goal, self.inf
+        mask = self.mask
+        update = self.update_vertex
+        stats = self.stats
+        if stats is not None:
+            update = self.counted_update
+            queued = len(heap)
+            stats.lap("setup")
+        while heap:
+            entry = heap[0]
+            current = entry & mask
+            goal_key = self.key(goal) & ~mask
+            if entry & ~mask >= goal_key and rhs[goal] == g[goal]:
+                break
+            heapq.heappop(heap)
+            if stats is not None:
+                stats.pops += 1
+            if g[current] == rhs[current]:
+                if stats is not None:
+                    stats.stale_pops += 1
+                continue  # Already consistent: stale entry
+            if entry != self.key(current):
+                heapq.heappush(heap, self.key(current))
+                continue  # Key changed since it was queued
+            self.expanded += 1
+            yield current
+            if g[current] > rhs[current]:
+                g[current] = rhs[current]  # Overconsistent: settle it
+            else:
+                g[current] = inf           # Underconsistent: raise it and recheck
+                update(current)
+            for neighbor in self.neighbors(current):
+                update(neighbor)
+            if stats is not None and len(heap) > stats.peak_frontier:
+                stats.peak_frontier = len(heap)
+        if stats is not None:
+            stats.pushes += len(heap) - queued + stats.pops  # Every pop left a push behind
+            stats.lap("search")
+        if self.first_expanded is None:
+            self.first_expanded = self.expanded
+        self.path = self.trace()
+
+    def counted_update(self, index):
+        # update_vertex that counts the cells it reads, for SearchStats
+        self.stats.neighbor_checks += 1 + len(list(self.neighbors(index)))
+        self.update_vertex(index)
+
+    def trace(self):
+        # Walk back from the goal through the neighbor with the lowest g
+        g = self.g
+        if g[self.goal] >= self.inf:
+            return None
+        path = [self.goal]
+        current = self.goal
+        while current != self.start:
+            current = min(self.neighbors(current), key=g.__getitem__)
+            path.append(current)
+        path.reverse()
+        return path
@@ -0,0 +1,220 @@
+import hashlib
+import multiprocessing
+import random
+from array import array
+from maze_grid import Grid, WALL, PATH
+
+# Alternative maze generators for very large mazes. They produce the same
+# layout as MazeModel.generate_maze: odd dimensions, cells on odd coordinates,
+# start at (0, 0) and end at (rows-1, cols-1).
+
+PARALLEL_CELLS = 1 << 20     # Grid size from which tiled_grid uses a process pool by default
+
+
+def eller_rows(rows, cols, loop_chance=0.0, seed=None):
+    # Eller's algorithm: yields the maze one grid row (a bytearray of cols cells)
+    # at a time, keeping only the set labels of the current row in memory
+    # loop_chance is the probability of also joining two cells already in the
+    # same set, which adds loops like generate_maze's extra wall removal
+    if rows % 2 == 0: rows += 1
+    if cols % 2 == 0: cols += 1
+    rng = random.Random(seed)
+    width = (cols - 1) // 2          # Cells per row
+    height = (rows - 1) // 2         # Rows of cells
+    labels = array('I', [0]) * width  # Set label per column, 0 = no set yet
+    next_label = 1
+
+    top = bytearray([WALL]) * cols
+    top[0] = top[1] = PATH           # Start cell and its link into the maze
+    yield top
+
+    for k in range(height):
+        last = k == height - 1
+        # Give every cell that was not carried down from above a fresh set
+        members = {}
+        for j in range(width):
+            if not labels[j]:
+                labels[j] = next_label
+                next_label += 1
+            members.setdefault(labels[j], []).append(j)
+
+        # Join neighbors in different sets at random (always on the last row)
+        row = bytearray([WALL]) * cols
+        for j in range(width):
+            row[2 * j + 1] = PATH
+        for j in range(width - 1):
+            left, right = labels[j], labels[j + 1]
+            if left != right:
+                if last or rng.random() < 0.5:
+                    row[2 * j + 2] = PATH
+                    # Relabel the smaller set into the larger one
+                    if len(members[left]) < len(members[right]):
+                        left, right = right, left
+                    moved = members.pop(right)
+                    for m in moved:
+                        labels[m] = left
+                    members[left].extend(moved)
+            elif loop_chance and rng.random() < loop_chance:
+                row[2 * j + 2] = PATH
+        if last:
+            row[cols - 1] = PATH     # Link the end cell into the maze
+        yield row
+
+        if last:
+            bottom = bytearray([WALL]) * cols
+            bottom[cols - 1] = PATH  # End cell
+            yield bottom
+            return
+
+        # Every set extends down at least once; cells that do not extend start
+        # a fresh set in the next row
+        below = bytearray([WALL]) * cols
+        carried = array('I', [0]) * width
+        for label, columns in members.items():
+            down = [j for j in columns if rng.random() < 0.5] or [rng.choice(columns)]
+            for j in down:
+                below[2 * j + 1] = PATH
+                carried[j] = label
+        labels = carried
+        yield below
+
+
+def write_eller(sink, rows, cols, loop_chance=0.0, seed=None):
+    # Stream an Eller maze into a binary sink (anything with write), one byte per
+    # cell in row-major order; returns the (rows, cols) actually written
+    written = 0
+    for row in eller_rows(rows, cols, loop_chance, seed):
+        sink.write(row)
+        written += 1
+    return written, len(row)
+
+
+def eller_grid(rows, cols, loop_chance=0.0, seed=None):
+    # Collect an Eller maze into a Grid
+    if rows % 2 == 0: rows += 1
+    if cols % 2 == 0: cols += 1
+    grid = Grid(rows, cols)
+    for r, row in enumerate(eller_rows(rows, cols, loop_chance, seed)):
+        grid.cells[r * cols:(r + 1) * cols] = row
+    return grid
+
+
+def tile_seed(seed, tile):
+    # Seed of one tile, derived from the maze seed and the tile number alone,
+    # so a tile comes out the same whichever process carves it
+    digest = hashlib.blake2b(b"%d/%d" % (seed, tile), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def carve_tile(task):
+    # Perfect maze over one tile of height x width cells, plus extra wall
+    # removal as in generate_maze, on a local grid with a wall border:
+    # (2 * height + 1) x (2 * width + 1) bytes, cells on odd coordinates
+    seed, height, width, extra_wall_percent = task
+    rng = random.Random(seed)
+    rows, cols = 2 * height + 1, 2 * width + 1
+    cells = bytearray([WALL]) * (rows * cols)
+    stack = array('I', [cols + 1])
+    cells[cols + 1] = PATH
+    steps = (2, 2 * cols, -2, -2 * cols)
+    while stack:
+        current = stack[-1]
+        x, y = divmod(current, cols)
+        dirs = list(steps)
+        rng.shuffle(dirs)
+        for step in dirs:
+            following = current + step
+            # The border rows and columns are walls at even offsets, so a
+            # step off the tile lands outside 1..rows-2 or 1..cols-2
+            if step in (2, -2):
+                inside = 0 < y + step < cols - 1
+            else:
+                inside = 0 < x + step // cols < rows - 1
+            if inside and cells[following] == WALL:
+                cells[current + step // 2] = PATH
+                cells[following] = PATH
+                stack.append(following)
+                break
+        else:
+            stack.pop()
+    # Extra openings: interior walls only, each joining exactly two paths
+    extra = int((rows - 2) * (cols - 2) * extra_wall_percent)
+    for _ in range(extra):
+        x, y = rng.randrange(1, rows - 1), rng.randrange(1, cols - 1)
+        wall = x * cols + y
+        if cells[wall] == WALL and (cells[wall - 1] + cells[wall + 1] + cells[wall - cols] + cells[wall + cols]) == 2 * WALL:
+            cells[wall] = PATH
+    return bytes(cells)
+
+
+def tiled_grid(rows, cols, extra_wall_percent=0.0, seed=0, tile=64, workers=None):
+    # Maze built from tiles of tile x tile cells carved independently, on up
+    # to workers processes (default: every core for grids of PARALLEL_CELLS or
+    # more, else in this process). Each tile is a perfect maze from its own
+    # tile_seed; a seeded random spanning tree over the tiles then opens one
+    # wall on each shared border it uses, so every cell is connected and, with
+    # no extra walls removed, the whole maze is still a perfect maze. The
+    # result depends only on the arguments other than workers.
+    if rows % 2 == 0: rows += 1
+    if cols % 2 == 0: cols += 1
+    height, width = (rows - 1) // 2, (cols - 1) // 2   # Cells per column and row
+    tile_rows = (height + tile - 1) // tile
+    tile_cols = (width + tile - 1) // tile
+    tasks = []
+    for t in range(tile_rows * tile_cols):
+        tr, tc = divmod(t, tile_cols)
+        tasks.append((tile_seed(seed, t), min(tile, height - tr * tile), min(tile, width - tc * tile),
+                      extra_wall_percent))
+    if workers is None:
+        workers = multiprocessing.cpu_count() if rows * cols >= PARALLEL_CELLS else 1
+    workers = min(workers, len(tasks))
+    if workers <= 1:
+        tiles = [carve_tile(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            tiles = pool.map(carve_tile, tasks, max(1, len(tasks) // (workers * 4)))
+
+    # Copy each tile's inside into place; its border is the shared wall
+    grid = Grid(rows, cols)
+    cells = grid.cells
+    for t, data in enumerate(tiles):
+        tr, tc = divmod(t, tile_cols)
+        _, h, w, _ = tasks[t]
+        local = 2 * w + 1
+        r0, c0 = 2 * tr * tile, 2 * tc * tile
+        for r in range(1, 2 * h):
+            at = (r0 + r) * cols + c0 + 1
+            cells[at:at + 2 * w - 1] = data[r * local + 1:(r + 1) * local - 1]
+
+    # Random spanning tree over the tiles (Kruskal on shuffled borders), one
+    # opening at a random position along each border in the tree
+    rng = random.Random(tile_seed(seed, -1))
+    # (tile, neighbor, True for the neighbor to the right / False for the one below)
+    borders = [(t, t + 1, True) for t in range(tile_rows * tile_cols) if t % tile_cols + 1 < tile_cols]
+    borders += [(t, t + tile_cols, False) for t in range((tile_rows - 1) * tile_cols)]
+    rng.shuffle(borders)
+    parent = list(range(tile_rows * tile_cols))
+
+    def find(t):
+        while parent[t] != t:
+            parent[t] = parent[parent[t]]
+            t = parent[t]
+        return t
+
+    for a, b, beside in borders:
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            continue
+        parent[root_b] = root_a
+        tr, tc = divmod(a, tile_cols)
+        if beside:
+            i = tr * tile + rng.randrange(tasks[a][1])  # Cell row along a vertical border
+            cells[(2 * i + 1) * cols + 2 * (tc + 1) * tile] = PATH
+        else:
+            j = tc * tile + rng.randrange(tasks[a][2])  # Cell column along a horizontal border
+            cells[2 * (tr + 1) * tile * cols + 2 * j + 1] = PATH
+
+    # Start and end cells and their links into the maze, as eller_rows opens them
+    cells[0] = cells[1] = PATH
+    cells[(rows - 2) * cols + cols - 1] = cells[rows * cols - 1] = PATH
+    return grid
@@ -0,0 +1,70 @@
+from array import array
+
+# Compact grid storage shared by the maze model, the solvers and the renderer
+
+WALL = 1                     # Cell value for a wall
+PATH = 0                     # Cell value for an open path
+TRIED = 2                    # Wall already considered by the extra-wall pass
+
+
+def index_array(size, fill=-1):
+    # Preallocated signed array able to hold any linear index of a grid with size cells
+    return array('i' if size < 2**31 else 'q', [fill]) * size
+
+
+class Grid:
+    # Compact maze grid: row-major cells in one bytearray, one byte per cell
+    def __init__(self, rows, cols, fill=WALL):
+        self.rows = rows
+        self.cols = cols
+        self.cells = bytearray([fill]) * (rows * cols)
+        self.version = 0             # Bumped by set(); caches built from the grid compare it
+
+    @classmethod
+    def from_rows(cls, rows):
+        # Build a grid from nested lists, e.g. a hand-written test maze
+        grid = cls(len(rows), len(rows[0]) if rows else 0)
+        grid.cells = bytearray(value for row in rows for value in row)
+        return grid
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, r):
+        # Read-only row view so grid[r][c] works like the old nested lists
+        if r < 0:
+            r += self.rows
+        if not 0 <= r < self.rows:
+            raise IndexError("grid row out of range")
+        return memoryview(self.cells)[r * self.cols:(r + 1) * self.cols].toreadonly()
+
+    def __eq__(self, other):
+        return isinstance(other, Grid) and (self.rows, self.cols, self.cells) == (other.rows, other.cols, other.cells)
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.cells.__sizeof__()
+
+    def get(self, r, c):
+        return self.cells[r * self.cols + c]
+
+    def set(self, r, c, value):
+        self.cells[r * self.cols + c] = value
+        self.version += 1
+
+    def index(self, cell):
+        # Linear index of a (row, col) cell
+        return cell[0] * self.cols + cell[1]
+
+    def cell(self, index):
+        # (row, col) of a linear index
+        return divmod(index, self.cols)
+
+    def to_rows(self):
+        # Nested-list copy of the grid
+        cols = self.cols
+        return [list(self.cells[r * cols:(r + 1) * cols]) for r in range(self.rows)]
+
+    def copy(self):
+        grid = Grid(self.rows, self.cols)
+        grid.cells = bytearray(self.cells)
+        return grid
@@ -0,0 +1,284 @@
+import heapq
+from maze_grid import PATH, WALL
+
+# Hierarchical path-finding (HPA*) for many point-to-point queries on big mazes.
+# The grid is cut into square clusters. Every run of open cell pairs across a
+# cluster border becomes an entrance: one pair of nodes, one on each side,
+# joined by a single move. Inside a cluster the nodes are linked by their
+# cluster-local BFS distances. A query links start and goal into their
+# clusters, runs A* over this small abstract graph and refines the abstract
+# path back to cells one segment at a time, each with a BFS bounded to one
+# cluster. Paths are shortest over the abstract graph, which is usually but
+# not always the true shortest path (routes through a cluster must use its
+# entrances). Changing a cell rebuilds that cluster, and its neighbors only
+# when the change is on a border.
+
+
+class ClusterView:
+    # One cluster copied into a small bytearray framed by walls, so a BFS inside
+    # it needs no bounds checks; local index = (r - r0 + 1) * width + (c - c0 + 1)
+    def __init__(self, grid, r0, c0, r1, c1):
+        self.r0, self.c0 = r0, c0
+        self.cols = grid.cols
+        self.width = c1 - c0 + 2
+        width = self.width
+        cells = bytearray([WALL]) * (width * (r1 - r0 + 2))
+        for r in range(r0, r1):
+            start = (r - r0 + 1) * width + 1
+            cells[start:start + c1 - c0] = grid.cells[r * grid.cols + c0:r * grid.cols + c1]
+        self.cells = cells
+
+    def local(self, index):
+        r, c = divmod(index, self.cols)
+        return (r - self.r0 + 1) * self.width + c - self.c0 + 1
+
+    def glob(self, local):
+        r, c = divmod(local, self.width)
+        return (r + self.r0 - 1) * self.cols + c + self.c0 - 1
+
+    def bfs(self, source, targets=None):
+        # Distances from source (a global index, open or not) to the open cells
+        # of the cluster, as {local index: moves}
+        # Stops early once every local index in targets has been reached
+        cells, width = self.cells, self.width
+        start = self.local(source)
+        dist = {start: 0}
+        remaining = len(targets) if targets else -1
+        frontier = [start]
+        level = 0
+        while frontier and remaining:
+            level += 1
+            next_frontier = []
+            for current in frontier:
+                for neighbor in (current + 1, current + width, current - 1, current - width):
+                    if cells[neighbor] == PATH and neighbor not in dist:
+                        dist[neighbor] = level
+                        next_frontier.append(neighbor)
+                        if targets and neighbor in targets:
+                            remaining -= 1
+            frontier = next_frontier
+        return dist
+
+    def walk(self, source, target):
+        # Global indices of a shortest path from source to target (source
+        # excluded) inside the cluster, or None
+        cells, width = self.cells, self.width
+        start, goal = self.local(source), self.local(target)
+        parent = {start: start}
+        frontier = [start]
+        while frontier and goal not in parent:
+            next_frontier = []
+            for current in frontier:
+                for neighbor in (current + 1, current + width, current - 1, current - width):
+                    if cells[neighbor] == PATH and neighbor not in parent:
+                        parent[neighbor] = current
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        if goal not in parent:
+            return None
+        path = []
+        while goal != start:
+            path.append(self.glob(goal))
+            goal = parent[goal]
+        path.reverse()
+        return path
+
+
+class HierarchicalMap:
+    # Abstract graph over a Grid with cluster x cluster cells per cluster
+    def __init__(self, grid, cluster=32):
+        self.grid = grid
+        self.cluster = cluster
+        self.cluster_rows = (grid.rows + cluster - 1) // cluster
+        self.cluster_cols = (grid.cols + cluster - 1) // cluster
+        self.version = getattr(grid, "version", 0)
+        self.entrances = {}          # (cluster id, cluster id) -> [(index, index)], lower id first
+        self.nodes = {}              # Cluster id -> set of node indices inside it
+        self.links = {}              # Node -> nodes one move away in neighboring clusters
+        self.edges = {}              # Node -> {node: distance}, same-cluster nodes and links
+        self.build()
+
+    def build(self):
+        for cid in range(self.cluster_rows * self.cluster_cols):
+            self.nodes[cid] = set()
+        for cid in range(self.cluster_rows * self.cluster_cols):
+            for other in self.next_clusters(cid):
+                self.find_entrances(cid, other)
+        for cid in self.nodes:
+            self.connect(cid)
+
+    def cluster_of(self, index):
+        r, c = divmod(index, self.grid.cols)
+        return r // self.cluster * self.cluster_cols + c // self.cluster
+
+    def bounds(self, cid):
+        # (r0, c0, r1, c1) of a cluster, end-exclusive
+        cr, cc = divmod(cid, self.cluster_cols)
+        size = self.cluster
+        return (cr * size, cc * size,
+                min((cr + 1) * size, self.grid.rows), min((cc + 1) * size, self.grid.cols))
+
+    def next_clusters(self, cid):
+        # The clusters right of and below cid
+        cr, cc = divmod(cid, self.cluster_cols)
+        if cc + 1 < self.cluster_cols:
+            yield cid + 1
+        if cr + 1 < self.cluster_rows:
+            yield cid + self.cluster_cols
+
+    def find_entrances(self, a, b):
+        # One entrance per maximal run of open pairs along the border a|b,
+        # placed in the middle of the run
+        cells, cols = self.grid.cells, self.grid.cols
+        r0, c0, r1, c1 = self.bounds(a)
+        if a // self.cluster_cols == b // self.cluster_cols:  # b is to the right
+            pairs = [(r * cols + c1 - 1, r * cols + c1) for r in range(r0, r1)]
+        else:
+            pairs = [((r1 - 1) * cols + c, r1 * cols + c) for c in range(c0, c1)]
+        entrances = []
+        run = []
+        for pair in pairs + [None]:
+            if pair and cells[pair[0]] == PATH and cells[pair[1]] == PATH:
+                run.append(pair)
+            elif run:
+                entrances.append(run[len(run) // 2])
+                run = []
+        self.entrances[a, b] = entrances
+        for x, y in entrances:
+            self.nodes[a].add(x)
+            self.nodes[b].add(y)
+            self.links.setdefault(x, set()).add(y)
+            self.links.setdefault(y, set()).add(x)
+
+    def drop_entrances(self, a, b):
+        for x, y in self.entrances.pop((a, b), ()):
+            for node, other, cid in ((x, y, a), (y, x, b)):
+                self.links[node].discard(other)
+                if not self.links[node]:
+                    del self.links[node]
+                    self.nodes[cid].discard(node)
+                    self.edges.pop(node, None)
+
+    def connect(self, cid):
+        # Cluster-local distances between all the nodes of a cluster
+        nodes = self.nodes[cid]
+        view = ClusterView(self.grid, *self.bounds(cid))
+        local = {view.local(node): node for node in nodes}
+        for node in nodes:
+            dist = view.bfs(node, local)
+            edges = {local[l]: d for l, d in dist.items() if l in local and local[l] != node}
+            edges.update(dict.fromkeys(self.links[node], 1))
+            self.edges[node] = edges
+
+    def update_cell(self, index):
+        # Re-derive the hierarchy around one changed cell
+        cid = self.cluster_of(index)
+        r, c = divmod(index, self.grid.cols)
+        r0, c0, r1, c1 = self.bounds(cid)
+        affected = {cid}
+        if r in (r0, r1 - 1) or c in (c0, c1 - 1):
+            cr, cc = divmod(cid, self.cluster_cols)
+            around = []
+            if cc > 0: around.append((cid - 1, cid))
+            if cr > 0: around.append((cid - self.cluster_cols, cid))
+            around += [(cid, other) for other in self.next_clusters(cid)]
+            for a, b in around:
+                self.drop_entrances(a, b)
+                self.find_entrances(a, b)
+                affected.update((a, b))
+        for other in affected:
+            self.connect(other)
+        self.version = getattr(self.grid, "version", 0)
+
+    def is_current(self, grid):
+        return grid is self.grid and getattr(grid, "version", 0) == self.version
+
+    def attach(self, index):
+        # Distances from a query cell to the nodes of its own cluster
+        cid = self.cluster_of(index)
+        view = ClusterView(self.grid, *self.bounds(cid))
+        local = {view.local(node): node for node in self.nodes[cid]}
+        dist = view.bfs(index, local)
+        return {local[l]: d for l, d in dist.items() if l in local}
+
+    def abstract_path(self, start, goal):
+        # (cost, node list from start to goal) over the abstract graph, or None
+        if start == goal:
+            return 0, [start]
+        cols = self.grid.cols
+        goal_r, goal_c = divmod(goal, cols)
+        if self.grid.cells[goal] != PATH or self.grid.cells[start] != PATH:
+            return None
+        from_start = self.attach(start)
+        to_goal = self.attach(goal)
+        best = None
+        if self.cluster_of(start) == self.cluster_of(goal):
+            view = ClusterView(self.grid, *self.bounds(self.cluster_of(start)))
+            dist = view.bfs(start, {view.local(goal): goal})
+            if view.local(goal) in dist:
+                best = (dist[view.local(goal)], [start, goal])
+
+        edges = self.edges
+        from_start = {**edges.get(start, {}), **from_start}
+        g_score = {start: 0}
+        parent = {}
+        heap = [(abs(start // cols - goal_r) + abs(start % cols - goal_c), 0, start)]
+        closed = set()
+        pop = heapq.heappop
+        push = heapq.heappush
+        while heap:
+            f, g, current = pop(heap)
+            if current in closed:
+                continue
+            if best is not None and f >= best[0]:
+                break
+            if current == goal:
+                nodes = [goal]
+                while nodes[-1] != start:
+                    nodes.append(parent[nodes[-1]])
+                nodes.reverse()
+                best = (g, nodes)
+                break
+            closed.add(current)
+            successors = from_start if current == start else edges[current]
+            if current in to_goal:
+                successors = {**successors, goal: to_goal[current]}
+            for node, cost in successors.items():
+                new_g = g + cost
+                if new_g < g_score.get(node, new_g + 1) and node not in closed:
+                    g_score[node] = new_g
+                    parent[node] = current
+                    r, c = divmod(node, cols)
+                    push(heap, (new_g + abs(r - goal_r) + abs(c - goal_c), new_g, node))
+        return best
+
+    def refine(self, a, b):
+        # Cells from a to b (a excluded) for one abstract edge
+        if b in self.links.get(a, ()):
+            return [b]
+        return ClusterView(self.grid, *self.bounds(self.cluster_of(b))).walk(a, b)
+
+    def segments(self, nodes):
+        # Refined cells of an abstract path, one abstract edge at a time
+        yield [nodes[0]]
+        for a, b in zip(nodes, nodes[1:]):
+            yield self.refine(a, b)
+
+    def path(self, start, goal):
+        # Full cell path from start to goal as linear indices, or None
+        # Like the other solvers, a walled start may still step onto an open neighbor
+        if start != goal and self.grid.cells[start] != PATH:
+            paths = [self.path(neighbor, goal) for neighbor in self.open_neighbors(start)]
+            paths = [path for path in paths if path]
+            return [start] + min(paths, key=len) if paths else None
+        found = self.abstract_path(start, goal)
+        if found is None:
+            return None
+        return [index for segment in self.segments(found[1]) for index in segment]
+
+    def open_neighbors(self, index):
+        grid = self.grid
+        r, c = divmod(index, grid.cols)
+        for nr, nc in ((r, c + 1), (r + 1, c), (r, c - 1), (r - 1, c)):
+            if 0 <= nr < grid.rows and 0 <= nc < grid.cols and grid.cells[nr * grid.cols + nc] == PATH:
+                yield nr * grid.cols + nc
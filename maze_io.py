@@ -0,0 +1,367 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from maze_grid import Grid, WALL, PATH
+
+# Bit-packed on-disk mazes and an out-of-core solver for mazes larger than RAM.
+#
+# File layout (little-endian):
+#   header   HEADER struct, padded to DATA_OFFSET bytes
+#   walls    one bit per cell (1 = wall), most significant bit first; every row
+#            starts on a byte boundary, so a row is (cols + 7) // 8 bytes
+#   path     if FLAG_PATH: the solved path as linear indices, uint32 each
+#            (uint64 for mazes of 2**32 cells or more)
+#   visited  if FLAG_VISITED: one bit per cell, packed without row padding
+# start and end are stored as linear cell indices. Version 1 files have no
+# seed, path or visited data and are still read.
+
+MAGIC = b"MAZB"
+VERSION = 2
+READABLE_VERSIONS = (1, 2)
+# magic, version, flags, rows, cols, start, end, seed, path length
+HEADER = struct.Struct("<4sHHQQQQqQ")
+DATA_OFFSET = 64
+FLAG_SEED = 1
+FLAG_PATH = 2
+FLAG_VISITED = 4
+
+TO_ASCII = bytes.maketrans(bytes([PATH, WALL]), b"01")
+FROM_ASCII = bytes.maketrans(b"01", bytes([PATH, WALL]))
+
+
+def pack_bits(cells):
+    # Pack bytes of 0/1 into bits, MSB first; runs in C via a base-2 int round trip
+    if not cells:
+        return b""
+    nbytes = (len(cells) + 7) // 8
+    digits = bytes(cells).translate(TO_ASCII) + b"0" * (nbytes * 8 - len(cells))
+    return int(digits, 2).to_bytes(nbytes, "big")
+
+
+def unpack_bits(data, count):
+    # Inverse of pack_bits: the first count bits of data as a bytearray of 0/1
+    if not count:
+        return bytearray()
+    digits = format(int.from_bytes(data, "big"), "0%db" % (len(data) * 8))
+    return bytearray(digits[:count].encode("ascii").translate(FROM_ASCII))
+
+
+def pack_rows(cells, rows, cols):
+    # pack_bits for a whole grid, padding each row to a byte boundary
+    stride = (cols + 7) // 8
+    digits = bytes(cells).translate(TO_ASCII)
+    if stride * 8 != cols:
+        pad = b"0" * (stride * 8 - cols)
+        digits = pad.join([digits[r * cols:(r + 1) * cols] for r in range(rows)]) + pad
+    return int(digits, 2).to_bytes(rows * stride, "big") if rows * cols else b""
+
+
+def unpack_rows(data, rows, cols):
+    # Inverse of pack_rows: a bytearray of rows * cols cells, ready to be a Grid's cells
+    if not rows * cols:
+        return bytearray()
+    width = (cols + 7) // 8 * 8
+    digits = format(int.from_bytes(data, "big"), "0%db" % (rows * width))
+    if width != cols:
+        digits = "".join([digits[r * width:r * width + cols] for r in range(rows)])
+    return bytearray(digits.encode("ascii").translate(FROM_ASCII))
+
+
+def header(rows, cols, start, end, seed=None, path_length=0, flags=0):
+    # Header bytes padded to DATA_OFFSET
+    if seed is not None:
+        flags |= FLAG_SEED
+    return HEADER.pack(MAGIC, VERSION, flags, rows, cols, start, end,
+                       seed or 0, path_length).ljust(DATA_OFFSET, b"\0")
+
+
+def index_typecode(size):
+    # array typecode for linear indices of a maze with size cells
+    return 'I' if size < 2**32 else 'Q'
+
+
+def write_packed_rows(path, rows_iter, rows, cols, start=0, end=None, seed=None):
+    # Stream rows (byte-per-cell sequences, e.g. from maze_generators.eller_rows)
+    # into a packed maze file without holding the whole maze in memory
+    if end is None:
+        end = rows * cols - 1
+    with open(path, "wb") as f:
+        f.write(header(rows, cols, start, end, seed))
+        for row in rows_iter:
+            f.write(pack_bits(row))
+
+
+def save_packed(path, grid, start=(0, 0), end=None, seed=None):
+    # Write a Grid as a packed maze file (walls only)
+    save_maze(path, grid, start, end, seed)
+
+
+def save_maze(path, grid, start=(0, 0), end=None, seed=None, solution=None, visited=None):
+    # Write a maze with its seed and, optionally, a solution: solution is a list of
+    # linear indices and visited a bytearray with 1 for every visited cell
+    if end is None:
+        end = (grid.rows - 1, grid.cols - 1)
+    size = grid.rows * grid.cols
+    flags = (FLAG_PATH if solution else 0) | (FLAG_VISITED if visited is not None else 0)
+    with open(path, "wb") as f:
+        f.write(header(grid.rows, grid.cols, grid.index(start), grid.index(end), seed,
+                       len(solution) if solution else 0, flags))
+        f.write(pack_rows(grid.cells, grid.rows, grid.cols))
+        if solution:
+            indices = array(index_typecode(size), solution)
+            if sys.byteorder != "little":
+                indices.byteswap()
+            indices.tofile(f)
+        if visited is not None:
+            f.write(pack_bits(visited))
+
+
+class SavedMaze:
+    # Everything load_maze read back from a maze file
+    def __init__(self, grid, start, end, seed, solution, visited):
+        self.grid = grid             # Grid with the walls
+        self.start = start           # Linear index of the start cell
+        self.end = end               # Linear index of the end cell
+        self.seed = seed             # Generation seed, or None if not stored
+        self.solution = solution     # array of path indices, or None
+        self.visited = visited       # bytearray with 1 per visited cell, or None
+
+
+def load_maze(path):
+    # Read a maze file in one go; the walls are unpacked straight into the grid buffer
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, flags, rows, cols, start, end, seed, path_length = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version not in READABLE_VERSIONS:
+        raise ValueError(f"{path} is not a packed maze file")
+    size = rows * cols
+    offset = DATA_OFFSET + rows * ((cols + 7) // 8)
+    grid = Grid(rows, cols)
+    grid.cells = unpack_rows(data[DATA_OFFSET:offset], rows, cols)
+    solution = None
+    if flags & FLAG_PATH:
+        solution = array(index_typecode(size))
+        end_offset = offset + path_length * solution.itemsize
+        solution.frombytes(data[offset:end_offset])
+        if sys.byteorder != "little":
+            solution.byteswap()
+        offset = end_offset
+    visited = None
+    if flags & FLAG_VISITED:
+        visited = unpack_bits(data[offset:offset + (size + 7) // 8], size)
+    return SavedMaze(grid, start, end, seed if flags & FLAG_SEED else None, solution, visited)
+
+
+class BitCells:
+    # Read-only cells[index] view over the packed walls of a mapped file
+    def __init__(self, view, cols, stride):
+        self.view = view
+        self.cols = cols
+        self.stride = stride
+
+    def __len__(self):
+        return len(self.view) // self.stride * self.cols
+
+    def __getitem__(self, index):
+        r, c = divmod(index, self.cols)
+        return (self.view[r * self.stride + (c >> 3)] >> (7 - (c & 7))) & 1
+
+
+class PackedGrid:
+    # A packed maze file opened with mmap; reads go straight to the mapping
+    # Offers the read side of Grid (rows, cols, cells[index], grid[r][c], get,
+    # index, cell), so the model and the search engines accept it as a maze
+    out_of_core = True
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, rows, cols, start, end, seed, _ = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version not in READABLE_VERSIONS:
+            self.close()
+            raise ValueError(f"{path} is not a packed maze file")
+        self.seed = seed if flags & FLAG_SEED else None
+        self.rows = rows
+        self.cols = cols
+        self.start = start           # Linear index of the start cell
+        self.end = end               # Linear index of the end cell
+        self.stride = (cols + 7) // 8
+        self.walls = memoryview(self.map)[DATA_OFFSET:DATA_OFFSET + rows * self.stride]
+        self.cells = BitCells(self.walls, cols, self.stride)
+
+    def close(self):
+        if getattr(self, "walls", None) is not None:
+            self.cells = None
+            self.walls.release()
+            self.walls = None
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, r):
+        if r < 0:
+            r += self.rows
+        if not 0 <= r < self.rows:
+            raise IndexError("grid row out of range")
+        return self.row(r)
+
+    def row(self, r):
+        # One row unpacked to a byte per cell
+        return unpack_bits(self.walls[r * self.stride:(r + 1) * self.stride], self.cols)
+
+    def get(self, r, c):
+        return self.cells[r * self.cols + c]
+
+    def index(self, cell):
+        return cell[0] * self.cols + cell[1]
+
+    def cell(self, index):
+        return divmod(index, self.cols)
+
+    def to_grid(self):
+        # Load the whole maze into an in-memory Grid
+        grid = Grid(self.rows, self.cols)
+        grid.cells = unpack_rows(self.walls, self.rows, self.cols)
+        return grid
+
+
+# Parent directions kept by TiledSearch, one nibble per cell
+UNSEEN, FROM_LEFT, FROM_UP, FROM_RIGHT, FROM_DOWN, ROOT = range(6)
+
+
+class TiledSearch:
+    # Out-of-core breadth-first search for PackedGrid (or Grid) mazes
+    # The frontier of each BFS level is bucketed by tile and expanded tile by tile,
+    # so reads stay local in the mapping. Buckets spill to a temporary file once
+    # more than buffer_cells entries are held, and parent directions live in a
+    # memory-mapped temporary file (4 bits per cell) rather than in RAM.
+    # Same interface as the maze_search engines: steps(), run(), path, expanded.
+    def __init__(self, grid, start, goal, tile=256, buffer_cells=1 << 16, workdir=None):
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self.tile = tile
+        self.buffer_cells = buffer_cells
+        self.workdir = workdir
+        self.path = None
+        self.expanded = 0
+        self.owner = None
+        self.spilled = 0             # Frontier entries written to disk
+
+    def run(self):
+        for _ in self.steps():
+            pass
+        return self.path
+
+    def steps(self):
+        grid = self.grid
+        cells, rows, cols = grid.cells, grid.rows, grid.cols
+        start, goal = self.start, self.goal
+        if start == goal:
+            self.path = [start]
+            return
+        if cells[goal] != PATH:
+            return
+        tile = self.tile
+        tiles_per_row = (cols + tile - 1) // tile
+
+        with tempfile.TemporaryDirectory(dir=self.workdir) as tmp:
+            parents_file = open(os.path.join(tmp, "parents"), "w+b")
+            spill_files = (open(os.path.join(tmp, "frontier-a"), "w+b"), open(os.path.join(tmp, "frontier-b"), "w+b"))
+            try:
+                parents_file.truncate((rows * cols + 1) // 2)
+                parents = mmap.mmap(parents_file.fileno(), 0)
+                try:
+                    yield from self.search(cells, rows, cols, tile, tiles_per_row, parents, spill_files)
+                finally:
+                    parents.close()
+            finally:
+                parents_file.close()
+                for f in spill_files:
+                    f.close()
+
+    def search(self, cells, rows, cols, tile, tiles_per_row, parents, spill_files):
+        start, goal = self.start, self.goal
+
+        def get_parent(index):
+            return (parents[index >> 1] >> ((index & 1) * 4)) & 15
+
+        def set_parent(index, value):
+            shift = (index & 1) * 4
+            parents[index >> 1] = (parents[index >> 1] & (0xF0 >> shift)) | (value << shift)
+
+        def tile_of(index):
+            r, c = divmod(index, cols)
+            return (r // tile) * tiles_per_row + c // tile
+
+        # A BFS level is {tile: array of indices} held in memory plus
+        # {tile: [(offset, count), ...]} blocks spilled to a file
+        typecode = index_typecode(rows * cols)
+        set_parent(start, ROOT)
+        buckets = {tile_of(start): array(typecode, [start])}
+        blocks = {}
+        held = 0
+        level_file, spill_file = spill_files
+        moves = ((1, 0, 1, FROM_LEFT), (cols, 1, 0, FROM_UP), (-1, 0, -1, FROM_RIGHT), (-cols, -1, 0, FROM_DOWN))
+
+        while buckets or blocks:
+            # The level just built becomes the one read; the older file is reused
+            level_file, spill_file = spill_file, level_file
+            spill_file.seek(0)
+            spill_file.truncate()
+            level_buckets, level_blocks = buckets, blocks
+            buckets, blocks = {}, {}
+            held = 0
+            for tile_id in sorted(set(level_buckets) | set(level_blocks)):
+                frontier = array(typecode)
+                for offset, count in level_blocks.get(tile_id, ()):
+                    level_file.seek(offset)
+                    frontier.fromfile(level_file, count)
+                frontier.extend(level_buckets.pop(tile_id, ()))
+                for current in frontier:
+                    self.expanded += 1
+                    yield current
+                    row, col = divmod(current, cols)
+                    for step, dr, dc, came_from in moves:
+                        if 0 <= row + dr < rows and 0 <= col + dc < cols:
+                            neighbor = current + step
+                            if cells[neighbor] == PATH and get_parent(neighbor) == UNSEEN:
+                                set_parent(neighbor, came_from)
+                                if neighbor == goal:
+                                    self.path = self.trace(get_parent, cols)
+                                    return
+                                buckets.setdefault(tile_of(neighbor), array(typecode)).append(neighbor)
+                                held += 1
+                    if held > self.buffer_cells:
+                        # Spill the next level's buckets to disk
+                        spill_file.seek(0, os.SEEK_END)
+                        for spill_tile, bucket in buckets.items():
+                            blocks.setdefault(spill_tile, []).append((spill_file.tell(), len(bucket)))
+                            bucket.tofile(spill_file)
+                            self.spilled += len(bucket)
+                        buckets = {}
+                        held = 0
+            spill_file.flush()
+
+    def trace(self, get_parent, cols):
+        # Walk parent directions back from the goal
+        back = {FROM_LEFT: -1, FROM_UP: -cols, FROM_RIGHT: 1, FROM_DOWN: cols}
+        index = self.goal
+        path = [index]
+        while index != self.start:
+            index += back[get_parent(index)]
+            path.append(index)
+        path.reverse()
+        return path
@@ -0,0 +1,220 @@
+import heapq
+import re
+from maze_grid import PATH
+from maze_search import check_cancelled
+
+# Junction-graph compression. Generated mazes are mostly one-cell corridors,
+# which A* expands one cell at a time. JunctionGraph first peels away dead-end
+# subtrees (no start-to-goal path can enter one and come back out), then folds
+# every remaining corridor into one weighted edge between its end nodes:
+# junctions, the start and the goal. JunctionSearch runs A* over that graph and
+# walks the chosen corridors again to return the full cell path.
+
+
+class JunctionGraph:
+    # Weighted graph of the open cells that matter for one start and goal.
+    # Works on a copy of the grid framed by walls, width = cols + 2, so every
+    # cell has four neighbor indices; nodes and edges use these framed indices
+    # (see framed() and unframed()).
+    def __init__(self, grid, start, goal, cancelled=None):
+        self.grid = grid
+        self.start = start           # Linear index of the start cell
+        self.goal = goal             # Linear index of the goal cell
+        self.cancelled = cancelled   # threading.Event that abandons the build (SearchCancelled), or None
+        self.version = getattr(grid, "version", 0)
+        self.width = grid.cols + 2
+        self.open_cells = 0          # Open cells before pruning
+        self.pruned = 0              # Dead-end cells removed
+        self.alive = None            # Framed byte per cell, 1 for cells kept after pruning
+        self.edges = {}              # Node -> [(node, corridor length, first step)]
+        self.build()
+
+    def framed(self, index):
+        row, col = divmod(index, self.grid.cols)
+        return (row + 1) * self.width + col + 1
+
+    def unframed(self, index):
+        row, col = divmod(index, self.width)
+        return (row - 1) * self.grid.cols + col - 1
+
+    def build(self):
+        grid = self.grid
+        rows, cols, width = grid.rows, grid.cols, self.width
+        total = width * (rows + 2)
+        open_cell = bytes([1]) + bytes(255)  # Translation table: PATH -> 1, anything else -> 0
+        alive = self.alive = bytearray(total)
+        for row in range(rows):
+            at = (row + 1) * width + 1
+            alive[at:at + cols] = grid.cells[row * cols:(row + 1) * cols].translate(open_cell)
+        # Like the solvers, a walled start may still step onto its open neighbors
+        start, goal = self.framed(self.start), self.framed(self.goal)
+        alive[start] = 1
+        self.open_cells = alive.count(1)
+        degree = self.degrees()
+
+        # Peel dead ends until only cycles and the routes to start and goal remain
+        stack = self.where(degree, (0, 1))
+        cancelled = self.cancelled
+        while stack:
+            index = stack.pop()
+            if index == start or index == goal or not alive[index]:
+                continue
+            alive[index] = 0
+            self.pruned += 1
+            if self.pruned & 4095 == 0:
+                check_cancelled(cancelled)
+            for neighbor in (index + 1, index + width, index - 1, index - width):
+                if alive[neighbor]:
+                    degree[neighbor] -= 1
+                    if degree[neighbor] == 1:
+                        stack.append(neighbor)
+
+        nodes = self.where(degree, (0, 1, 3, 4))
+        for index in (start, goal):
+            if alive[index] and degree[index] == 2:
+                nodes.append(index)
+        edges = self.edges
+        for node in nodes:
+            edges[node] = []
+        # Walk every corridor once, adding the edge in both directions
+        walked = set()               # node * 4 + direction of the first step
+        offsets = (1, width, -1, -width)
+        for count, node in enumerate(nodes):
+            if count & 1023 == 0:
+                check_cancelled(cancelled)
+            for direction, step in enumerate(offsets):
+                first = node + step
+                if not alive[first] or node * 4 + direction in walked:
+                    continue
+                previous, current, length = node, first, 1
+                while current not in edges:
+                    for following in (current + 1, current + width, current - 1, current - width):
+                        if alive[following] and following != previous:
+                            break
+                    previous, current = current, following
+                    length += 1
+                edges[node].append((current, length, first))
+                edges[current].append((node, length, previous))
+                walked.add(current * 4 + offsets.index(previous - current))
+
+    def degrees(self):
+        # Open neighbors of every framed cell, as a bytearray; the four shifted
+        # copies are added as big integers, one byte per cell (no carries: <= 4)
+        alive, width = self.alive, self.width
+        total = len(alive)
+        cells = int.from_bytes(alive, "little")
+        counts = (cells >> 8) + (cells << 8) + (cells >> 8 * width) + (cells << 8 * width)
+        return bytearray(counts.to_bytes(total + width + 1, "little")[:total])
+
+    def where(self, degree, values):
+        # Framed indices of the live cells whose degree is in values
+        table = bytes(1 if value in values else 0 for value in range(256))
+        mask = int.from_bytes(degree.translate(table), "little") & int.from_bytes(self.alive, "little")
+        flags = mask.to_bytes(len(degree), "little")
+        return [match.start() for match in re.finditer(b"\x01", flags)]
+
+    def corridor(self, node, first):
+        # Framed cells of the corridor from node through first (node excluded)
+        alive, edges, width = self.alive, self.edges, self.width
+        previous, current = node, first
+        cells = [first]
+        while current not in edges:
+            for following in (current + 1, current + width, current - 1, current - width):
+                if alive[following] and following != previous:
+                    break
+            previous, current = current, following
+            cells.append(current)
+        return cells
+
+    def is_current(self, grid, start, goal):
+        return (grid is self.grid and (start, goal) == (self.start, self.goal)
+                and getattr(grid, "version", 0) == self.version)
+
+
+class JunctionSearch:
+    # A* over a JunctionGraph; yields expanded nodes, path holds every cell
+    def __init__(self, grid, start, goal, stats=None, graph=None, cancelled=None):
+        self.grid = grid
+        self.start = start           # Linear index of the start cell
+        self.goal = goal             # Linear index of the goal cell
+        self.stats = stats           # SearchStats to fill in, or None
+        self.graph = graph           # Prebuilt JunctionGraph for start and goal, or None
+        self.cancelled = cancelled   # threading.Event passed on to the graph build, or None
+        self.path = None             # Indices from start to goal once found
+        self.expanded = 0            # Number of nodes expanded so far
+        self.owner = None            # Single frontier (kept for the engine interface)
+
+    def run(self):
+        for _ in self.steps():
+            pass
+        return self.path
+
+    def steps(self):
+        if self.stats is None:
+            return self.search()
+        return self.stats.record(self, self.search())
+
+    def search(self):
+        if self.start == self.goal:
+            self.path = [self.start]
+            return
+        if self.graph is None:
+            self.graph = JunctionGraph(self.grid, self.start, self.goal, self.cancelled)
+        graph = self.graph
+        start, goal = graph.framed(self.start), graph.framed(self.goal)
+        if not graph.alive[goal] or self.grid.cells[self.goal] != PATH:
+            return
+        edges, width = graph.edges, graph.width
+        goal_r, goal_c = divmod(goal, width)
+        start_r, start_c = divmod(start, width)
+        g_score = {start: 0}
+        parent = {}                  # Node -> (previous node, first step of the corridor)
+        closed = set()
+        # Entries are (f, -g, node): ties on f go to the node further along
+        heap = [(abs(start_r - goal_r) + abs(start_c - goal_c), 0, start)]
+        pop = heapq.heappop
+        push = heapq.heappush
+        stats = self.stats
+        if stats is not None:
+            push, pop = stats.counted_heap(heap)
+            stats.lap("setup")
+
+        while heap:
+            _, g, current = pop(heap)
+            g = -g
+            if current in closed:
+                if stats is not None:
+                    stats.stale_pops += 1
+                continue
+            if current == goal:
+                if stats is not None:
+                    stats.lap("search")
+                self.path = self.trace(parent, start, goal)
+                return
+            closed.add(current)
+            self.expanded += 1
+            yield graph.unframed(current)
+
+            if stats is not None:
+                stats.neighbor_checks += len(edges[current])
+            for node, length, first in edges[current]:
+                new_g = g + length
+                if node not in closed and new_g < g_score.get(node, new_g + 1):
+                    g_score[node] = new_g
+                    parent[node] = (current, first)
+                    r, c = divmod(node, width)
+                    push(heap, (new_g + abs(r - goal_r) + abs(c - goal_c), -new_g, node))
+
+    def trace(self, parent, start, goal):
+        # Expand the node path back into cells, one corridor at a time
+        legs = []
+        node = goal
+        while node != start:
+            previous, first = parent[node]
+            legs.append(self.graph.corridor(previous, first))
+            node = previous
+        path = [self.start]
+        unframed = self.graph.unframed
+        for leg in reversed(legs):
+            path.extend(map(unframed, leg))
+        return path
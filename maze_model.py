@@ -0,0 +1,526 @@
+import random
+import time
+from itertools import compress
+from array import array
+import maze_search
+import maze_generators
+import maze_io
+import maze_distance
+import maze_hpa
+import maze_dstar
+import maze_cache
+import maze_junctions
+import maze_unionfind
+import maze_routing
+from maze_grid import Grid, WALL, PATH, TRIED
+
+# Headless maze model: generation and solving with only the standard library.
+# The pygame front end in maze_solver.py builds on top of this class.
+
+# Selectable solvers: display label -> MazeModel generator method
+ALGORITHMS = {
+    "A*": "a_star",
+    "JPS": "jump_point_search",
+    "Bi-BFS": "bidirectional",
+    "LPA*": "lifelong",
+    "Junction": "junction_search",
+    "Route": "multi_goal",
+}
+
+
+class MazeModel:
+    # Maze state plus the generators and solvers that operate on it
+    def __init__(self):
+        self.maze = None             # Grid of cells: 1 = wall, 0 = path
+        self.start = None            # Start position (row, col)
+        self.end = None              # End position (row, col)
+        self.seed = None             # RNG seed the maze was generated from
+        self.path = []               # List of coordinates for solved path
+        self.visited = set()         # Set of visited cells during solving
+        self.visited_back = set()    # Cells reached from the end by bidirectional search
+        self.iterations = 0          # Count of A* steps
+        self.time = 0                # Time taken to solve maze
+        self.algorithm = "a_star"    # Solver method used by solve()
+        self.instrument = False      # Collect SearchStats for each solve
+        self.trace_memory = False    # Also measure peak memory when instrumenting
+        self.stats = None            # SearchStats of the last solve, if instrumented
+        self.field = None            # Cached DistanceField to self.end (see goal_field)
+        self.hierarchy = None        # Cached HierarchicalMap (see hierarchical_path)
+        self.planner = None          # LifelongPlanner kept between wall edits (see replan)
+        self.junctions = None        # Cached JunctionGraph (see junction_search)
+        self.components = None       # DisjointSet of open cells kept by generate_maze and set_cell (see current_components)
+        self.repaired = set()        # Cells the last replan expanded
+        self.replan_work = None      # (cells repaired, cells the planner's first, full search expanded)
+        self.cache = None            # maze_cache.SolutionCache consulted before solving, if any
+        self.tracer = None           # maze_trace.TraceWriter run_search records expansions to, if any
+        self.checkpoints = []        # Cells multi_goal visits between start and end, in any order
+        self.route = []              # Order multi_goal visited them in, start and end included
+        self.route_workers = None    # Processes for multi_goal's distance matrix (None: automatic)
+        self.cancelled = None        # threading.Event a background solve stops at, also between cells (see maze_worker)
+
+    def reset_search(self):
+        # Clear the results of a previous solve
+        self.path = []
+        self.visited = set()
+        self.visited_back = set()
+        self.iterations = 0
+        self.time = 0
+        self.repaired = set()
+        self.replan_work = None
+        self.route = []
+        self.stats = maze_search.SearchStats(self.trace_memory) if self.instrument else None
+
+    def search_copy(self):
+        # A model sharing this maze, query and cached structures but with results
+        # of its own, to solve on another thread (see maze_worker); no cache
+        copy = MazeModel()
+        for name in ("maze", "start", "end", "seed", "algorithm", "instrument", "trace_memory",
+                     "field", "hierarchy", "junctions", "components", "checkpoints", "route_workers"):
+            setattr(copy, name, getattr(self, name))
+        copy.reset_search()
+        return copy
+
+    def adopt_search(self, copy):
+        # Take over the results and rebuilt structures of a finished search_copy
+        for name in ("path", "visited", "visited_back", "iterations", "time", "stats", "planner", "junctions",
+                     "components", "route"):
+            setattr(self, name, getattr(copy, name))
+
+    def solve(self, algorithm=None):
+        # Run a solver to completion without any rendering; returns the path found
+        # With a cache set, an identical earlier query is replayed instead; a
+        # query the disjoint sets already show to be unsolvable is not searched
+        self.reset_search()
+        algorithm = algorithm or self.algorithm
+        start_time = time.perf_counter()
+        if self.unreachable() or self.lookup_solution(algorithm):
+            self.time = time.perf_counter() - start_time
+            return self.path
+        for _ in getattr(self, algorithm)():
+            self.iterations += 1
+        self.time = time.perf_counter() - start_time
+        self.remember_solution(algorithm)
+        return self.path
+
+    def unreachable(self):
+        # True when the disjoint sets show the end cannot be reached from the
+        # start; False when it can or when there are no sets to ask
+        sets = self.current_components()
+        if sets is None:
+            return False
+        return not sets.connected(self.maze.index(self.start), self.maze.index(self.end))
+
+    def current_components(self):
+        # The disjoint sets, first rebuilt in one labeling pass if a wall edit
+        # left them out of date; None when the maze never had any (Eller, tiled,
+        # loaded and mapped mazes)
+        sets = self.components
+        if sets is not None and not sets.is_current(self.maze):
+            sets = self.components = maze_unionfind.label(self.maze)
+        return sets
+
+    def solution_key(self, algorithm):
+        # Cache key of the current query, or None when there is nothing to cache
+        if self.cache is None or getattr(self.maze, "out_of_core", False):
+            return None
+        if algorithm == "multi_goal":
+            algorithm += ":" + ",".join(str(self.maze.index(cell)) for cell in self.checkpoints)
+        return maze_cache.cache_key(self.maze, self.maze.index(self.start), self.maze.index(self.end), algorithm)
+
+    def lookup_solution(self, algorithm):
+        # Restore path, visited cells, route, iterations and stats from the cache;
+        # False on a miss. Restored stats record which tier answered in stats.cache.
+        key = self.solution_key(algorithm)
+        if key is None:
+            return False
+        size = self.maze.rows * self.maze.cols
+        cached, tier = self.cache.get(key, size)
+        if cached is None:
+            return False
+        cols = self.maze.cols
+        self.path = [divmod(index, cols) for index in cached.path] if cached.path else []
+        self.visited = {divmod(index, cols) for index in compress(range(size), cached.visited)}
+        self.visited_back = {divmod(index, cols) for index in compress(range(size), cached.visited_back)}
+        self.iterations = cached.iterations
+        self.route = [divmod(index, cols) for index in cached.route]
+        if self.instrument:
+            self.stats = maze_search.SearchStats(self.trace_memory)
+            if cached.stats:
+                vars(self.stats).update(cached.stats)
+            self.stats.cache = tier
+        return True
+
+    def remember_solution(self, algorithm):
+        # Store the result of the solve that just finished in the cache
+        key = self.solution_key(algorithm)
+        if key is None:
+            return
+        grid = self.maze
+        visited = bytearray(grid.rows * grid.cols)
+        visited_back = bytearray(grid.rows * grid.cols)
+        for cells, bitmap in ((self.visited, visited), (self.visited_back, visited_back)):
+            for cell in cells:
+                bitmap[grid.index(cell)] = 1
+        path = [grid.index(cell) for cell in self.path] if self.path else None
+        stats = self.stats.as_dict() if self.stats is not None else None
+        route = [grid.index(cell) for cell in self.route]
+        self.cache.put(key, maze_cache.CachedSolution(path, visited, visited_back, self.iterations, stats, route))
+
+    def algorithm_label(self):
+        # Display name of the selected solver
+        return next(label for label, method in ALGORITHMS.items() if method == self.algorithm)
+
+    def heuristic(self, a, b):
+        # Manhattan distance heuristic for A*: estimates cost between two points
+        return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+    def a_star(self):
+        # A* algorithm: finds shortest path from start to end using a heuristic
+        # Runs on the flat-index engine in maze_search, one expansion per yield
+        # Mazes mapped from disk go to the tiled out-of-core search instead,
+        # which keeps no SearchStats
+        if getattr(self.maze, "out_of_core", False):
+            self.stats = None
+            search = maze_io.TiledSearch(self.maze, self.maze.index(self.start), self.maze.index(self.end))
+        else:
+            search = maze_search.AStarSearch(self.maze, self.maze.index(self.start), self.maze.index(self.end), self.stats)
+        yield from self.run_search(search)
+
+    def jump_point_search(self):
+        # Jump Point Search: same path as A*, but only jump points are expanded
+        search = maze_search.JumpPointSearch(self.maze, self.maze.index(self.start), self.maze.index(self.end), self.stats)
+        yield from self.run_search(search)
+
+    def bidirectional(self):
+        # Bidirectional BFS: frontiers grow from both start and end until they meet
+        search = maze_search.BidirectionalSearch(self.maze, self.maze.index(self.start), self.maze.index(self.end), self.stats)
+        yield from self.run_search(search)
+
+    def lifelong(self):
+        # Lifelong Planning A*: a full search now, kept by replan() for cheap repairs
+        self.planner = maze_dstar.LifelongPlanner(self.maze, self.maze.index(self.start), self.maze.index(self.end), self.stats)
+        yield from self.run_search(self.planner)
+        self.planner.stats = None
+
+    def junction_search(self):
+        # A* over the junction graph: dead ends pruned, corridors folded into
+        # weighted edges. The graph is reused until the maze, start or end change.
+        start, end = self.maze.index(self.start), self.maze.index(self.end)
+        graph = self.junctions
+        if graph is not None and not graph.is_current(self.maze, start, end):
+            graph = None
+        search = maze_junctions.JunctionSearch(self.maze, start, end, self.stats, graph, self.cancelled)
+        yield from self.run_search(search)
+        self.junctions = search.graph
+
+    def multi_goal(self):
+        # Shortest route from start through every checkpoint to end: pairwise
+        # distances by multi-target BFS (maze_routing, on a process pool for big
+        # mazes), the best visiting order, then one A* leg per hop, yielding
+        # each leg's expansions in turn
+        grid, cols = self.maze, self.maze.cols
+        nodes = [self.start] + list(self.checkpoints) + [self.end]
+        indices = [grid.index(cell) for cell in nodes]
+        start_time = time.perf_counter()
+        matrix = maze_routing.distance_matrix(grid, indices, self.route_workers, self.cancelled)
+        length, order = maze_routing.visit_order(matrix, cancelled=self.cancelled)
+        if self.stats is not None:
+            self.stats.phases["route"] = time.perf_counter() - start_time
+        if order is None:
+            return
+        self.route = [nodes[node] for node in order]
+        path = [indices[0]]
+        expanded = 0
+        for a, b in zip(order, order[1:]):
+            search = maze_search.AStarSearch(grid, indices[a], indices[b], self.stats)
+            yield from self.run_search(search)
+            expanded += search.expanded
+            path.extend(search.path[1:])
+        if self.stats is not None:
+            self.stats.expanded = expanded
+        self.path = [divmod(index, cols) for index in path]
+
+    def toggle_checkpoint(self, cell):
+        # Add or remove a multi_goal checkpoint; only open cells other than the
+        # start and end can be checkpoints
+        if cell in self.checkpoints:
+            self.checkpoints.remove(cell)
+        elif cell in (self.start, self.end) or self.maze.get(*cell) != PATH:
+            return False
+        else:
+            self.checkpoints.append(cell)
+        return True
+
+    def run_search(self, search):
+        # Drive a search engine, recording each expanded cell for visualization
+        # Out-of-core mazes are not recorded, keeping memory bounded
+        cols = self.maze.cols
+        record = not getattr(self.maze, "out_of_core", False)
+        tracer = self.tracer
+        for index in search.steps():
+            cell = divmod(index, cols)
+            back = search.owner is not None and search.owner[index] == maze_search.BACKWARD
+            if record:
+                if back:
+                    self.visited_back.add(cell)
+                else:
+                    self.visited.add(cell)  # Mark cell as explored
+            if tracer is not None:
+                tracer.record(index, back)
+            yield cell  # Yield the expanded cell for step-by-step visualization
+        if search.path is not None:
+            self.path = [divmod(index, cols) for index in search.path]
+
+    def goal_field(self):
+        # Distance field to the end cell, rebuilt only when the maze, the end or
+        # (through Grid.set) any cell has changed since it was computed
+        end = self.maze.index(self.end)
+        if self.field is None or not self.field.is_current(self.maze, end):
+            self.field = maze_distance.DistanceField(self.maze, end)
+        return self.field
+
+    def path_from(self, start):
+        # Shortest path from start to the end through the cached distance field
+        path = self.goal_field().path(self.maze.index(start))
+        cols = self.maze.cols
+        return [divmod(index, cols) for index in path] if path else []
+
+    def paths_from(self, starts):
+        # path_from for many start cells at once
+        cols = self.maze.cols
+        paths = self.goal_field().paths([self.maze.index(start) for start in starts])
+        return [[divmod(index, cols) for index in path] if path else [] for path in paths]
+
+    def distances_from(self, starts):
+        # Moves from each start cell to the end, -1 where unreachable
+        return self.goal_field().distances([self.maze.index(start) for start in starts])
+
+    def set_cell(self, row, col, value):
+        # Change one cell, patching the cached hierarchy and planner instead of
+        # dropping them (unless they were already out of date)
+        # Opening a cell joins it into the disjoint sets; walling an open cell
+        # may split a set, which they cannot undo, so they go out of date
+        index = self.maze.index((row, col))
+        patch = [cache for cache in (self.hierarchy, self.planner) if cache is not None and cache.is_current(self.maze)]
+        sets = self.components if self.components is not None and self.components.is_current(self.maze) else None
+        was_open = self.maze.cells[index] == PATH
+        self.maze.set(row, col, value)
+        for cache in patch:
+            cache.update_cell(index)
+        if sets is not None and (value == PATH or not was_open):
+            if value == PATH:
+                sets.open_cell(index)
+            sets.mark_current()
+
+    def toggle_wall(self, cell):
+        # Turn a wall into a path or back; the start, end and checkpoints cannot be walled
+        if cell in (self.start, self.end) or cell in self.checkpoints:
+            return False
+        row, col = cell
+        self.set_cell(row, col, PATH if self.maze.get(row, col) == WALL else WALL)
+        return True
+
+    def replan(self):
+        # New shortest path after wall edits, repairing the planner's previous
+        # search when it can (a fresh planner does a full search). Records the
+        # repaired cells and, in replan_work, how they compare with the
+        # planner's first search from scratch (kept, not run again per edit)
+        start, end = self.maze.index(self.start), self.maze.index(self.end)
+        planner = self.planner
+        if planner is None or not planner.is_current(self.maze) or (planner.start, planner.goal) != (start, end):
+            planner = self.planner = maze_dstar.LifelongPlanner(self.maze, start, end)
+        cols = self.maze.cols
+        self.repaired = {divmod(index, cols) for index in planner.steps()}
+        self.path = [divmod(index, cols) for index in planner.path] if planner.path else []
+        self.visited = set()
+        self.visited_back = set()
+        self.stats = None
+        self.replan_work = (len(self.repaired), planner.first_expanded)
+        return self.path
+
+    def hierarchical_path(self, start=None, goal=None, cluster=32):
+        # HPA* path between two cells (default: start and end) on the cached
+        # hierarchy; near-shortest, built once per maze and patched by set_cell
+        if self.hierarchy is None or self.hierarchy.cluster != cluster or not self.hierarchy.is_current(self.maze):
+            self.hierarchy = maze_hpa.HierarchicalMap(self.maze, cluster)
+        path = self.hierarchy.path(self.maze.index(start or self.start), self.maze.index(goal or self.end))
+        cols = self.maze.cols
+        return [divmod(index, cols) for index in path] if path else []
+
+    def generate_maze(self, rows, cols, extra_wall_percent=0.1, seed=None):
+        # Without a seed one is drawn from the global random module, so the maze
+        # can still be reproduced from self.seed (or by seeding random globally)
+        if seed is None:
+            seed = random.randrange(2**63)
+        rng = random.Random(seed)
+        if rows % 2 == 0: rows += 1
+        if cols % 2 == 0: cols += 1
+        maze = Grid(rows, cols)
+        cells = maze.cells
+        # DFS cells all sit on odd coordinates and start out as walls, so a carved
+        # cell doubles as "visited" and no separate set is needed
+        stack = array('I', [cols + 1])
+        # Everything the DFS carves is one tree, so its cells are joined straight
+        # to the first cell's set; later openings go through open_cell
+        sets = maze_unionfind.DisjointSet(maze)
+        parent = sets.parent
+        root = cols + 1
+        carved = 1
+
+        # Iterative DFS to create a perfect maze
+        while stack:
+            current = stack[-1]  # Peek at top of stack (don’t pop yet)
+            cells[current] = PATH
+            x, y = divmod(current, cols)
+            dirs = [(0, 2), (2, 0), (0, -2), (-2, 0)]
+            rng.shuffle(dirs)
+            for dx, dy in dirs:
+                new_x = x + dx
+                new_y = y + dy
+                if 0 <= new_x < rows and 0 <= new_y < cols and cells[new_x * cols + new_y] == WALL:
+                    cells[(x + dx//2) * cols + y + dy//2] = PATH
+                    stack.append(new_x * cols + new_y)
+                    parent[(x + dx//2) * cols + y + dy//2] = parent[new_x * cols + new_y] = root
+                    carved += 2
+                    break  # Move to next cell immediately
+            else:
+                stack.pop()  # Backtrack if no unvisited neighbors
+        parent[root] = -carved
+
+        # Ensure start and end are connected
+        cells[0] = PATH
+        cells[rows * cols - 1] = PATH
+        if cells[1] == WALL and cells[cols] == WALL:
+            cells[1] = PATH
+        # The end cell has even coordinates, so the DFS never reaches it
+        end_x = rows-1
+        end_y = cols-1
+        if end_x > 1 and maze.get(end_x-1, end_y) == PATH:
+            maze.set(end_x-2, end_y, PATH)
+        elif end_y > 1 and maze.get(end_x, end_y-1) == PATH:
+            maze.set(end_x, end_y-2, PATH)
+        else:
+            maze.set(rows-2, cols-1, PATH)
+        # Join the cells opened outside the DFS: start, end and their links
+        for index in (0, 1, (end_x-2) * cols + end_y, end_x * cols + end_y-2, (rows-2) * cols + cols-1, end_x * cols + end_y):
+            if cells[index] == PATH:
+                sets.open_cell(index)
+
+        # Controlled extra wall removal (scaled for maze size)
+        # Walls are drawn at random straight from the grid instead of shuffling a
+        # list of all of them; a wall that was drawn but kept is marked TRIED
+        total = rows * cols
+        # Cap extra walls removed to maintain maze structure
+        extra = min(int(total * extra_wall_percent), cells.count(WALL) // 2)
+        tried = 0
+        while tried < extra:
+            wall = rng.randrange(total)
+            if cells[wall] != WALL:
+                continue
+            tried += 1
+            x, y = divmod(wall, cols)
+            open_count = ((x + 1 < rows and cells[wall + cols] == PATH) +
+                          (x > 0 and cells[wall - cols] == PATH) +
+                          (y + 1 < cols and cells[wall + 1] == PATH) +
+                          (y > 0 and cells[wall - 1] == PATH))
+            # Only remove if it connects exactly two paths (avoids over-opening)
+            if open_count == 2:
+                cells[wall] = PATH
+                sets.open_cell(wall)
+            else:
+                cells[wall] = TRIED
+        if extra:
+            maze.cells = cells.replace(bytes([TRIED]), bytes([WALL]))
+        sets.mark_current()
+
+        self.maze = maze
+        self.components = sets
+        self.seed = seed
+        self.start = (0, 0)
+        self.end = (rows-1, cols-1)
+        self.checkpoints = []
+        self.path = []
+        self.visited = set()
+        self.visited_back = set()
+
+    def generate_eller_maze(self, rows, cols, extra_wall_percent=0.0, seed=None):
+        # Row-by-row Eller's algorithm (see maze_generators); same layout as generate_maze
+        if seed is None:
+            seed = random.randrange(2**63)
+        self.maze = maze_generators.eller_grid(rows, cols, extra_wall_percent, seed)
+        self.components = None
+        self.seed = seed
+        self.start = (0, 0)
+        self.end = (self.maze.rows-1, self.maze.cols-1)
+        self.checkpoints = []
+        self.path = []
+        self.visited = set()
+        self.visited_back = set()
+
+    def generate_tiled_maze(self, rows, cols, extra_wall_percent=0.0, seed=None, tile=64, workers=None):
+        # Tiles carved on a process pool (see maze_generators.tiled_grid); same
+        # layout as generate_maze, and the same maze for a seed on any number of workers
+        if seed is None:
+            seed = random.randrange(2**63)
+        self.maze = maze_generators.tiled_grid(rows, cols, extra_wall_percent, seed, tile, workers)
+        self.components = None
+        self.seed = seed
+        self.start = (0, 0)
+        self.end = (self.maze.rows-1, self.maze.cols-1)
+        self.checkpoints = []
+        self.path = []
+        self.visited = set()
+        self.visited_back = set()
+
+    def open_mapped(self, path):
+        # Use a packed maze file (see maze_io) through mmap instead of loading it
+        self.maze = maze_io.PackedGrid(path)
+        self.components = None
+        self.seed = self.maze.seed
+        self.start = self.maze.cell(self.maze.start)
+        self.end = self.maze.cell(self.maze.end)
+        self.checkpoints = []
+        self.path = []
+        self.visited = set()
+        self.visited_back = set()
+
+    def save(self, path, include_solution=True):
+        # Write the maze, its seed and (optionally) the current solution to a
+        # packed maze file (see maze_io)
+        grid = self.maze
+        solution = visited = None
+        if include_solution:
+            solution = [grid.index(cell) for cell in self.path]
+            if self.visited or self.visited_back:
+                visited = bytearray(grid.rows * grid.cols)
+                for cell in self.visited | self.visited_back:
+                    visited[grid.index(cell)] = 1
+        maze_io.save_maze(path, grid, self.start, self.end, self.seed, solution, visited)
+
+    def load(self, path):
+        # Load a packed maze file into memory, restoring any saved solution
+        saved = maze_io.load_maze(path)
+        self.maze = saved.grid
+        self.components = None
+        self.seed = saved.seed
+        self.start = saved.grid.cell(saved.start)
+        self.end = saved.grid.cell(saved.end)
+        self.checkpoints = []
+        cols = saved.grid.cols
+        self.path = [divmod(index, cols) for index in saved.solution] if saved.solution else []
+        if saved.visited:
+            self.visited = {divmod(index, cols) for index in compress(range(len(saved.visited)), saved.visited)}
+        else:
+            self.visited = set()
+        self.visited_back = set()
+
+    def check_solvable(self):
+        # Two find() calls when the maze has disjoint sets (relabeled once after
+        # walls were added); otherwise a connectivity-only bidirectional search
+        start, end = self.maze.index(self.start), self.maze.index(self.end)
+        sets = self.current_components()
+        if sets is not None:
+            return sets.connected(start, end)
+        if getattr(self.maze, "out_of_core", False):
+            return maze_io.TiledSearch(self.maze, start, end).run() is not None
+        return maze_search.connected(self.maze, start, end)
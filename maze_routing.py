@@ -0,0 +1,202 @@
+import multiprocessing
+from maze_grid import PATH, WALL
+from maze_search import check_cancelled
+
+# Multi-checkpoint routing: the shortest walk from a start through a set of
+# checkpoints, visited in any order, to an end. Pairwise distances come from
+# one breadth-first search per node that stops once it has reached every node
+# after it (the matrix is symmetric), run on a process pool for big mazes. The
+# visiting order is exact (Held-Karp dynamic programming over subsets) for up
+# to EXACT_LIMIT checkpoints, and nearest neighbor improved by 2-opt beyond.
+# Node numbers are positions in the node list: 0 is the start, the last one
+# the end, the checkpoints in between. Passing a threading.Event as cancelled
+# makes the long steps raise maze_search.SearchCancelled once it is set.
+
+EXACT_LIMIT = 12             # Most checkpoints ordered exactly: O(2^K K^2) time, O(2^K K) memory
+PARALLEL_CELLS = 1 << 22     # Cells x searches below which the pool costs more than it saves
+INF = float("inf")
+
+
+def framed_cells(grid):
+    # Copy of the grid's cells inside a border of walls, width = cols + 2, so
+    # the searches need no bounds checks; returns (cells, width)
+    rows, cols = grid.rows, grid.cols
+    width = cols + 2
+    cells = bytearray([WALL]) * (width * (rows + 2))
+    for r in range(rows):
+        at = (r + 1) * width + 1
+        cells[at:at + cols] = grid.cells[r * cols:(r + 1) * cols]
+    return cells, width
+
+
+def bfs_distances(cells, width, source, targets):
+    # Moves from source to each of targets (framed indices), -1 where
+    # unreachable. Like the solvers, a walled source may still step onto its
+    # open neighbors; a walled target is never reached.
+    dist = [-1] * len(targets)
+    wanted = {}                  # Target -> positions in targets still to reach
+    for position, target in enumerate(targets):
+        wanted.setdefault(target, []).append(position)
+    for position in wanted.pop(source, ()):
+        dist[position] = 0
+    cells = bytearray(cells)     # Reached cells are walled off in this copy
+    cells[source] = WALL
+    frontier = [source]
+    level = 0
+    while frontier and wanted:
+        level += 1
+        next_frontier = []
+        append = next_frontier.append
+        for current in frontier:
+            for neighbor in (current + 1, current + width, current - 1, current - width):
+                if cells[neighbor] == PATH:
+                    cells[neighbor] = WALL
+                    append(neighbor)
+                    if neighbor in wanted:
+                        for position in wanted.pop(neighbor):
+                            dist[position] = level
+        frontier = next_frontier
+    return dist
+
+
+_worker_cells = None             # (cells, width) of the maze, set once per pool process
+
+
+def _init_worker(cells, width):
+    global _worker_cells
+    _worker_cells = (cells, width)
+
+
+def _distance_row(task):
+    # Pool entry point: one bfs_distances on the maze given to _init_worker
+    cells, width = _worker_cells
+    return bfs_distances(cells, width, *task)
+
+
+def distance_matrix(grid, nodes, workers=None, cancelled=None):
+    # Pairwise moves between nodes (linear indices) as a list of rows, -1 for
+    # unreachable pairs. The search from node i only looks for the nodes after it.
+    # workers=None uses every core when the searches are big enough to pay
+    # for the pool (see PARALLEL_CELLS) and one otherwise.
+    cells, width = framed_cells(grid)
+    cols = grid.cols
+    framed = [(index // cols + 1) * width + index % cols + 1 for index in nodes]
+    tasks = [(framed[i], framed[i + 1:]) for i in range(len(nodes) - 1)]
+    if workers is None:
+        workers = multiprocessing.cpu_count() if len(cells) * len(tasks) >= PARALLEL_CELLS else 1
+    workers = min(workers, len(tasks))
+    rows = []
+    if workers <= 1:
+        for task in tasks:
+            check_cancelled(cancelled)
+            rows.append(bfs_distances(cells, width, *task))
+    else:
+        # Rows are collected as they come so a cancel is seen between them;
+        # leaving the with block terminates the pool's remaining searches
+        with multiprocessing.Pool(workers, _init_worker, (bytes(cells), width)) as pool:
+            for row in pool.imap(_distance_row, tasks):
+                check_cancelled(cancelled)
+                rows.append(row)
+    n = len(nodes)
+    matrix = [[0] * n for _ in range(n)]
+    for i, row in enumerate(rows):
+        for j, d in enumerate(row, i + 1):
+            matrix[i][j] = matrix[j][i] = d
+    return matrix
+
+
+def costs(matrix):
+    # The matrix with unreachable pairs as INF, for the ordering functions
+    return [[INF if d < 0 else d for d in row] for row in matrix]
+
+
+def held_karp(cost, cancelled=None):
+    # Exact shortest order: Held-Karp over subsets of the checkpoints; returns
+    # (length, node order from start to end), INF length if there is no route
+    k = len(cost) - 2
+    end = k + 1
+    if k == 0:
+        return cost[0][end], [0, end]
+    best = [[INF] * k for _ in range(1 << k)]  # best[subset][j]: start -> subset, ending at checkpoint j
+    parent = [[-1] * k for _ in range(1 << k)]
+    for j in range(k):
+        best[1 << j][j] = cost[0][j + 1]
+    for subset in range(1, 1 << k):
+        if subset & 255 == 0:
+            check_cancelled(cancelled)
+        row = best[subset]
+        for j in range(k):
+            length = row[j]
+            if length == INF:
+                continue
+            from_j = cost[j + 1]
+            for following in range(k):
+                if subset >> following & 1:
+                    continue
+                candidate = length + from_j[following + 1]
+                grown = subset | 1 << following
+                if candidate < best[grown][following]:
+                    best[grown][following] = candidate
+                    parent[grown][following] = j
+    full = (1 << k) - 1
+    length, last = min((best[full][j] + cost[j + 1][end], j) for j in range(k))
+    if length == INF:
+        return INF, None
+    order = [end]
+    subset = full
+    while last >= 0:
+        order.append(last + 1)
+        subset, last = subset & ~(1 << last), parent[subset][last]
+    order.append(0)
+    order.reverse()
+    return length, order
+
+
+def route_length(cost, order):
+    return sum(cost[a][b] for a, b in zip(order, order[1:]))
+
+
+def nearest_neighbor(cost):
+    # Greedy order: always on to the closest checkpoint not yet visited
+    end = len(cost) - 1
+    left = set(range(1, end))
+    order = [0]
+    while left:
+        current = cost[order[-1]]
+        following = min(left, key=current.__getitem__)
+        order.append(following)
+        left.remove(following)
+    order.append(end)
+    return order
+
+
+def two_opt(cost, order, cancelled=None):
+    # Reverse checkpoint runs while that shortens the route (start and end stay)
+    order = list(order)
+    improved = True
+    while improved:
+        check_cancelled(cancelled)
+        improved = False
+        for i in range(1, len(order) - 2):
+            for j in range(i + 1, len(order) - 1):
+                a, b, c, d = order[i - 1], order[i], order[j], order[j + 1]
+                if cost[a][c] + cost[b][d] < cost[a][b] + cost[c][d]:
+                    order[i:j + 1] = order[i:j + 1][::-1]
+                    improved = True
+    return order
+
+
+def visit_order(matrix, exact_limit=EXACT_LIMIT, cancelled=None):
+    # (length, node order from start to end) for a distance_matrix, exact up to
+    # exact_limit checkpoints; (-1, None) when some node cannot be reached
+    cost = costs(matrix)
+    if any(d == INF for d in cost[0]):
+        return -1, None
+    if len(matrix) - 2 <= exact_limit:
+        length, order = held_karp(cost, cancelled)
+    else:
+        order = two_opt(cost, nearest_neighbor(cost), cancelled)
+        length = route_length(cost, order)
+    if length == INF:
+        return -1, None
+    return length, order
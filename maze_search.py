@@ -0,0 +1,416 @@
+import heapq
+import time
+import tracemalloc
+from maze_grid import PATH, index_array
+
+# Search engines over a Grid's linear cell indices (row * cols + col).
+# Each engine exposes steps(), a generator yielding every expanded index, and
+# run(), which drives it to completion; path is the list of indices from start
+# to goal afterwards, or None if the goal cannot be reached.
+# Passing stats=SearchStats() makes an engine fill in its counters; without it
+# the engines run the same loops with plain bytearrays and heapq functions.
+
+
+class SearchCancelled(Exception):
+    # A background solve was cancelled during a phase that yields no cells
+    # (graph builds, the routing distance matrix); see maze_worker
+    pass
+
+
+def check_cancelled(cancelled):
+    # Raise SearchCancelled once the threading.Event cancelled (if any) is set
+    if cancelled is not None and cancelled.is_set():
+        raise SearchCancelled()
+
+
+class SearchStats:
+    # Counters and timings for one search
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory  # Also measure peak memory (slow)
+        self.expanded = 0            # Cells expanded
+        self.pushes = 0              # Frontier insertions
+        self.pops = 0                # Frontier removals, stale ones included
+        self.stale_pops = 0          # Pops of cells already expanded
+        self.neighbor_checks = 0     # Grid cells read while looking at neighbors
+        self.peak_frontier = 0       # Largest frontier size, stale entries included
+        self.peak_memory = None      # Peak bytes allocated during the search (tracemalloc)
+        self.phases = {}             # Phase name -> seconds (setup, search, trace)
+        self.cache = None            # "memory" or "disk" when replayed from a maze_cache.SolutionCache
+        self.mark = None
+
+    def as_dict(self):
+        return {key: value for key, value in vars(self).items() if key != "mark"}
+
+    def lap(self, phase):
+        # Add the time since the previous lap to phase
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.mark
+        self.mark = now
+
+    def record(self, search, expansions):
+        # Wrap an engine's expansion generator, timing it and tracking memory
+        # Time the caller spends between expansions is left out of the phases.
+        # The remaining time after the engine's last lap counts as tracing the
+        # path if one was found, searching otherwise
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        clock = time.perf_counter
+        self.mark = clock()
+        try:
+            for index in expansions:
+                paused = clock()
+                yield index
+                self.mark += clock() - paused
+        finally:
+            self.lap("trace" if search.path is not None else "search")
+            self.expanded = search.expanded
+            if tracing:
+                self.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+    def counted_heap(self, heap):
+        # heappush/heappop stand-ins that count operations and the peak heap size
+        stats = self
+        stats.pushes += len(heap)
+        stats.peak_frontier = max(stats.peak_frontier, len(heap))
+
+        def push(heap, item):
+            stats.pushes += 1
+            heapq.heappush(heap, item)
+            if len(heap) > stats.peak_frontier:
+                stats.peak_frontier = len(heap)
+
+        def pop(heap):
+            stats.pops += 1
+            return heapq.heappop(heap)
+
+        return push, pop
+
+
+class CountedCells:
+    # Read-only stand-in for grid.cells counting every read as a neighbor check
+    __slots__ = ("cells", "stats")
+
+    def __init__(self, cells, stats):
+        self.cells = cells
+        self.stats = stats
+
+    def __getitem__(self, index):
+        self.stats.neighbor_checks += 1
+        return self.cells[index]
+
+
+class AStarSearch:
+    # A* with array-backed g-costs and parents, a closed map and packed heap keys
+    def __init__(self, grid, start, goal, stats=None):
+        self.grid = grid
+        self.start = start           # Linear index of the start cell
+        self.goal = goal             # Linear index of the goal cell
+        self.stats = stats           # SearchStats to fill in, or None
+        self.path = None             # Indices from start to goal once found
+        self.expanded = 0            # Number of cells expanded so far
+        self.closed = None           # Byte per cell, 1 once expanded
+        self.owner = None            # Byte per cell naming the frontier that reached it
+
+    def run(self):
+        for _ in self.steps():
+            pass
+        return self.path
+
+    def steps(self):
+        if self.stats is None:
+            return self.search()
+        return self.stats.record(self, self.search())
+
+    def search(self):
+        grid = self.grid
+        cells, rows, cols = grid.cells, grid.rows, grid.cols
+        size = rows * cols
+        start, goal = self.start, self.goal
+        g_score = index_array(size)
+        parent = index_array(size)
+        closed = self.closed = bytearray(size)
+        goal_r, goal_c = divmod(goal, cols)
+        # Neighbor offsets with their row/col deltas (right, down, left, up)
+        offsets = ((1, 0, 1), (cols, 1, 0), (-1, 0, -1), (-cols, -1, 0))
+
+        # Heap entries are single ints packing (f, size - g, index), so ties on f
+        # go to the larger g and no tuple is built per push
+        shift = size.bit_length()
+        mask = (1 << shift) - 1
+        start_r, start_c = divmod(start, cols)
+        g_score[start] = 0
+        heap = [(((abs(start_r - goal_r) + abs(start_c - goal_c)) << shift | mask) << shift) | start]
+        pop = heapq.heappop
+        push = heapq.heappush
+        stats = self.stats
+        if stats is not None:
+            cells = CountedCells(cells, stats)
+            push, pop = stats.counted_heap(heap)
+            stats.lap("setup")
+
+        while heap:
+            current = pop(heap) & mask
+            if closed[current]:
+                if stats is not None:
+                    stats.stale_pops += 1
+                continue  # Stale entry left behind by a cheaper push
+            if current == goal:
+                if stats is not None:
+                    stats.lap("search")
+                self.path = self.trace(parent, current)
+                return
+            closed[current] = 1
+            self.expanded += 1
+            yield current
+
+            new_g = g_score[current] + 1
+            row, col = divmod(current, cols)
+            for step, dr, dc in offsets:
+                nr = row + dr
+                nc = col + dc
+                if 0 <= nr < rows and 0 <= nc < cols:
+                    neighbor = current + step
+                    if cells[neighbor] == PATH and not closed[neighbor]:
+                        old_g = g_score[neighbor]
+                        if old_g < 0 or new_g < old_g:
+                            g_score[neighbor] = new_g
+                            parent[neighbor] = current
+                            f = new_g + abs(nr - goal_r) + abs(nc - goal_c)
+                            push(heap, (((f << shift) | (mask - new_g)) << shift) | neighbor)
+
+    def trace(self, parent, index):
+        # Follow parent links back to the start
+        path = [index]
+        while index != self.start:
+            index = parent[index]
+            path.append(index)
+        path.reverse()
+        return path
+
+
+class JumpPointSearch(AStarSearch):
+    # Jump Point Search for 4-connected grids with uniform move cost
+    # Straight runs are scanned without queueing; only jump points (cells with a
+    # forced neighbor, or the goal) are expanded. path is expanded back to every
+    # cell, so it matches what A* reports.
+    def search(self):
+        grid = self.grid
+        cells, rows, cols = grid.cells, grid.rows, grid.cols
+        size = rows * cols
+        start, goal = self.start, self.goal
+        g_score = index_array(size)
+        parent = index_array(size)
+        closed = self.closed = bytearray(size)
+        goal_r, goal_c = divmod(goal, cols)
+
+        def is_open(r, c):
+            return 0 <= r < rows and 0 <= c < cols and cells[r * cols + c] == PATH
+
+        def jump_horizontal(r, c, dc):
+            # Scan along a row from (r, c); returns the jump point index or -1
+            while is_open(r, c):
+                index = r * cols + c
+                if index == goal:
+                    return index
+                if ((is_open(r - 1, c) and not is_open(r - 1, c - dc)) or
+                    (is_open(r + 1, c) and not is_open(r + 1, c - dc))):
+                    return index  # Forced neighbor above or below
+                c += dc
+            return -1
+
+        def jump_vertical(r, c, dr):
+            # Scan along a column, probing each row sideways for jump points
+            while is_open(r, c):
+                index = r * cols + c
+                if index == goal:
+                    return index
+                if ((is_open(r, c - 1) and not is_open(r - dr, c - 1)) or
+                    (is_open(r, c + 1) and not is_open(r - dr, c + 1))):
+                    return index  # Forced neighbor left or right
+                if jump_horizontal(r, c + 1, 1) >= 0 or jump_horizontal(r, c - 1, -1) >= 0:
+                    return index
+                r += dr
+            return -1
+
+        shift = size.bit_length()
+        mask = (1 << shift) - 1
+        start_r, start_c = divmod(start, cols)
+        g_score[start] = 0
+        heap = [(((abs(start_r - goal_r) + abs(start_c - goal_c)) << shift | mask) << shift) | start]
+        pop = heapq.heappop
+        push = heapq.heappush
+        stats = self.stats
+        if stats is not None:
+            cells = CountedCells(cells, stats)
+            push, pop = stats.counted_heap(heap)
+            stats.lap("setup")
+
+        while heap:
+            current = pop(heap) & mask
+            if closed[current]:
+                if stats is not None:
+                    stats.stale_pops += 1
+                continue  # Stale entry left behind by a cheaper push
+            if current == goal:
+                if stats is not None:
+                    stats.lap("search")
+                self.path = self.expand(self.trace(parent, current))
+                return
+            closed[current] = 1
+            self.expanded += 1
+            yield current
+
+            row, col = divmod(current, cols)
+            # Prune to the natural and forced directions for the way we arrived
+            if current == start:
+                directions = ((0, 1), (1, 0), (0, -1), (-1, 0))
+            else:
+                parent_r, parent_c = divmod(parent[current], cols)
+                if parent_r == row:
+                    dc = 1 if col > parent_c else -1
+                    directions = ((0, dc), (1, 0), (-1, 0))
+                else:
+                    dr = 1 if row > parent_r else -1
+                    directions = ((dr, 0), (0, 1), (0, -1))
+
+            for dr, dc in directions:
+                if dr:
+                    jump = jump_vertical(row + dr, col, dr)
+                else:
+                    jump = jump_horizontal(row, col + dc, dc)
+                if jump < 0 or closed[jump]:
+                    continue
+                jump_r, jump_c = divmod(jump, cols)
+                new_g = g_score[current] + abs(jump_r - row) + abs(jump_c - col)
+                old_g = g_score[jump]
+                if old_g < 0 or new_g < old_g:
+                    g_score[jump] = new_g
+                    parent[jump] = current
+                    f = new_g + abs(jump_r - goal_r) + abs(jump_c - goal_c)
+                    push(heap, (((f << shift) | (mask - new_g)) << shift) | jump)
+
+    def expand(self, jump_points):
+        # Fill in the straight runs between consecutive jump points
+        cols = self.grid.cols
+        path = [jump_points[0]]
+        for a, b in zip(jump_points, jump_points[1:]):
+            step = (1 if b > a else -1) * (1 if a // cols == b // cols else cols)
+            path.extend(range(a + step, b + step, step))
+        return path
+
+
+FORWARD = 1                  # Cell reached from the start
+BACKWARD = 2                 # Cell reached from the goal
+
+
+class BidirectionalSearch(AStarSearch):
+    # Bidirectional breadth-first search growing one frontier from each end
+    # The smaller frontier advances a whole level at a time; the search stops at
+    # the end of the level in which the two sides first touch, which keeps the
+    # joined path shortest. owner records which side reached each cell.
+    def search(self):
+        grid = self.grid
+        cells, rows, cols = grid.cells, grid.rows, grid.cols
+        size = rows * cols
+        start, goal = self.start, self.goal
+        owner = self.owner = bytearray(size)
+        if start == goal:
+            self.path = [start]
+            return
+        if cells[goal] != PATH:
+            return
+        parent = index_array(size)
+        dist = index_array(size)
+        owner[start] = FORWARD
+        owner[goal] = BACKWARD
+        dist[start] = dist[goal] = 0
+        frontiers = {FORWARD: [start], BACKWARD: [goal]}
+        offsets = ((1, 0, 1), (cols, 1, 0), (-1, 0, -1), (-cols, -1, 0))
+        best = -1
+        meeting = None
+        stats = self.stats
+        if stats is not None:
+            cells = CountedCells(cells, stats)
+            stats.pushes = stats.peak_frontier = 2
+            stats.lap("setup")
+
+        while frontiers[FORWARD] and frontiers[BACKWARD]:
+            side = FORWARD if len(frontiers[FORWARD]) <= len(frontiers[BACKWARD]) else BACKWARD
+            next_frontier = []
+            if stats is not None:
+                stats.pops += len(frontiers[side])
+            for current in frontiers[side]:
+                self.expanded += 1
+                yield current
+                new_dist = dist[current] + 1
+                row, col = divmod(current, cols)
+                for step, dr, dc in offsets:
+                    nr = row + dr
+                    nc = col + dc
+                    if 0 <= nr < rows and 0 <= nc < cols:
+                        neighbor = current + step
+                        if cells[neighbor] != PATH and neighbor != start:
+                            continue
+                        other = owner[neighbor]
+                        if not other:
+                            owner[neighbor] = side
+                            dist[neighbor] = new_dist
+                            parent[neighbor] = current
+                            next_frontier.append(neighbor)
+                        elif other != side and (best < 0 or new_dist + dist[neighbor] < best):
+                            best = new_dist + dist[neighbor]
+                            meeting = (current, neighbor) if side == FORWARD else (neighbor, current)
+            if stats is not None:
+                stats.pushes += len(next_frontier)
+                stats.peak_frontier = max(stats.peak_frontier, len(frontiers[FORWARD]) + len(frontiers[BACKWARD]) + len(next_frontier))
+            if meeting:
+                if stats is not None:
+                    stats.lap("search")
+                self.path = self.join(parent, *meeting)
+                return
+            frontiers[side] = next_frontier
+
+    def join(self, parent, forward_end, backward_end):
+        # Start-side chain up to forward_end, then back down the goal side
+        path = self.trace(parent, forward_end)
+        index = backward_end
+        path.append(index)
+        while index != self.goal:
+            index = parent[index]
+            path.append(index)
+        return path
+
+
+def connected(grid, start, goal):
+    # Connectivity-only bidirectional search: True if goal is reachable from start
+    # Keeps a single owner byte per cell and stops as soon as the two sides touch
+    cells, rows, cols = grid.cells, grid.rows, grid.cols
+    if start == goal:
+        return True
+    if cells[goal] != PATH:
+        return False
+    owner = bytearray(rows * cols)
+    owner[start] = FORWARD
+    owner[goal] = BACKWARD
+    frontiers = {FORWARD: [start], BACKWARD: [goal]}
+    offsets = ((1, 0, 1), (cols, 1, 0), (-1, 0, -1), (-cols, -1, 0))
+    while frontiers[FORWARD] and frontiers[BACKWARD]:
+        side = FORWARD if len(frontiers[FORWARD]) <= len(frontiers[BACKWARD]) else BACKWARD
+        next_frontier = []
+        for current in frontiers[side]:
+            row, col = divmod(current, cols)
+            for step, dr, dc in offsets:
+                if 0 <= row + dr < rows and 0 <= col + dc < cols:
+                    neighbor = current + step
+                    if cells[neighbor] != PATH and neighbor != start:
+                        continue
+                    other = owner[neighbor]
+                    if not other:
+                        owner[neighbor] = side
+                        next_frontier.append(neighbor)
+                    elif other != side:
+                        return True
+        frontiers[side] = next_frontier
+    return False
@@ -1,8 +1,14 @@
-import random
-import pygame
-import heapq
 import time
 import math
+from maze_model import MazeModel, ALGORITHMS, WALL
+from collections import deque
+from maze_cache import SolutionCache
+from maze_worker import SolveWorker
+
+# pygame is imported by main() so the model can be used without a display;
+# the fonts and screen below are also created there
+pygame = None
+font = title_font = alert_font = close_font = screen = None
 
 # Define colors with RGB values for visual consistency
 WHITE = (255, 255, 255)      # Background and open paths
@@ -10,24 +16,52 @@ BLACK = (0, 0, 0)            # Walls and text
 RED = (255, 80, 80)          # End position marker
 GREEN = (80, 255, 80)        # Start position marker
 BLUE = (100, 100, 255)       # Cells visited during solving
+ORANGE = (255, 170, 80)      # Cells visited by the backward frontier
 GRAY = (150, 150, 150)       # Default button color
 DARK_GRAY = (100, 100, 100)  # Button outlines and shadows
 YELLOW = (255, 255, 100)     # Path when maze is solved
+TEAL = (0, 170, 170)         # Checkpoints of a multi-goal route
+PURPLE = (190, 120, 255)     # Cells repaired by the last replan
 LIGHT_GRAY = (200, 200, 200) # Button color on hover
 SHADOW = (50, 50, 50, 100)   # Shadow effect with transparency
 MENU_TOP = (180, 220, 255)   # Top color for menu gradient
 MENU_BOTTOM = (80, 120, 180) # Bottom color for menu gradient
 
 # Set window and cell dimensions
-CELL_SIZE = 16               # Size of each maze cell in pixels
+CELL_SIZE = 16               # Size of each maze cell in pixels (the largest zoom a new maze starts at)
 WINDOW_WIDTH = 1000          # Window width in pixels
 WINDOW_HEIGHT = 800          # Window height in pixels
+MAZE_AREA = (0, 100, WINDOW_WIDTH, WINDOW_HEIGHT - 150)  # Screen area the maze view fills
+
+# Zoom levels in pixels per cell. Below 1 a pixel stands for several cells and
+# the view is downsampled (level of detail); grid lines start at GRID_ZOOM
+ZOOM_LEVELS = (1/32, 1/16, 1/8, 1/4, 1/2, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32)
+GRID_ZOOM = 8
+GRID_KEY = (255, 0, 255)     # Transparent color of the cached grid-line overlay
+PAN_PIXELS = 100             # How far one arrow key press pans the view
+
+# The maze view is an 8-bit surface: one palette index per cell
+PALETTE = (WHITE, BLACK, GREEN, RED, YELLOW, PURPLE, BLUE, ORANGE, GRAY, TEAL)
+OPEN, WALL_COLOR, START, END, ON_PATH, REPAIRED, VISITED, VISITED_BACK, GRID, CHECKPOINT = range(len(PALETTE))
+
+# Solve animation speeds: label -> (expansions per frame, milliseconds per frame)
+# None leaves that limit off, so "Instant" finishes the solve within one frame
+SOLVE_SPEEDS = {
+    "Slow": (1, None),
+    "Fast": (20, None),
+    "Turbo": (None, 8),
+    "Instant": (None, None),
+}
+
+# Pulsing alert: scale steps on each side of 1, each pre-rendered once
+ALERT_STEPS = 20
 
 # Maze difficulty options with base sizes (rows, cols)
 DIFFICULTIES = {
     "Easy": (10, 10),
     "Medium": (20, 20),
-    "Hard": (30, 30)
+    "Hard": (30, 30),
+    "Huge": (1000, 1000),
 }
 
 class Button:
@@ -36,36 +70,41 @@ class Button:
         self.rect = pygame.Rect(x, y, width, height)  # Button's bounding box
         self.text = font.render(text, True, WHITE) if font else text   # Rendered text for button
         self.action = action                          # Function to call on click
+        self.faces = None                             # (normal, hover) surfaces, rendered on first draw
+
+    def render_faces(self):
+        # Both looks of the button with shadow and outline, on transparent surfaces
+        faces = []
+        body = pygame.Rect(0, 0, self.rect.width, self.rect.height)
+        for color in (GRAY, LIGHT_GRAY):
+            face = pygame.Surface((body.width + 5, body.height + 5), pygame.SRCALPHA)
+            pygame.draw.rect(face, SHADOW[:3], body.move(5, 5), border_radius=15)  # Opaque, as on the screen
+            pygame.draw.rect(face, color, body, border_radius=15)
+            pygame.draw.rect(face, DARK_GRAY, body, 2, border_radius=15)
+            face.blit(self.text, self.text.get_rect(center=body.center))
+            faces.append(face)
+        return faces
+
+    def hovered(self):
+        return self.rect.collidepoint(pygame.mouse.get_pos())
 
     def draw(self, screen):
-        # Draw button with shadow, hover effect, and outline
-        mouse = pygame.mouse.get_pos()
-        hover = self.rect.collidepoint(mouse)
-        pygame.draw.rect(screen, SHADOW, self.rect.move(5, 5), border_radius=15)
-        if hover:
-            pygame.draw.rect(screen, LIGHT_GRAY, self.rect, border_radius=15)
-        else:
-            pygame.draw.rect(screen, GRAY, self.rect, border_radius=15)
-        pygame.draw.rect(screen, DARK_GRAY, self.rect, 2, border_radius=15)
-        screen.blit(self.text, self.text.get_rect(center=self.rect.center))
+        # Blit the pre-rendered face for the current hover state
+        if self.faces is None:
+            self.faces = self.render_faces()
+        screen.blit(self.faces[self.hovered()], self.rect)
 
     def handle_click(self, pos):
         # Trigger action if button is clicked
         if self.rect.collidepoint(pos):
             self.action()
 
-class MazeGame:
-    # Main game class managing state, maze, and UI
+class MazeGame(MazeModel):
+    # Main game class managing state and UI on top of the maze model
     def __init__(self):
+        super().__init__()
         self.state = "menu"          # Current state: menu, playing, solving, solved
         self.difficulty = None       # Selected difficulty level
-        self.maze = None             # 2D grid: 1 = wall, 0 = path
-        self.start = None            # Start position (row, col)
-        self.end = None              # End position (row, col)
-        self.path = []               # List of coordinates for solved path
-        self.visited = set()         # Set of visited cells during solving
-        self.iterations = 0          # Count of A* steps
-        self.time = 0                # Time taken to solve maze
         self.alert_message = None    # Message for alert (e.g., "Maze Solved!")
         self.alert_color = BLACK     # Color of alert text
         self.alert_start_time = None # Timestamp for alert animation
@@ -73,323 +112,592 @@ class MazeGame:
         self.menu_buttons = []
         self.play_buttons = []       # Buttons for "playing" state
         self.solved_buttons = []     # Buttons for "solved" state
+        self.solving_buttons = []    # Buttons for "solving" state
+        self.worker = None           # SolveWorker of the active solve
+        self.pending = deque()       # (cell, from the end) found by the worker, not yet shown
+        self.solved_copy = None      # The worker's finished model, adopted once pending is shown
+        self.solve_speed = "Fast"    # Key into SOLVE_SPEEDS
+        self.full_redraw = True      # Next solving frame must redraw everything
+        self.cell_colors = None      # PALETTE index per cell, kept up to date with dirty_cells
+        self.colors_maze = None      # Grid the cell colors were built from
+        self.dirty_cells = []        # Cells to repaint on the next incremental frame
+        self.zoom = CELL_SIZE        # Pixels per cell, one of ZOOM_LEVELS
+        self.view = (0, 0)           # (row, col), fractional, at the top-left of the view when the maze overflows it
+        self.drag = None             # (mouse position, view) while panning with the right button
+        self.maze_rect = None        # Screen rect of the maze view in the last full frame
+        self.drawn_view = None       # (maze, zoom, view) the maze view on screen was drawn at
+        # Layer cache: surfaces that change rarely, rendered once and blitted
+        self.menu_background = None  # Gradient behind the menu
+        self.grid_lines = None       # (zoom, surface) of grid lines covering the maze area at that zoom
+        self.alert_box = None        # Unscaled alert panel for alert_key
+        self.alert_frames = {}       # Scale step -> pre-scaled alert and close button surfaces
+        self.alert_key = None        # (message, color) the alert surfaces show
+        self.last_frame = None       # frame_key() of the last full frame drawn
 
     def set_difficulty(self, level, rows, cols, extra_wall_percent=0.1):
         # Set difficulty, generate maze, and switch to playing state
         self.difficulty = level
         self.generate_maze(rows, cols, extra_wall_percent)
+        self.fit_view()
+        self.reset_search()
         self.state = "playing"
+        self.play_buttons = self.make_play_buttons()
+        self.solved_buttons = []
+
+    def make_buttons(self, *specs):
+        # Stack (text, action) buttons up from the bottom-right corner
+        # Without a window (headless use) there is nothing to draw, so no buttons
+        if screen is None:
+            return []
         btn_w = 140
         btn_h = 50
-        self.play_buttons = [
-            Button(WINDOW_WIDTH - 180, WINDOW_HEIGHT - 80, btn_w, btn_h, "Start", self.start_solving, font),
-            Button(WINDOW_WIDTH - 180, WINDOW_HEIGHT - 140, btn_w, btn_h, "Back", self.back_to_menu, font)
-        ]
-        self.solved_buttons = []
+        return [Button(WINDOW_WIDTH - 180, WINDOW_HEIGHT - 80 - i * 60, btn_w, btn_h, text, action, font)
+                for i, (text, action) in enumerate(specs)]
+
+    def make_play_buttons(self):
+        # Start/Back plus buttons cycling through solver algorithms and speeds
+        return self.make_buttons(("Start", self.start_solving), ("Back", self.back_to_menu),
+                                 (self.algorithm_label(), self.next_algorithm),
+                                 (self.solve_speed, self.next_speed))
+
+    def make_solved_buttons(self):
+        # Restart/Back plus solving the same maze again, with any solver; a
+        # repeated solve is replayed from the solution cache
+        return self.make_buttons(("Restart", self.restart), ("Back", self.back_to_menu),
+                                 (self.algorithm_label(), self.next_algorithm), ("Solve", self.start_solving))
+
+    def next_algorithm(self):
+        # Switch to the next solver in ALGORITHMS
+        methods = list(ALGORITHMS.values())
+        self.algorithm = methods[(methods.index(self.algorithm) + 1) % len(methods)]
+        self.play_buttons = self.make_play_buttons()
+        if self.state == "solved":
+            self.solved_buttons = self.make_solved_buttons()
+
+    def next_speed(self):
+        # Switch to the next animation speed in SOLVE_SPEEDS (also while solving)
+        speeds = list(SOLVE_SPEEDS)
+        self.solve_speed = speeds[(speeds.index(self.solve_speed) + 1) % len(speeds)]
+        self.play_buttons = self.make_play_buttons()
+        self.solving_buttons = self.make_buttons(("Back", self.back_to_menu), (self.solve_speed, self.next_speed))
+        self.full_redraw = True
 
     def start_solving(self):
-        # Start A* solving process and animate it
+        # Start the selected solver on a worker thread; update() shows its progress
         self.state = "solving"
-        self.path = []
-        self.visited = set()
-        self.iterations = 0
-        start_time = time.time()
-        solver = self.a_star()
-        for _ in solver:
+        self.reset_search()
+        self.cell_colors = None  # Clear the previous solve from the cells
+        self.full_redraw = True
+        self.solving_buttons = []
+        if self.lookup_solution(self.algorithm):
+            self.finish_solving()  # Same maze and query as an earlier solve: show it at once
+            return
+        self.pending.clear()
+        self.solved_copy = None
+        self.worker = SolveWorker(self).start()
+        self.solving_buttons = self.make_buttons(("Back", self.back_to_menu), (self.solve_speed, self.next_speed))
+
+    def update(self):
+        # Show at most one frame's budget of the cells the worker has expanded
+        # The worker searches at full speed; the speed setting only paces the
+        # animation. Time shown is the worker's solve time, not drawing.
+        if self.state != "solving":
+            return
+        for message in self.worker.poll():
+            if message[0] == "visited":
+                self.pending.extend((cell, False) for cell in message[1])
+                self.pending.extend((cell, True) for cell in message[2])
+            else:
+                self.solved_copy = message[1]
+        max_steps, max_ms = SOLVE_SPEEDS[self.solve_speed]
+        deadline = time.perf_counter() + max_ms / 1000 if max_ms else None
+        steps = 0
+        pending = self.pending
+        while pending:
+            cell, back = pending.popleft()
+            (self.visited_back if back else self.visited).add(cell)
             self.iterations += 1
-            self.draw()
-            pygame.display.flip()
-            pygame.time.wait(10)  # Small delay to make solving visible
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    return
-        self.time = time.time() - start_time
+            self.dirty_cells.append(cell)
+            steps += 1
+            if (max_steps and steps >= max_steps) or (deadline and time.perf_counter() >= deadline):
+                break
+        if self.solved_copy is not None and not pending:
+            self.adopt_search(self.solved_copy)
+            self.remember_solution(self.algorithm)
+            self.finish_solving()
+
+    def finish_solving(self):
+        # Show the path and switch to the solved state
+        self.worker = None
+        self.solved_copy = None
+        self.dirty_cells.extend(self.path)
         self.state = "solved"
         self.alert_message = "Maze Solved!"
         self.alert_color = GREEN
         self.alert_start_time = time.time()
-        btn_w = 140
-        btn_h = 50
-        self.solved_buttons = [
-            Button(WINDOW_WIDTH - 180, WINDOW_HEIGHT - 80, btn_w, btn_h, "Restart", self.restart, font),
-            Button(WINDOW_WIDTH - 180, WINDOW_HEIGHT - 140, btn_w, btn_h, "Back", self.back_to_menu, font)
-        ]
+        self.solved_buttons = self.make_solved_buttons()
+
+    def maze_cell_at(self, pos):
+        # (row, col) of the maze cell under a screen position, or None
+        # Buttons drawn over a large maze take their clicks first
+        buttons = self.play_buttons if self.state == "playing" else self.solved_buttons
+        area_x, area_y, area_w, area_h = MAZE_AREA
+        inside = area_x <= pos[0] < area_x + area_w and area_y <= pos[1] < area_y + area_h
+        if not inside or any(button.rect.collidepoint(pos) for button in buttons):
+            return None
+        off_x, off_y = self.maze_offset()
+        row, col = math.floor((pos[1] - off_y) / self.zoom), math.floor((pos[0] - off_x) / self.zoom)
+        if 0 <= row < self.maze.rows and 0 <= col < self.maze.cols:
+            return row, col
+        return None
+
+    def fit_view(self):
+        # Largest zoom up to CELL_SIZE that shows the whole maze, panned to the start
+        _, _, area_w, area_h = MAZE_AREA
+        fitting = [zoom for zoom in ZOOM_LEVELS if zoom <= CELL_SIZE and
+                   self.maze.cols * zoom <= area_w and self.maze.rows * zoom <= area_h]
+        self.zoom = fitting[-1] if fitting else ZOOM_LEVELS[0]
+        self.view = (0, 0)
+
+    def zoom_by(self, steps, pos=None):
+        # Move steps along ZOOM_LEVELS, keeping the cell under pos (default: the
+        # center of the view) where it is on screen
+        area_x, area_y, area_w, area_h = MAZE_AREA
+        if pos is None:
+            pos = (area_x + area_w // 2, area_y + area_h // 2)
+        level = max(0, min(len(ZOOM_LEVELS) - 1, ZOOM_LEVELS.index(self.zoom) + steps))
+        off_x, off_y = self.maze_offset()
+        row, col = (pos[1] - off_y) / self.zoom, (pos[0] - off_x) / self.zoom
+        self.zoom = ZOOM_LEVELS[level]
+        self.pan_to(row - (pos[1] - area_y) / self.zoom, col - (pos[0] - area_x) / self.zoom)
+
+    def pan_by(self, rows, cols):
+        self.pan_to(self.view[0] + rows, self.view[1] + cols)
+
+    def pan_to(self, row, col):
+        # Put (row, col) at the top-left of the view, kept inside the maze
+        _, _, area_w, area_h = MAZE_AREA
+        max_row = max(0, self.maze.rows - area_h / self.zoom)
+        max_col = max(0, self.maze.cols - area_w / self.zoom)
+        self.view = (min(max(row, 0), max_row), min(max(col, 0), max_col))
+
+    def start_drag(self, pos):
+        self.drag = (pos, self.view)
+
+    def drag_to(self, pos):
+        # Pan so the cell grabbed by start_drag follows the mouse
+        (x, y), (row, col) = self.drag
+        self.pan_to(row - (pos[1] - y) / self.zoom, col - (pos[0] - x) / self.zoom)
+
+    def handle_maze_click(self, pos, checkpoint=False):
+        # Toggle the wall under the mouse; once solved, replan and show the repair
+        # With checkpoint set (Shift-click) toggle a route checkpoint instead
+        if self.state not in ("playing", "solved"):
+            return
+        cell = self.maze_cell_at(pos)
+        if cell is None:
+            return
+        if self.alert_message:
+            # The alert covers the maze: the first click only dismisses it
+            self.alert_message = None
+            self.alert_start_time = None
+            return
+        if checkpoint:
+            if self.toggle_checkpoint(cell):
+                self.dirty_cells.append(cell)
+            return
+        if not self.toggle_wall(cell):
+            return
+        self.dirty_cells.append(cell)
+        if self.state == "solved":
+            self.dirty_cells.extend(self.path)
+            self.dirty_cells.extend(self.repaired)
+            self.dirty_cells.extend(self.visited | self.visited_back)
+            if self.algorithm == "multi_goal":
+                self.solve()  # A route through the checkpoints: solve it again
+            else:
+                self.replan()
+            self.dirty_cells.extend(self.path)
+            self.dirty_cells.extend(self.repaired)
+            self.dirty_cells.extend(self.visited | self.visited_back)
+            if not self.path:
+                self.alert_message = "No Path!"
+                self.alert_color = RED
+                self.alert_start_time = time.time()
 
     def back_to_menu(self):
         # Reset game to menu state
+        self.stop_solving()
         self.state = "menu"
         self.maze = None
         self.difficulty = None
         self.play_buttons = []
         self.solved_buttons = []
+        self.solving_buttons = []
         self.alert_message = None
         self.alert_start_time = None
 
+    def stop_solving(self):
+        # Cancel a solve still running on the worker thread, waiting until it
+        # has stopped so it never reads a maze the game goes on to change or drop
+        if self.worker is not None:
+            if not self.worker.cancel():
+                self.worker.cancel(None)
+            self.worker = None
+        self.pending.clear()
+        self.solved_copy = None
+
     def restart(self):
         # Regenerate maze and return to playing state
-        self.generate_maze(len(self.maze), len(self.maze[0]))
+        self.generate_maze(self.maze.rows, self.maze.cols)
         self.state = "playing"
-        self.path = []
-        self.visited = set()
-        self.iterations = 0
-        self.time = 0
+        self.reset_search()
         self.alert_message = None
         self.alert_start_time = None
-        btn_w = 140
-        btn_h = 50
-        self.play_buttons = [
-            Button(WINDOW_WIDTH - 180, WINDOW_HEIGHT - 80, btn_w, btn_h, "Start", self.start_solving, font),
-            Button(WINDOW_WIDTH - 180, WINDOW_HEIGHT - 140, btn_w, btn_h, "Back", self.back_to_menu, font)
-        ]
+        self.play_buttons = self.make_play_buttons()
         self.solved_buttons = []
 
-    def heuristic(self, a, b):
-        # Manhattan distance heuristic for A*: estimates cost between two points
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-    def a_star(self):
-        # A* algorithm: finds shortest path from start to end using a heuristic
-        # Uses a priority queue to explore cells with lowest f_score (g + h)
-        queue = [(0, self.start)]  # Queue of (f_score, position) tuples
-        g_score = {self.start: 0}  # Cost from start to each cell
-        f_score = {self.start: self.heuristic(self.start, self.end)}  # Estimated total cost
-        came_from = {}  # Tracks parent of each cell for path reconstruction
-
-        while queue:  # Loop until queue is empty or goal is found
-            current = heapq.heappop(queue)[1]  # Get cell with lowest f_score
-            if current == self.end:  # If end is reached, build and return path
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(self.start)
-                self.path = path[::-1]  # Reverse path to go from start to end
-                return
-
-            self.visited.add(current)  # Mark cell as explored
-            yield  # Yield to allow step-by-step visualization
-
-            # Check all four adjacent cells (right, down, left, up)
-            for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                neighbor = (current[0] + dx, current[1] + dy)
-                # Validate neighbor: in bounds, not a wall, not visited
-                if (0 <= neighbor[0] < len(self.maze) and 
-                    0 <= neighbor[1] < len(self.maze[0]) and 
-                    self.maze[neighbor[0]][neighbor[1]] == 0 and 
-                    neighbor not in self.visited):
-                    tentative_g = g_score[current] + 1  # Cost to move is 1
-                    # If this is a new or cheaper path, update scores
-                    if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                        came_from[neighbor] = current  # Record parent
-                        g_score[neighbor] = tentative_g  # Update cost so far
-                        f_score[neighbor] = tentative_g + self.heuristic(neighbor, self.end)  # Update total cost
-                        heapq.heappush(queue, (f_score[neighbor], neighbor))  # Add to queue
-
     def draw(self):
         # Render the current game state
+        # Returns the screen rectangles that changed, or None for the whole screen
         if self.state == "menu":
-            self.draw_menu()
+            return self.draw_menu()
+        elif self.state == "solving" and not self.full_redraw:
+            # Only cells touched since the last frame, plus the buttons for hover
+            rects = self.draw_dirty()
+            for button in self.solving_buttons:
+                button.draw(screen)
+                rects.append(button.rect.inflate(10, 10))
+            return rects
         else:
+            # Skip the frame entirely when nothing on it has changed
+            key = self.frame_key()
+            if not self.full_redraw and not self.dirty_cells and key == self.last_frame:
+                return []
+            self.last_frame = key
+            self.full_redraw = False
             screen.fill(WHITE)
             self.draw_maze()
             self.draw_alert()
+        return None
+
+    def frame_key(self):
+        # Everything a full maze frame depends on; equal keys draw equal frames
+        buttons = {"playing": self.play_buttons, "solving": self.solving_buttons,
+                   "solved": self.solved_buttons}.get(self.state, [])
+        alert = None
+        if self.alert_message:
+            alert = (self.alert_message, self.alert_color, self.alert_step(), pygame.mouse.get_pos())
+        return (self.state, id(self.maze), getattr(self.maze, "version", 0), self.zoom, self.view,
+                len(self.path), len(self.visited),
+                len(self.visited_back), len(self.repaired), self.iterations, id(self.stats), self.replan_work,
+                alert, tuple((id(button), button.hovered()) for button in buttons))
 
     def draw_menu(self):
         # Draw menu with gradient background and difficulty buttons
-        for y in range(WINDOW_HEIGHT):
-            t = y / WINDOW_HEIGHT
-            r = int(MENU_TOP[0] * (1 - t) + MENU_BOTTOM[0] * t)
-            g = int(MENU_TOP[1] * (1 - t) + MENU_BOTTOM[1] * t)
-            b = int(MENU_TOP[2] * (1 - t) + MENU_BOTTOM[2] * t)
-            pygame.draw.line(screen, (r, g, b), (0, y), (WINDOW_WIDTH, y))
+        # Returns [] when the menu on screen is already up to date
+        key = ("menu", tuple(button.hovered() for button in self.menu_buttons))
+        if not self.full_redraw and key == self.last_frame:
+            return []
+        self.last_frame = key
+        self.full_redraw = False
+        if self.menu_background is None:
+            self.menu_background = self.render_gradient()
+        screen.blit(self.menu_background, (0, 0))
 
         title = title_font.render("Maze Solver", True, BLACK)
         screen.blit(title, (WINDOW_WIDTH // 2 - title.get_width() // 2, 80))
 
         for button in self.menu_buttons:
             button.draw(screen)
+        return None
+
+    def render_gradient(self):
+        # The menu background, one line per pixel row from MENU_TOP to MENU_BOTTOM
+        surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        for y in range(WINDOW_HEIGHT):
+            t = y / WINDOW_HEIGHT
+            r = int(MENU_TOP[0] * (1 - t) + MENU_BOTTOM[0] * t)
+            g = int(MENU_TOP[1] * (1 - t) + MENU_BOTTOM[1] * t)
+            b = int(MENU_TOP[2] * (1 - t) + MENU_BOTTOM[2] * t)
+            pygame.draw.line(surface, (r, g, b), (0, y), (WINDOW_WIDTH, y))
+        return surface
+
+    def maze_offset(self):
+        # Screen position of cell (0, 0): centered (with space for the title)
+        # along each axis the maze fits in, otherwise given by the pan position
+        area_x, area_y, area_w, area_h = MAZE_AREA
+        maze_w = self.maze.cols * self.zoom
+        maze_h = self.maze.rows * self.zoom
+        if maze_w <= area_w:
+            off_x = area_x + int(area_w - maze_w) // 2
+        else:
+            off_x = area_x - round(self.view[1] * self.zoom)
+        if maze_h <= area_h:
+            off_y = area_y + int(area_h - maze_h) // 2
+        else:
+            off_y = area_y - round(self.view[0] * self.zoom)
+        return off_x, off_y
+
+    def cell_color(self, i, j, path):
+        # PALETTE index of one cell; path is the solved path as a set
+        if self.maze.cells[i * self.maze.cols + j] == WALL:
+            return WALL_COLOR  # Wall
+        elif (i, j) == self.start:
+            return START         # Start point
+        elif (i, j) == self.end:
+            return END           # End point
+        elif (i, j) in self.checkpoints:
+            return CHECKPOINT    # Route checkpoint
+        elif (i, j) in path:
+            return ON_PATH       # Solved path
+        elif (i, j) in self.repaired:
+            return REPAIRED      # Repaired by the last replan
+        elif (i, j) in self.visited:
+            return VISITED       # Visited during solving
+        elif (i, j) in self.visited_back:
+            return VISITED_BACK  # Visited from the end (bidirectional)
+        return OPEN              # Open path
+
+    def update_cell_colors(self):
+        # Bring the per-cell palette indices up to date: walls and open cells in
+        # one translate, then the overlays; afterwards only the dirty cells
+        grid = self.maze
+        path = set(self.path)
+        if self.cell_colors is None or self.colors_maze is not grid:
+            self.cell_colors = grid.cells.translate(bytes([OPEN, WALL_COLOR]) + bytes([OPEN]) * 254)
+            self.colors_maze = grid
+            cells = {self.start, self.end, *self.checkpoints} | path | self.repaired | self.visited | self.visited_back
+        else:
+            cells = self.dirty_cells
+        colors, cols = self.cell_colors, grid.cols
+        for i, j in cells:
+            colors[i * cols + j] = self.cell_color(i, j, path)
+        self.dirty_cells = []
+
+    def draw_maze_view(self):
+        # Blit the visible cells at the current zoom; returns the screen rect drawn
+        # The cells become an 8-bit surface straight from the palette indices,
+        # scaled up with nearest neighbor or, zoomed out, sampled at an odd
+        # stride (so both wall and cell parities survive) and smoothscaled down
+        self.update_cell_colors()
+        rows, cols, zoom = self.maze.rows, self.maze.cols, self.zoom
+        area = pygame.Rect(MAZE_AREA)
+        off_x, off_y = self.maze_offset()
+        step = 1 if zoom >= 1 else (int(1 / zoom) // 2) | 1
+        r0 = max(0, int((area.top - off_y) / zoom))
+        c0 = max(0, int((area.left - off_x) / zoom))
+        r0 -= r0 % step
+        c0 -= c0 % step
+        r1 = min(rows, math.ceil((area.bottom - off_y) / zoom))
+        c1 = min(cols, math.ceil((area.right - off_x) / zoom))
+        colors = self.cell_colors
+        pixels = b"".join(colors[r * cols + c0:r * cols + c1:step] for r in range(r0, r1, step))
+        surface = pygame.image.frombuffer(pixels, (len(range(c0, c1, step)), len(range(r0, r1, step))), "P")
+        surface.set_palette(PALETTE)
+        size = (max(1, round((c1 - c0) * zoom)), max(1, round((r1 - r0) * zoom)))
+        if zoom >= 1:
+            surface = pygame.transform.scale(surface, size)
+        else:
+            surface = pygame.transform.smoothscale(surface.convert(), size)
+        screen.set_clip(area)
+        pos = (off_x + round(c0 * zoom), off_y + round(r0 * zoom))
+        rect = screen.blit(surface, pos)
+        if zoom >= GRID_ZOOM:
+            screen.blit(self.grid_overlay(), pos, (0, 0) + size)
+        screen.set_clip(None)
+        self.drawn_view = (self.maze, zoom, self.view)
+        return rect
+
+    def draw_dirty(self):
+        # Repaint only the cells changed since the last frame; returns the screen
+        # rects for pygame.display.update. The whole view is drawn instead after
+        # a pan or zoom, below one pixel per cell (where each pixel blends
+        # several cells) or when a quarter of the visible cells changed.
+        zoom = self.zoom
+        _, _, area_w, area_h = MAZE_AREA
+        visible = (area_w / zoom) * (area_h / zoom)
+        if (self.cell_colors is None or self.colors_maze is not self.maze or zoom < 1 or
+                self.drawn_view != (self.maze, zoom, self.view) or len(self.dirty_cells) > visible // 4):
+            return [self.draw_maze_view()]
+        cells = set(self.dirty_cells)
+        self.update_cell_colors()
+        colors, cols = self.cell_colors, self.maze.cols
+        area = pygame.Rect(MAZE_AREA)
+        off_x, off_y = self.maze_offset()
+        rects = []
+        screen.set_clip(area)
+        for i, j in cells:
+            rect = pygame.Rect(off_x + j * zoom, off_y + i * zoom, zoom, zoom)
+            if rect.colliderect(area):
+                screen.fill(PALETTE[colors[i * cols + j]], rect)
+                if zoom >= GRID_ZOOM:
+                    pygame.draw.rect(screen, PALETTE[GRID], rect, 1)  # The cell's outline, as in grid_overlay
+                rects.append(rect.clip(area))
+        screen.set_clip(None)
+        return rects
+
+    def grid_overlay(self):
+        # Grid lines for the current zoom: each cell outlined in GRID color by a
+        # 1-pixel rect, on a color-keyed surface big enough for any view of the
+        # maze area; rendered once per zoom level and then only blitted
+        zoom = self.zoom
+        if self.grid_lines is None or self.grid_lines[0] != zoom:
+            _, _, area_w, area_h = MAZE_AREA
+            cols, rows = area_w // zoom + 2, area_h // zoom + 2
+            width, height = cols * zoom, rows * zoom
+            overlay = pygame.Surface((width, height))
+            overlay.fill(GRID_KEY)
+            overlay.set_colorkey(GRID_KEY)
+            for j in range(cols):
+                for x in (j * zoom, (j + 1) * zoom - 1):
+                    pygame.draw.line(overlay, PALETTE[GRID], (x, 0), (x, height - 1))
+            for i in range(rows):
+                for y in (i * zoom, (i + 1) * zoom - 1):
+                    pygame.draw.line(overlay, PALETTE[GRID], (0, y), (width - 1, y))
+            self.grid_lines = (zoom, overlay)
+        return self.grid_lines[1]
 
     def draw_maze(self):
         # Draw maze grid, title, metrics, and buttons based on state
-        maze_w = len(self.maze[0]) * CELL_SIZE
-        maze_h = len(self.maze) * CELL_SIZE
-        off_x = (WINDOW_WIDTH - maze_w) // 2  # Center maze horizontally
-        off_y = (WINDOW_HEIGHT - maze_h - 150) // 2 + 100  # Center with space for title
+        # The maze goes first: zoomed in on a large maze it fills the window
+        # and the text is drawn over it (see blit_text)
+        self.maze_rect = self.draw_maze_view()
 
         if self.difficulty:
             title = title_font.render(f"{self.difficulty} Maze", True, BLACK)
-            screen.blit(title, (WINDOW_WIDTH // 2 - title.get_width() // 2, 30))
+            self.blit_text(title, (WINDOW_WIDTH // 2 - title.get_width() // 2, 30))
             if self.state == "solved":
                 title_h = title.get_height()
                 time_text = font.render(f"Time: {self.time:.2f}s", True, BLACK)
-                iter_text = font.render(f"Iterations: {self.iterations}", True, BLACK)
-                screen.blit(time_text, (WINDOW_WIDTH // 2 - time_text.get_width() // 2, 40 + title_h))
-                screen.blit(iter_text, (WINDOW_WIDTH // 2 - iter_text.get_width() // 2, 80 + title_h))
-
-        # Render each cell with appropriate color
-        for i in range(len(self.maze)):
-            for j in range(len(self.maze[0])):
-                if self.maze[i][j] == 1:
-                    color = BLACK  # Wall
-                elif (i, j) == self.start:
-                    color = GREEN  # Start point
-                elif (i, j) == self.end:
-                    color = RED    # End point
-                elif (i, j) in self.path:
-                    color = YELLOW  # Solved path
-                elif (i, j) in self.visited:
-                    color = BLUE    # Visited during solving
-                else:
-                    color = WHITE   # Open path
-                pygame.draw.rect(screen, color, (off_x + j * CELL_SIZE, off_y + i * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-                pygame.draw.rect(screen, GRAY, (off_x + j * CELL_SIZE, off_y + i * CELL_SIZE, CELL_SIZE, CELL_SIZE), 1)
+                iter_text = font.render(f"Iterations: {self.iterations} ({self.algorithm_label()})", True, BLACK)
+                self.blit_text(time_text, (WINDOW_WIDTH // 2 - time_text.get_width() // 2, 40 + title_h))
+                self.blit_text(iter_text, (WINDOW_WIDTH // 2 - iter_text.get_width() // 2, 80 + title_h))
+                if self.stats is not None:
+                    self.draw_stats()
+                if self.replan_work is not None:
+                    self.draw_replan_work()
 
         # Draw state-specific buttons
         if self.state == "playing":
             for button in self.play_buttons:
                 button.draw(screen)
+        elif self.state == "solving":
+            for button in self.solving_buttons:
+                button.draw(screen)
         elif self.state == "solved":
             for button in self.solved_buttons:
                 button.draw(screen)
 
+    def blit_text(self, text, pos):
+        # Blit rendered text, on a white backing where it lies over the maze
+        rect = text.get_rect(topleft=pos)
+        if rect.colliderect(self.maze_rect):
+            screen.fill(WHITE, rect)
+        screen.blit(text, rect)
+
+    def draw_stats(self):
+        # Metrics panel in the bottom-left corner with the last solve's SearchStats
+        stats = self.stats
+        lines = [
+            f"Pushes: {stats.pushes}",
+            f"Pops: {stats.pops} ({stats.stale_pops} stale)",
+            f"Neighbor checks: {stats.neighbor_checks}",
+            f"Peak frontier: {stats.peak_frontier}",
+        ]
+        lines += [f"{phase.title()}: {seconds * 1000:.2f} ms" for phase, seconds in stats.phases.items()]
+        if stats.cache:
+            lines.append(f"Cache: {stats.cache} hit ({self.cache.hits + self.cache.disk_hits} total)")
+        y = WINDOW_HEIGHT - 20 - len(lines) * 30
+        for line in lines:
+            self.blit_text(close_font.render(line, True, DARK_GRAY), (20, y))
+            y += 30
+
+    def draw_replan_work(self):
+        # How much the last replan saved against solving from scratch
+        repaired, full = self.replan_work
+        saved = f" ({100 - 100 * repaired // full}% less)" if full else ""
+        text = close_font.render(f"Replan: {repaired} cells vs {full} for a full search{saved}", True, PURPLE)
+        self.blit_text(text, (20, WINDOW_HEIGHT - 50))  # Where the metrics panel goes; replan clears stats
+
+    def alert_step(self):
+        # Pulse phase of the alert as a whole step in -ALERT_STEPS..ALERT_STEPS,
+        # scale = 1 + 0.1 * step / ALERT_STEPS; 0 once the 3 seconds are over
+        if not self.alert_start_time:
+            return 0
+        elapsed = time.time() - self.alert_start_time
+        if elapsed >= 3:
+            return 0
+        return round(ALERT_STEPS * math.sin(elapsed * 6))  # Oscillate between 0.9 and 1.1
+
+    def render_alert(self, scale):
+        # Alert box and its close button (normal, hovered) at one scale
+        box = self.alert_box
+        scaled = pygame.transform.smoothscale(box, (int(box.get_width() * scale), int(box.get_height() * scale)))
+        close_text = close_font.render("X", True, BLACK)
+        close_text = pygame.transform.smoothscale(close_text, (int(close_text.get_width() * scale),
+                                                               int(close_text.get_height() * scale)))
+        radius = int(25 * scale)
+        buttons = []
+        for color in (GRAY, LIGHT_GRAY):
+            button = pygame.Surface((2 * radius + 1, 2 * radius + 1), pygame.SRCALPHA)
+            center = (radius, radius)
+            pygame.draw.circle(button, SHADOW[:3], center, radius)  # Opaque, as on the screen
+            pygame.draw.circle(button, color, center, int(20 * scale))
+            pygame.draw.circle(button, DARK_GRAY, center, int(20 * scale), 2)
+            button.blit(close_text, close_text.get_rect(center=center))
+            buttons.append(button)
+        return scaled, buttons
+
+    def render_alert_box(self):
+        # The unscaled alert: message on a rounded panel with a shadow
+        alert_text = alert_font.render(self.alert_message, True, self.alert_color)
+        padding = 60
+        width, height = alert_text.get_width() + padding, alert_text.get_height() + padding
+        alert_surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        alert_surface.fill((0, 0, 0, 0))  # Transparent background
+        pygame.draw.rect(alert_surface, SHADOW, (10, 10, width - 10, height - 10), border_radius=20)
+        pygame.draw.rect(alert_surface, WHITE, (0, 0, width, height), border_radius=20)
+        pygame.draw.rect(alert_surface, DARK_GRAY, (0, 0, width, height), 3, border_radius=20)
+        alert_surface.blit(alert_text, (padding // 2, padding // 2))
+        return alert_surface
+
     def draw_alert(self):
         # Draw alert message with pulsing effect and dismiss button
+        # Every scale step is rendered once per message and then only blitted
         if self.alert_message:
-            alert_text = alert_font.render(self.alert_message, True, self.alert_color)
-            alert_rect = alert_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-
-            # Calculate scale for pulsing effect (oscillates for 3 seconds)
-            if self.alert_start_time:
-                elapsed = time.time() - self.alert_start_time
-                if elapsed < 3:
-                    scale = 1 + 0.1 * math.sin(elapsed * 6)  # Oscillate between 0.9 and 1.1
-                else:
-                    scale = 1
-            else:
-                scale = 1
-
-            # Create a surface for the alert with padding
-            padding = 60
-            alert_surface = pygame.Surface((alert_rect.width + padding, alert_rect.height + padding), pygame.SRCALPHA)
-            alert_surface.fill((0, 0, 0, 0))  # Transparent background
-            pygame.draw.rect(alert_surface, SHADOW, (10, 10, alert_rect.width + padding - 10, alert_rect.height + padding - 10), border_radius=20)
-            pygame.draw.rect(alert_surface, WHITE, (0, 0, alert_rect.width + padding, alert_rect.height + padding), border_radius=20)
-            pygame.draw.rect(alert_surface, DARK_GRAY, (0, 0, alert_rect.width + padding, alert_rect.height + padding), 3, border_radius=20)
-            alert_surface.blit(alert_text, (padding // 2, padding // 2))
-
-            # Scale and blit the alert surface
-            scaled_surface = pygame.transform.smoothscale(alert_surface, 
-                                                          (int(alert_surface.get_width() * scale), 
-                                                           int(alert_surface.get_height() * scale)))
+            key = (self.alert_message, self.alert_color)
+            if key != self.alert_key:
+                self.alert_key = key
+                self.alert_box = self.render_alert_box()
+                self.alert_frames = {}
+            step = self.alert_step()
+            scale = 1 + 0.1 * step / ALERT_STEPS
+            if step not in self.alert_frames:
+                self.alert_frames[step] = self.render_alert(scale)
+            scaled_surface, close_buttons = self.alert_frames[step]
             scaled_rect = scaled_surface.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
             screen.blit(scaled_surface, scaled_rect)
 
             # Draw the "X" button
-            close_text = close_font.render("X", True, BLACK)
             close_rect = pygame.Rect(scaled_rect.right + 15 * scale, scaled_rect.top - 15 * scale, 40 * scale, 40 * scale)
             mouse_pos = pygame.mouse.get_pos()
             is_hovered = close_rect.collidepoint(mouse_pos)
-            pygame.draw.circle(screen, SHADOW, close_rect.center, int(25 * scale))
-            color = LIGHT_GRAY if is_hovered else GRAY
-            pygame.draw.circle(screen, color, close_rect.center, int(20 * scale))
-            pygame.draw.circle(screen, DARK_GRAY, close_rect.center, int(20 * scale), 2)
-            close_text_scaled = pygame.transform.smoothscale(close_text, 
-                                                             (int(close_text.get_width() * scale), 
-                                                              int(close_text.get_height() * scale)))
-            close_text_rect = close_text_scaled.get_rect(center=close_rect.center)
-            screen.blit(close_text_scaled, close_text_rect)
+            close_button = close_buttons[is_hovered]
+            screen.blit(close_button, close_button.get_rect(center=close_rect.center))
 
             # Dismiss alert if "X" is clicked
             if pygame.mouse.get_pressed()[0] and close_rect.collidepoint(mouse_pos):
                 self.alert_message = None
                 self.alert_start_time = None
 
-    def generate_maze(self, rows, cols, extra_wall_percent=0.1):
-        if rows % 2 == 0: rows += 1
-        if cols % 2 == 0: cols += 1
-        maze = [[1 for _ in range(cols)] for _ in range(rows)]
-        visited = set()
-        stack = [(1, 1)]
-
-        # Iterative DFS to create a perfect maze
-        while stack:
-            x, y = stack[-1]  # Peek at top of stack (don’t pop yet)
-            maze[x][y] = 0
-            visited.add((x, y))
-            dirs = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-            random.shuffle(dirs)
-            unvisited_neighbors = False
-            for dx, dy in dirs:
-                new_x = x + dx
-                new_y = y + dy
-                if (0 <= new_x < rows and 0 <= new_y < cols and 
-                    (new_x, new_y) not in visited):
-                    maze[x + dx//2][y + dy//2] = 0
-                    stack.append((new_x, new_y))
-                    unvisited_neighbors = True
-                    break  # Move to next cell immediately
-            if not unvisited_neighbors:
-                stack.pop()  # Backtrack if no unvisited neighbors
-
-        # Ensure start and end are connected
-        maze[0][0] = 0
-        maze[rows-1][cols-1] = 0
-        if maze[0][1] == 1 and maze[1][0] == 1:
-            maze[0][1] = 0
-        end_x = rows-1
-        end_y = cols-1
-        if (end_x, end_y) not in visited:
-            if end_x > 1 and maze[end_x-1][end_y] == 0:
-                maze[end_x-2][end_y] = 0
-            elif end_y > 1 and maze[end_x][end_y-1] == 0:
-                maze[end_x][end_y-2] = 0
-            else:
-                maze[rows-2][cols-1] = 0
-
-        # Controlled extra wall removal (scaled for maze size)
-        walls = [(i, j) for i in range(rows) for j in range(cols) if maze[i][j] == 1]
-        random.shuffle(walls)
-        # Cap extra walls removed to maintain maze structure
-        extra = min(int((rows * cols) * extra_wall_percent), len(walls) // 2)
-        for i in range(min(extra, len(walls))):
-            x, y = walls[i]
-            neighbors = [(x+1, y), (x-1, y), (x, y+1), (x, y-1)]
-            open_count = sum(1 for nx, ny in neighbors if 0 <= nx < rows and 0 <= ny < cols and maze[nx][ny] == 0)
-            if open_count == 2:  # Only remove if it connects exactly two paths (avoids over-opening)
-                maze[x][y] = 0
-
-        self.maze = maze
-        self.start = (0, 0)
-        self.end = (rows-1, cols-1)
-        self.path = []
-        self.visited = set()       
-
-    def check_solvable(self):
-        # Simple DFS to check if a path exists from start to end
-        visited = set()
-        stack = [self.start]
-        while stack:
-            current = stack.pop()
-            if current == self.end:
-                return True
-            if current not in visited:
-                visited.add(current)
-                for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                    neighbor = (current[0] + dx, current[1] + dy)
-                    if (0 <= neighbor[0] < len(self.maze) and 
-                        0 <= neighbor[1] < len(self.maze[0]) and 
-                        self.maze[neighbor[0]][neighbor[1]] == 0 and 
-                        neighbor not in visited):
-                        stack.append(neighbor)
-        return False 
-
 def main():
 
     # Start Pygame to manage graphics and user input
+    global pygame, font, title_font, alert_font, close_font, screen
+    import pygame
     pygame.init()
 
-    global font, title_font, alert_font, close_font, screen
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))  # Create display window
     pygame.display.set_caption("Maze Solver")  # Set window title
 
@@ -401,6 +709,8 @@ def main():
 
     # Main loop: initialize game and handle events
     game = MazeGame()
+    game.instrument = True  # Counters for the metrics panel
+    game.cache = SolutionCache()  # Start on an unchanged maze replays the last solve
 
     btn_w = 220
     btn_h = 60
@@ -413,10 +723,13 @@ def main():
         game.menu_buttons.append(Button(x, y, btn_w, btn_h, level, action, font))
 
     clock = pygame.time.Clock()
+    # Arrow key -> (rows, cols) direction to pan
+    pan_keys = {pygame.K_UP: (-1, 0), pygame.K_DOWN: (1, 0), pygame.K_LEFT: (0, -1), pygame.K_RIGHT: (0, 1)}
 
     while True:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                game.stop_solving()
                 pygame.quit()
                 return
             if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -427,12 +740,42 @@ def main():
                 elif game.state == "playing":
                     for button in game.play_buttons:
                         button.handle_click(pos)
+                    game.handle_maze_click(pos, pygame.key.get_mods() & pygame.KMOD_SHIFT)
+                elif game.state == "solving":
+                    for button in game.solving_buttons:
+                        button.handle_click(pos)
                 elif game.state == "solved":
                     for button in game.solved_buttons:
                         button.handle_click(pos)
-
-        game.draw()
-        pygame.display.flip()
+                    game.handle_maze_click(pos, pygame.key.get_mods() & pygame.KMOD_SHIFT)
+            if game.state == "menu":
+                continue
+            # Viewport: wheel or +/- to zoom, right-drag or arrows to pan, 0 / Home to fit
+            if event.type == pygame.MOUSEWHEEL:
+                game.zoom_by(event.y, pygame.mouse.get_pos())
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+                game.start_drag(event.pos)
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 3:
+                game.drag = None
+            elif event.type == pygame.MOUSEMOTION and game.drag is not None:
+                game.drag_to(event.pos)
+            elif event.type == pygame.KEYDOWN:
+                step = max(1, int(PAN_PIXELS / game.zoom))
+                if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    game.zoom_by(1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    game.zoom_by(-1)
+                elif event.key in (pygame.K_0, pygame.K_HOME):
+                    game.fit_view()
+                elif event.key in pan_keys:
+                    game.pan_by(*(step * d for d in pan_keys[event.key]))
+
+        game.update()  # Advance any running solve within its frame budget
+        rects = game.draw()
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
         clock.tick(60)  # Cap frame rate at 60 FPS
 
 if __name__ == "__main__":
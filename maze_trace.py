@@ -0,0 +1,352 @@
+import argparse
+import os
+import struct
+import sys
+from itertools import islice
+import maze_io
+from maze_grid import Grid
+from maze_model import MazeModel, ALGORITHMS
+
+# Expansion traces: a compact binary log of one solve, enough to show it again
+# without re-solving, to scrub through it, or to render it to images.
+#
+# File layout (little-endian):
+#   header   HEADER struct, padded to DATA_OFFSET bytes
+#   walls    the maze as maze_io.pack_rows writes it
+#   steps    one varint per expanded cell, in expansion order: the zigzag-coded
+#            delta from the previous expanded index (starting from the start
+#            cell), shifted left once, with the low bit set for cells expanded
+#            from the end (bidirectional search)
+#   path     one zigzag varint per path cell, the delta from the previous one
+#            (starting from the start cell)
+# Varints are LEB128: 7 bits per byte, high bit set on all but the last byte.
+# Consecutive expansions are usually close, so most steps take one or two
+# bytes. Because only the last byte of a varint has its high bit clear, the
+# steps can be decoded backwards as well as forwards, which is how TraceReplay
+# scrubs in both directions without checkpoints. Example:
+#   python maze_trace.py record --size 201 --seed 7 -o solve.mzt
+#   python maze_trace.py export solve.mzt frames/ --frames 60
+#   python maze_trace.py play solve.mzt
+
+MAGIC = b"MZTR"
+VERSION = 1
+# magic, version, flags, rows, cols, start, end, steps, steps bytes, path length, algorithm
+HEADER = struct.Struct("<4sHHQQQQQQQ24s")
+DATA_OFFSET = 128
+FLAG_PATH = 1                # A path was found (an empty path section is then a 1-cell path)
+FLUSH_BYTES = 1 << 16        # TraceWriter buffer size
+
+SEEN = 2                     # TraceReplay state: expanded from the start
+SEEN_BACK = 3                # TraceReplay state: expanded from the end
+
+
+def zigzag(delta):
+    return delta << 1 if delta >= 0 else (~delta << 1) | 1
+
+
+def encode_varints(values):
+    # LEB128 bytes of non-negative ints
+    out = bytearray()
+    for value in values:
+        while value > 127:
+            out.append(value & 127 | 128)
+            value >>= 7
+        out.append(value)
+    return out
+
+
+def decode_varints(data):
+    # Inverse of encode_varints, as a generator
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 127) << shift
+        if byte < 128:
+            yield value
+            value = shift = 0
+        else:
+            shift += 7
+
+
+class TraceWriter:
+    # Streams one solve to a trace file: record() each expanded cell as the
+    # search runs, then close() with the path found (or None)
+    def __init__(self, path, grid, start, end, algorithm=""):
+        self.file = open(path, "wb")
+        self.grid = grid
+        self.start = start           # Linear index of the start cell
+        self.end = end               # Linear index of the end cell
+        self.algorithm = algorithm
+        self.steps = 0
+        self.steps_bytes = 0
+        self.last = start            # Index the next delta is taken from
+        self.buffer = bytearray()
+        self.file.write(bytes(DATA_OFFSET))  # Header written last, once the counts are known
+        self.file.write(maze_io.pack_rows(grid.cells, grid.rows, grid.cols))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self.file.closed:
+            self.close()
+
+    def record(self, index, back=False):
+        delta = index - self.last
+        self.last = index
+        value = (delta << 2 if delta >= 0 else (~delta << 2) | 2) | back
+        buffer = self.buffer
+        while value > 127:
+            buffer.append(value & 127 | 128)
+            value >>= 7
+        buffer.append(value)
+        self.steps += 1
+        if len(buffer) >= FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.steps_bytes += len(self.buffer)
+        self.buffer.clear()
+
+    def close(self, path=None):
+        # Write the path (linear indices from start to end) and the header
+        self.flush()
+        deltas = []
+        if path:
+            previous = self.start
+            for index in path[1:]:
+                deltas.append(zigzag(index - previous))
+                previous = index
+        self.file.write(encode_varints(deltas))
+        self.file.seek(0)
+        grid = self.grid
+        self.file.write(HEADER.pack(MAGIC, VERSION, FLAG_PATH if path else 0, grid.rows, grid.cols,
+                                    self.start, self.end, self.steps, self.steps_bytes, len(deltas),
+                                    self.algorithm.encode()))
+        self.file.close()
+
+
+class TraceReplay:
+    # A trace file held as bytes, positioned at some step. seek() moves to any
+    # step in either direction, decoding only the steps in between straight
+    # from the bytes; the per-cell state is two bytearrays the size of the
+    # maze, so memory is the trace plus the maze, whatever the step count.
+    def __init__(self, path=None, data=None):
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        (magic, version, flags, rows, cols, start, end, steps, steps_bytes, path_length,
+         algorithm) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a maze trace file")
+        self.data = data
+        self.rows, self.cols = rows, cols
+        self.start, self.end = start, end
+        self.steps = steps           # Expansions in the trace
+        self.algorithm = algorithm.rstrip(b"\0").decode()
+        walls = DATA_OFFSET + rows * ((cols + 7) // 8)
+        self.walls = maze_io.unpack_rows(data[DATA_OFFSET:walls], rows, cols)
+        self.steps_start = walls     # Byte range of the steps section
+        self.steps_end = walls + steps_bytes
+        self.path = None             # Linear indices from start to end, or None
+        if flags & FLAG_PATH:
+            self.path = [start]
+            for value in islice(decode_varints(data[self.steps_end:]), path_length):
+                self.path.append(self.path[-1] + (~(value >> 1) if value & 1 else value >> 1))
+        self.state = bytearray(self.walls)  # PATH, WALL, SEEN or SEEN_BACK per cell
+        self.counts = bytearray(rows * cols)  # Times each cell was expanded so far (capped at 255)
+        self.step = 0                # Steps applied so far
+        self.offset = self.steps_start  # Byte offset of the next step
+        self.index = start           # Index of the last step applied (the start before any)
+
+    def grid(self):
+        # The traced maze as a Grid
+        grid = Grid(self.rows, self.cols)
+        grid.cells[:] = self.walls
+        return grid
+
+    def seek(self, step):
+        # Move to just after the given number of expansions
+        step = max(0, min(step, self.steps))
+        data, state, counts, walls = self.data, self.state, self.counts, self.walls
+        current, offset, index = self.step, self.offset, self.index
+        while current < step:
+            value = data[offset]
+            offset += 1
+            if value > 127:
+                value &= 127
+                shift = 7
+                while True:
+                    byte = data[offset]
+                    offset += 1
+                    value |= (byte & 127) << shift
+                    if byte < 128:
+                        break
+                    shift += 7
+            index += ~(value >> 2) if value & 2 else value >> 2
+            if counts[index] < 255:
+                counts[index] += 1
+            state[index] = SEEN_BACK if value & 1 else SEEN
+            current += 1
+        first = self.steps_start
+        while current > step:
+            # The previous varint starts after the last earlier byte with its high bit clear
+            end = offset
+            offset -= 1
+            value = data[offset]
+            while offset > first and data[offset - 1] > 127:
+                offset -= 1
+                value = value << 7 | data[offset] & 127
+            if counts[index] < 255:
+                counts[index] -= 1
+                if not counts[index]:
+                    state[index] = walls[index]
+            index -= ~(value >> 2) if value & 2 else value >> 2
+            current -= 1
+        self.step, self.offset, self.index = current, offset, index
+
+    def frame(self, colors):
+        # One byte per cell for the current step: the state mapped through
+        # colors (PATH, WALL, SEEN, SEEN_BACK -> color index, as a translate
+        # table), with the path drawn at the last step and start and end on top
+        path_color, start_color, end_color = colors[4:7]
+        frame = self.state.translate(colors[:4] + bytes(252))
+        if self.step == self.steps and self.path:
+            for index in self.path:
+                frame[index] = path_color
+        frame[self.start] = start_color
+        frame[self.end] = end_color
+        return frame
+
+
+def record(model, path, algorithm=None):
+    # Solve the model's maze (never from its cache) and write the trace
+    algorithm = algorithm or model.algorithm
+    grid = model.maze
+    writer = TraceWriter(path, grid, grid.index(model.start), grid.index(model.end), algorithm)
+    cache = model.cache
+    model.tracer = writer
+    model.cache = None
+    try:
+        model.solve(algorithm)
+    finally:
+        model.tracer = None
+        model.cache = cache
+    writer.close([grid.index(cell) for cell in model.path] if model.path else None)
+    return model.path
+
+
+def surface(replay, scale=1):
+    # pygame surface of the replay's current step, scale pixels per cell
+    import pygame
+    from maze_solver import PALETTE, OPEN, WALL_COLOR, VISITED, VISITED_BACK, ON_PATH, START, END
+    colors = bytes([OPEN, WALL_COLOR, VISITED, VISITED_BACK, ON_PATH, START, END])
+    image = pygame.image.frombuffer(replay.frame(colors), (replay.cols, replay.rows), "P")
+    image.set_palette(PALETTE)
+    if scale != 1:
+        image = pygame.transform.scale(image, (replay.cols * scale, replay.rows * scale))
+    return image
+
+
+def fit_scale(replay, width=1000, height=800):
+    # Largest whole number of pixels per cell that fits the maze in width x height
+    return max(1, min(width // replay.cols, height // replay.rows))
+
+
+def export_frames(replay, directory, frames=100, scale=None):
+    # Render frames + 1 evenly spaced steps, from the first to the last, to
+    # PNG files without opening a window (SDL's dummy video driver); returns
+    # the file names written
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    scale = scale or fit_scale(replay)
+    os.makedirs(directory, exist_ok=True)
+    names = []
+    for frame in range(frames + 1):
+        replay.seek(replay.steps * frame // max(frames, 1))
+        name = os.path.join(directory, "frame_%05d.png" % frame)
+        pygame.image.save(surface(replay, scale), name)
+        names.append(name)
+    return names
+
+
+def play(replay, scale=None):
+    # Replay window: Space pauses, Left/Right step one frame's worth back or
+    # forward, Up/Down double or halve the speed, Home/End jump to either end,
+    # and clicking the progress bar scrubs to that point
+    import pygame
+    pygame.init()
+    scale = scale or fit_scale(replay, 1000, 760)
+    width, height = replay.cols * scale, replay.rows * scale
+    screen = pygame.display.set_mode((max(width, 400), height + 40))
+    pygame.display.set_caption("Maze Trace - %s, %d steps" % (replay.algorithm or "solve", replay.steps))
+    clock = pygame.time.Clock()
+    speed = max(1, replay.steps // 600)  # Steps per frame: about ten seconds for the whole trace
+    playing = True
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                return
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_RIGHT:
+                    replay.seek(replay.step + speed)
+                elif event.key == pygame.K_LEFT:
+                    replay.seek(replay.step - speed)
+                elif event.key == pygame.K_UP:
+                    speed *= 2
+                elif event.key == pygame.K_DOWN:
+                    speed = max(1, speed // 2)
+                elif event.key == pygame.K_HOME:
+                    replay.seek(0)
+                elif event.key == pygame.K_END:
+                    replay.seek(replay.steps)
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and event.pos[1] >= height:
+                replay.seek(replay.steps * event.pos[0] // screen.get_width())
+        if playing and replay.step < replay.steps:
+            replay.seek(replay.step + speed)
+        screen.fill((255, 255, 255))
+        screen.blit(surface(replay, scale), (0, 0))
+        done = screen.get_width() * replay.step // max(replay.steps, 1)
+        pygame.draw.rect(screen, (200, 200, 200), (0, height + 10, screen.get_width(), 20))
+        pygame.draw.rect(screen, (100, 100, 100), (0, height + 10, done, 20))
+        pygame.display.flip()
+        clock.tick(60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record, replay and export maze solve traces")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="generate a seeded maze, solve it and write the trace")
+    rec.add_argument("--size", type=int, default=101)
+    rec.add_argument("--density", type=float, default=0.1)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--algorithm", choices=sorted(ALGORITHMS.values()), default="a_star")
+    rec.add_argument("-o", "--output", required=True)
+    exp = commands.add_parser("export", help="render a trace to PNG frames headlessly")
+    exp.add_argument("trace")
+    exp.add_argument("directory")
+    exp.add_argument("--frames", type=int, default=100)
+    exp.add_argument("--scale", type=int, default=None, help="pixels per cell (default: fit 1000x800)")
+    show = commands.add_parser("play", help="replay a trace in a window")
+    show.add_argument("trace")
+    show.add_argument("--scale", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        model = MazeModel()
+        model.generate_maze(args.size, args.size, args.density, seed=args.seed)
+        path = record(model, args.output, args.algorithm)
+        print(f"{model.iterations} expansions, path {len(path)} cells, "
+              f"{os.path.getsize(args.output)} bytes", file=sys.stderr)
+    elif args.command == "export":
+        names = export_frames(TraceReplay(args.trace), args.directory, args.frames, args.scale)
+        print(f"{len(names)} frames written to {args.directory}", file=sys.stderr)
+    else:
+        play(TraceReplay(args.trace), args.scale)
+
+
+if __name__ == "__main__":
+    main()
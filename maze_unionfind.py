@@ -0,0 +1,120 @@
+import re
+from array import array
+from maze_grid import PATH, index_array
+
+# Connectivity of a grid's open cells as a disjoint-set forest, kept up to date
+# while a maze is carved and while walls are opened, so "is the end reachable"
+# is two find() calls instead of a search. A union-find cannot split a set, so
+# walling an open cell leaves the structure out of date (see is_current);
+# callers then rebuild it with label() or fall back to searching.
+
+OPEN_RUN = re.compile(re.escape(bytes([PATH])) + b"+")  # A run of open cells
+
+
+class DisjointSet:
+    # Union-find over the linear cell indices of a Grid, in one index array:
+    # a negative entry marks a root and holds minus its set size, any other
+    # entry is the parent's index. find() compresses the paths it walks.
+    def __init__(self, grid):
+        self.grid = grid
+        self.parent = index_array(grid.rows * grid.cols)
+        self.version = getattr(grid, "version", 0)
+
+    def find(self, index):
+        parent = self.parent
+        root = index
+        while parent[root] >= 0:
+            root = parent[root]
+        while index != root:
+            parent[index], index = root, parent[index]
+        return root
+
+    def union(self, a, b):
+        # Merge the sets of a and b (smaller under larger); returns the root
+        parent = self.parent
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if parent[a] > parent[b]:
+            a, b = b, a
+        parent[a] += parent[b]
+        parent[b] = a
+        return a
+
+    def size(self, index):
+        # Cells in the set of index
+        return -self.parent[self.find(index)]
+
+    def open_cell(self, index):
+        # Join a newly opened cell with its open neighbors
+        grid = self.grid
+        cells, rows, cols = grid.cells, grid.rows, grid.cols
+        row, col = divmod(index, cols)
+        for neighbor, inside in ((index + 1, col + 1 < cols), (index + cols, row + 1 < rows),
+                                 (index - 1, col > 0), (index - cols, row > 0)):
+            if inside and cells[neighbor] == PATH:
+                self.union(index, neighbor)
+
+    def connected(self, start, goal):
+        # Same answer as maze_search.connected: a walled start may still step
+        # onto an open neighbor, a walled goal is never reached
+        cells = self.grid.cells
+        if start == goal:
+            return True
+        if cells[goal] != PATH:
+            return False
+        root = self.find(goal)
+        if cells[start] == PATH:
+            return self.find(start) == root
+        grid = self.grid
+        row, col = divmod(start, grid.cols)
+        for neighbor, inside in ((start + 1, col + 1 < grid.cols), (start + grid.cols, row + 1 < grid.rows),
+                                 (start - 1, col > 0), (start - grid.cols, row > 0)):
+            if inside and cells[neighbor] == PATH and self.find(neighbor) == root:
+                return True
+        return False
+
+    def mark_current(self):
+        # Record that the sets describe the grid as it is now
+        self.version = getattr(self.grid, "version", 0)
+
+    def is_current(self, grid):
+        return grid is self.grid and getattr(grid, "version", 0) == self.version
+
+
+def label(grid):
+    # Disjoint sets of all the grid's open cells in one pass over the rows. Each
+    # horizontal run of open cells becomes a set rooted at its first cell in one
+    # slice assignment, then is joined (union by size, finds inlined) with each
+    # run it touches in the row above, so the work is per run, not per cell.
+    sets = DisjointSet(grid)
+    parent = sets.parent
+    cells, rows, cols = grid.cells, grid.rows, grid.cols
+    typecode = parent.typecode
+    runs = OPEN_RUN.finditer
+    for row in range(rows):
+        base = row * cols
+        for run in runs(cells, base, base + cols):
+            first, end = run.span()
+            parent[first] = first - end
+            if end - first > 1:
+                parent[first + 1:end] = array(typecode, [first]) * (end - first - 1)
+                touching = [above.start() for above in runs(cells, first - cols, end - cols)] if row else ()
+            elif row and cells[first - cols] == PATH:
+                touching = (first - cols,)
+            else:
+                continue
+            root = first
+            for above in touching:
+                while parent[root] >= 0:
+                    root = parent[root]
+                while parent[above] >= 0:
+                    above = parent[above]
+                if above == root:
+                    continue
+                if parent[root] > parent[above]:
+                    root, above = above, root
+                parent[root] += parent[above]
+                parent[above] = root
+    sets.mark_current()
+    return sets
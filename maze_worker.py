@@ -0,0 +1,88 @@
+import queue
+import threading
+import time
+from maze_search import SearchCancelled
+
+# Solving off the UI thread. SolveWorker runs one of a MazeModel's solvers in a
+# daemon thread, on a copy of the model that shares the grid (the grid must not
+# change until the worker is done), and publishes its progress on a queue as
+# batched deltas:
+#   ("visited", cells, back_cells)  cells expanded since the last batch
+#   ("done", model)                 the finished copy: path, stats, time, ...
+#   ("error", exception)            the solver raised; poll() raises it again
+# The UI drains the queue at its own frame rate, so a slow frame no longer
+# slows the search and a long search no longer freezes the window. cancel()
+# is seen every 256 expansions and, through the copy's cancelled event, inside
+# the phases that expand nothing (junction graph, routing distance matrix).
+
+
+class SolveWorker:
+    # One background solve; start() it, poll() it every frame, cancel() to stop
+    def __init__(self, model, algorithm=None, batch_size=4096, batch_seconds=1 / 120):
+        self.model = model.search_copy()
+        self.algorithm = algorithm or model.algorithm
+        self.batch_size = batch_size         # Cells per batch at most
+        self.batch_seconds = batch_seconds   # Longest a found cell waits to be published
+        self.progress = queue.SimpleQueue()
+        self.cancelled = threading.Event()
+        self.model.cancelled = self.cancelled
+        self.finished = False        # Set by poll() once the "done" message has been read
+        self.thread = threading.Thread(target=self.run, name="maze-solver", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        try:
+            self.search()
+        except SearchCancelled:
+            pass
+        except Exception as error:
+            self.progress.put(("error", error))
+
+    def search(self):
+        model = self.model
+        put = self.progress.put
+        clock = time.perf_counter
+        cells, back_cells = [], []
+        visited_back = model.visited_back
+        start_time = clock()
+        flush_at = start_time + self.batch_seconds
+        for cell in getattr(model, self.algorithm)():
+            model.iterations += 1
+            (back_cells if cell in visited_back else cells).append(cell)
+            # Clock and cancel checks are amortized over 256 expansions
+            if model.iterations & 255 == 0:
+                if self.cancelled.is_set():
+                    return
+                if len(cells) + len(back_cells) >= self.batch_size or clock() >= flush_at:
+                    put(("visited", cells, back_cells))
+                    cells, back_cells = [], []
+                    flush_at = clock() + self.batch_seconds
+        model.time = clock() - start_time
+        if cells or back_cells:
+            put(("visited", cells, back_cells))
+        put(("done", model))
+
+    def poll(self):
+        # Messages published since the last poll, without waiting
+        messages = []
+        while True:
+            try:
+                message = self.progress.get_nowait()
+            except queue.Empty:
+                return messages
+            if message[0] == "error":
+                raise message[1]
+            if message[0] == "done":
+                self.finished = True
+            messages.append(message)
+
+    def cancel(self, timeout=1.0):
+        # Ask the solver to stop and wait for the thread (at most timeout
+        # seconds, None for as long as it takes); True once it has stopped
+        self.cancelled.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+        return not self.thread.is_alive()
@@ -0,0 +1,26 @@
+import json
+import maze_batch
+
+TIMINGS = ("generate_seconds", "solve_seconds", "worker_peak_rss_kb")
+
+def strip_timings(record):
+    return {key: value for key, value in record.items() if key not in TIMINGS}
+
+def test_parse_seeds_and_jobs():
+    assert maze_batch.parse_seeds(["3", "5-7"]) == [3, 5, 6, 7]
+    assert maze_batch.make_jobs([11, 21], [0.0], [1, 2]) == [(11, 0.0, 1), (11, 0.0, 2), (21, 0.0, 1), (21, 0.0, 2)]
+
+def test_results_do_not_depend_on_workers():
+    jobs = maze_batch.make_jobs([15, 31], [0.0, 0.2], range(4))
+    serial = [strip_timings(r) for r in maze_batch.run_batch(jobs, workers=1)]
+    parallel = [strip_timings(r) for r in maze_batch.run_batch(jobs, workers=2, chunksize=3)]
+    assert serial == parallel
+    assert [(r["size"], r["density"], r["seed"]) for r in serial] == jobs
+    assert all(r["path_length"] > 0 for r in serial)
+
+def test_main_writes_jsonl(tmp_path):
+    out = tmp_path / "results.jsonl"
+    maze_batch.main(["--sizes", "21", "--seeds", "0-2", "--workers", "1", "--trace-memory", "-o", str(out)])
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["seed"] for r in records] == [0, 1, 2]
+    assert all(r["peak_traced_bytes"] > 0 for r in records)
@@ -0,0 +1,44 @@
+import json
+import maze_bench
+from maze_model import MazeModel
+
+def test_corpus_generators():
+    model = MazeModel()
+    maze_bench.generate(model, "generate_unsolvable_maze", 21, 0.0, 3)
+    assert not model.check_solvable()
+    maze_bench.generate(model, "generate_blocked_maze", 10, 0.0, 0)
+    assert model.maze.cells.count(0) == 2 and not model.check_solvable()
+    maze_bench.generate(model, "generate_worst_case_maze", 21, 0.0, 0)
+    assert model.end == (10, 10) and model.check_solvable()
+
+def test_suite_reports_every_case(tmp_path):
+    results = maze_bench.run_suite(maze_bench.QUICK_SUITE[:2], ("a_star", "bidirectional"), warmup=0, repeats=1)
+    assert set(results) == {"random/a_star", "random/bidirectional",
+                            "random-large/a_star", "random-large/bidirectional"}
+    for result in results.values():
+        assert result["throughput"] > 0 and result["generate_seconds"] > 0
+    assert results["random/a_star"]["path_cells"] == results["random/bidirectional"]["path_cells"]
+    path = tmp_path / "baseline.json"
+    maze_bench.save_baseline(path, results)
+    assert maze_bench.load_baseline(path) == json.loads(json.dumps(results))
+
+def test_compare_flags_throughput_drops():
+    baseline = {"a": {"throughput": 100.0}, "b": {"throughput": 100.0}}
+    results = {"a": {"throughput": 95.0}, "b": {"throughput": 80.0}, "new": {"throughput": 1.0}}
+    assert maze_bench.compare(results, baseline, threshold=0.1) == [("b", 100.0, 80.0)]
+    assert maze_bench.compare(results, baseline, threshold=0.25) == []
+
+def test_suite_main_exit_status(tmp_path):
+    path = tmp_path / "baseline.json"
+    args = ["suite", "--quick", "--repeats", "1", "--algorithms", "a_star"]
+    assert maze_bench.main(args + ["--save-baseline", str(path)]) == 0
+    baseline = json.loads(path.read_text())
+    for result in baseline["results"].values():
+        result["throughput"] *= 1000
+    path.write_text(json.dumps(baseline))
+    assert maze_bench.main(args + ["--baseline", str(path)]) == 1
+
+def test_routing_bench_checks_distances():
+    results = maze_bench.bench_routing(size=41, checkpoints=4, trials=2)
+    assert [seed for seed, *_ in results] == [0, 1]
+    assert all(length > 0 for *_, length in results)
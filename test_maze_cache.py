@@ -0,0 +1,100 @@
+import maze_bench
+import maze_cache
+from maze_model import MazeModel
+
+def solved_model(seed, algorithm="a_star"):
+    model = MazeModel()
+    model.generate_maze(31, 41, 0.1, seed=seed)
+    model.instrument = True
+    model.cache = maze_cache.SolutionCache()
+    model.solve(algorithm)
+    return model
+
+def test_cached_solve_replays_result():
+    for algorithm in ("a_star", "bidirectional", "lifelong"):
+        model = solved_model(1, algorithm)
+        path, visited, back = model.path, model.visited, model.visited_back
+        iterations, stats = model.iterations, model.stats
+        assert stats.cache is None and model.cache.misses == 1
+        model.solve(algorithm)
+        assert model.cache.hits == 1
+        assert (model.path, model.visited, model.visited_back) == (path, visited, back)
+        assert model.iterations == iterations
+        assert model.stats.cache == "memory" and model.stats.pushes == stats.pushes
+        assert model.stats.phases == stats.phases
+
+def test_key_follows_maze_contents():
+    model = solved_model(2)
+    other = MazeModel()
+    other.generate_maze(31, 41, 0.1, seed=2)  # Same maze built again
+    other.cache = model.cache
+    other.solve()
+    assert model.cache.hits == 1 and other.path == model.path
+    other.solve("jump_point_search")
+    other.toggle_wall(other.path[len(other.path) // 2])
+    other.solve()
+    assert model.cache.hits == 1 and model.cache.misses == 3
+
+def test_unsolvable_and_trivial_entries():
+    model = MazeModel()
+    model.cache = maze_cache.SolutionCache()
+    maze_bench.generate(model, "generate_blocked_maze", 10, 0.0, 0)
+    assert model.solve() == [] and model.solve() == []
+    assert model.cache.hits == 1
+    model.end = model.start
+    assert model.solve() == [model.start] and model.solve() == [model.start]
+
+def test_lru_evicts_by_bytes():
+    model = solved_model(3)
+    entry = next(iter(model.cache.entries.values()))
+    cache = maze_cache.SolutionCache(max_bytes=2 * len(entry) + 10)
+    model.cache = cache
+    for seed in range(4):
+        model.generate_maze(31, 41, 0.1, seed=seed)
+        model.solve()
+    assert len(cache) == 2 and cache.evictions == 2 and cache.bytes <= cache.max_bytes
+    model.generate_maze(31, 41, 0.1, seed=0)
+    model.solve()
+    assert cache.hits == 0 and cache.misses == 5
+
+def test_disk_tier(tmp_path):
+    model = solved_model(4)
+    path = model.path
+    model.cache = maze_cache.SolutionCache(directory=tmp_path)
+    model.solve()
+    model.cache = maze_cache.SolutionCache(directory=tmp_path)  # A fresh process, in effect
+    model.solve()
+    assert model.cache.disk_hits == 1 and model.stats.cache == "disk" and model.path == path
+    model.solve()
+    assert model.cache.hits == 1 and model.stats.cache == "memory"
+
+def test_cached_route_replays_visiting_order(tmp_path):
+    model = MazeModel()
+    model.generate_maze(41, 41, 0.1, seed=6)
+    model.checkpoints = [(1, 29), (35, 3), (19, 19)]
+    model.cache = maze_cache.SolutionCache(directory=tmp_path)
+    path = model.solve("multi_goal")
+    route = model.route
+    assert len(route) == 5 and model.cache.misses == 1
+    model.solve("multi_goal")
+    assert model.cache.hits == 1 and (model.path, model.route) == (path, route)
+    model.cache = maze_cache.SolutionCache(directory=tmp_path)
+    model.solve("multi_goal")
+    assert model.cache.disk_hits == 1 and model.route == route
+
+def test_old_disk_entries_are_misses(tmp_path):
+    model = solved_model(5)
+    model.cache = maze_cache.SolutionCache(directory=tmp_path)
+    model.solve()
+    (entry,) = tmp_path.iterdir()
+    entry.write_bytes(b"MZSC" + entry.read_bytes()[4:])
+    model.cache = maze_cache.SolutionCache(directory=tmp_path)
+    model.solve()
+    assert model.cache.disk_hits == 0 and model.cache.misses == 1 and model.iterations > 0
+
+def test_suite_times_cached_replay():
+    cache = maze_cache.SolutionCache()
+    results = maze_bench.run_suite(maze_bench.QUICK_SUITE[:1], ("a_star",), warmup=0, repeats=2, cache=cache)
+    result = results["random/a_star"]
+    assert result["cache_hits"] >= 2 * result["mazes"]  # best_time loops short solves
+    assert 0 < result["cached_seconds"]
@@ -0,0 +1,43 @@
+import random
+import maze_search
+from maze_distance import DistanceField
+from maze_grid import Grid, PATH
+from maze_model import MazeModel
+from test_maze_search import random_mazes, check_path
+
+def test_field_paths_match_astar():
+    for grid, start, goal in random_mazes(20):
+        field = DistanceField(grid, goal)
+        rng = random.Random(goal)
+        starts = [start] + [rng.randrange(len(grid.cells)) for _ in range(10)]
+        batch = field.paths(starts)
+        for s, path in zip(starts, batch):
+            expected = maze_search.AStarSearch(grid, s, goal).run()
+            assert field.distance(s) == (len(expected) - 1 if expected else -1)
+            if expected:
+                check_path(grid, path, s, goal)
+                check_path(grid, field.path(s), s, goal)
+                assert len(path) == len(field.path(s)) == len(expected)
+            else:
+                assert path is None
+
+def test_field_unreachable_goal():
+    grid = Grid.from_rows([[0, 1, 0], [1, 1, 0], [0, 0, 0]])
+    field = DistanceField(grid, 0)
+    assert field.distances([0, 8, 2]) == [0, -1, -1]
+    assert field.path(8) is None and field.path(0) == [0]
+
+def test_model_field_invalidated_by_edits():
+    model = MazeModel()
+    model.generate_maze(21, 21, 0.0, seed=9)
+    path = model.path_from(model.start)
+    assert path == model.solve()
+    field = model.goal_field()
+    assert model.goal_field() is field
+    # Wall off a cell of the (unique, loop-free) path: the end becomes unreachable
+    r, c = path[len(path) // 2]
+    model.maze.set(r, c, 1)
+    assert model.goal_field() is not field
+    assert model.path_from(model.start) == [] and model.distances_from([model.start]) == [-1]
+    model.maze.set(r, c, PATH)
+    assert model.paths_from([model.start, model.end]) == [path, [model.end]]
@@ -0,0 +1,57 @@
+import random
+import maze_dstar
+import maze_search
+from maze_model import MazeModel
+from test_maze_search import random_mazes, check_path
+
+def test_repairs_match_astar_after_edits():
+    for grid, start, goal in random_mazes(20):
+        rng = random.Random(goal)
+        planner = maze_dstar.LifelongPlanner(grid, start, goal)
+        for _ in range(15):
+            path = planner.run()
+            expected = maze_search.AStarSearch(grid, start, goal).run()
+            assert (path is None) == (expected is None)
+            if path:
+                check_path(grid, path, start, goal)
+                assert len(path) == len(expected)
+            index = rng.randrange(len(grid.cells))
+            r, c = divmod(index, grid.cols)
+            grid.set(r, c, 1 - grid.cells[index])
+            planner.update_cell(index)
+
+def test_repair_does_less_work_than_full_solve():
+    model = MazeModel()
+    model.generate_maze(61, 61, 0.3, seed=4)
+    model.solve("lifelong")
+    first = model.iterations
+    # Open a wall next to the path: only the cells around it need repairs
+    rows, cols = model.maze.rows, model.maze.cols
+    cell = next((r + dr, c + dc) for r, c in model.path[len(model.path) // 2:]
+                for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0))
+                if 0 <= r + dr < rows and 0 <= c + dc < cols and model.maze.get(r + dr, c + dc) == 1)
+    assert model.toggle_wall(cell)
+    path = model.replan()
+    repaired, full = model.replan_work
+    assert full == first  # The baseline is the planner's first search, not a new solve
+    assert repaired < full
+    assert repaired == len(model.repaired)
+    assert len(path) == len(maze_search.AStarSearch(model.maze, 0, model.maze.index(model.end)).run())
+
+def test_toggle_wall_keeps_start_and_end():
+    model = MazeModel()
+    model.generate_maze(11, 11, seed=1)
+    assert not model.toggle_wall(model.start) and not model.toggle_wall(model.end)
+    model.replan()  # No planner yet: a full search
+    assert model.repaired and model.path[0] == model.start
+
+def test_planner_stats():
+    from maze_search import SearchStats
+    grid, start, goal = next(random_mazes(1))
+    stats = SearchStats()
+    planner = maze_dstar.LifelongPlanner(grid, start, goal, stats)
+    planner.run()
+    assert stats.expanded == planner.expanded
+    assert stats.pops >= stats.expanded + stats.stale_pops  # Re-keyed entries are popped too
+    assert stats.pushes >= stats.pops and stats.neighbor_checks > stats.expanded
+    assert set(stats.phases) == {"setup", "search", "trace"}
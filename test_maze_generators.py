@@ -0,0 +1,66 @@
+import io
+import maze_generators
+import maze_search
+from maze_grid import PATH
+from maze_model import MazeModel
+
+def count_edges(grid):
+    # Number of open cell pairs that touch horizontally or vertically
+    cells, cols = grid.cells, grid.cols
+    edges = 0
+    for i in range(len(cells)):
+        if cells[i] == PATH:
+            if (i + 1) % cols and cells[i + 1] == PATH:
+                edges += 1
+            if i + cols < len(cells) and cells[i + cols] == PATH:
+                edges += 1
+    return edges
+
+def test_eller_is_a_connected_perfect_maze():
+    for seed in range(30):
+        grid = maze_generators.eller_grid(5 + seed, 31 - seed, seed=seed)
+        assert maze_search.connected(grid, 0, len(grid.cells) - 1)
+        # A spanning tree over the open cells: one fewer edge than cells
+        assert count_edges(grid) == grid.cells.count(PATH) - 1
+
+def test_eller_loops_and_determinism():
+    a = maze_generators.eller_grid(41, 41, loop_chance=0.5, seed=3)
+    b = maze_generators.eller_grid(41, 41, loop_chance=0.5, seed=3)
+    assert a == b
+    assert count_edges(a) > a.cells.count(PATH) - 1
+
+def test_eller_streams_rows_to_a_sink():
+    sink = io.BytesIO()
+    rows, cols = maze_generators.write_eller(sink, 20, 30, seed=9)
+    assert (rows, cols) == (21, 31)
+    assert sink.getvalue() == bytes(maze_generators.eller_grid(20, 30, seed=9).cells)
+    assert all(len(row) == 31 for row in maze_generators.eller_rows(20, 30, seed=9))
+
+def test_model_generate_eller_maze():
+    model = MazeModel()
+    model.generate_eller_maze(30, 30, seed=1)
+    assert model.end == (30, 30)
+    assert model.check_solvable()
+    assert model.solve()[-1] == model.end
+
+def test_tiled_is_a_connected_perfect_maze():
+    # The last four are a single tile column wide: every border is horizontal
+    cases = [(41, 41, 8), (40, 63, 5), (21, 21, 64), (101, 37, 7), (41, 5, 3), (301, 101, 64), (16, 7, 5), (32, 5, 3)]
+    for seed, (rows, cols, tile) in enumerate(cases):
+        grid = maze_generators.tiled_grid(rows, cols, seed=seed, tile=tile)
+        assert maze_search.connected(grid, 0, len(grid.cells) - 1)
+        assert count_edges(grid) == grid.cells.count(PATH) - 1
+
+def test_tiled_is_identical_on_any_number_of_workers():
+    single = maze_generators.tiled_grid(201, 201, 0.1, seed=9, tile=16, workers=1)
+    assert maze_generators.tiled_grid(201, 201, 0.1, seed=9, tile=16, workers=3) == single
+    assert maze_generators.tiled_grid(201, 201, 0.1, seed=10, tile=16, workers=1) != single
+    # A tile depends only on (seed, tile number)
+    assert maze_generators.tile_seed(9, 4) == maze_generators.tile_seed(9, 4) != maze_generators.tile_seed(9, 5)
+
+def test_model_generate_tiled_maze():
+    model = MazeModel()
+    model.generate_tiled_maze(60, 60, 0.1, seed=4, tile=8, workers=1)
+    assert model.end == (60, 60)
+    assert model.check_solvable()
+    assert model.solve()[-1] == model.end
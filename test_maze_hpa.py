@@ -0,0 +1,49 @@
+import random
+import maze_hpa
+import maze_search
+from maze_model import MazeModel
+from test_maze_search import random_mazes, check_path
+
+def test_paths_valid_and_near_shortest():
+    rng = random.Random(1)
+    longer = total = 0
+    for grid, start, goal in random_mazes(30):
+        hierarchy = maze_hpa.HierarchicalMap(grid, rng.choice([4, 8, 16]))
+        for _ in range(10):
+            s, g = rng.randrange(len(grid.cells)), rng.randrange(len(grid.cells))
+            path = hierarchy.path(s, g)
+            expected = maze_search.AStarSearch(grid, s, g).run()
+            assert (path is None) == (expected is None)
+            if path:
+                check_path(grid, path, s, g)
+                total += 1
+                longer += len(path) > len(expected)
+    assert longer < total // 10
+
+def test_update_matches_rebuild():
+    model = MazeModel()
+    model.generate_maze(41, 53, 0.2, seed=6)
+    hierarchy = maze_hpa.HierarchicalMap(model.maze, 8)
+    rng = random.Random(6)
+    for _ in range(30):
+        index = rng.randrange(len(model.maze.cells))
+        r, c = divmod(index, model.maze.cols)
+        model.maze.set(r, c, 1 - model.maze.cells[index])
+        hierarchy.update_cell(index)
+    fresh = maze_hpa.HierarchicalMap(model.maze, 8)
+    assert (hierarchy.nodes, hierarchy.links, hierarchy.edges) == (fresh.nodes, fresh.links, fresh.edges)
+    assert hierarchy.is_current(model.maze)
+
+def test_model_patches_hierarchy_on_set_cell():
+    model = MazeModel()
+    model.generate_maze(61, 61, 0.0, seed=2)
+    path = model.hierarchical_path(cluster=16)
+    assert path == model.solve()
+    hierarchy = model.hierarchy
+    r, c = path[len(path) // 2]
+    model.set_cell(r, c, 1)
+    assert model.hierarchical_path(cluster=16) == []
+    assert model.hierarchy is hierarchy
+    model.maze.set(r, c, 0)  # Behind the model's back: rebuilt on the next query
+    assert model.hierarchical_path(cluster=16) == path
+    assert model.hierarchy is not hierarchy
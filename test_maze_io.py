@@ -0,0 +1,97 @@
+import random
+import maze_io
+import maze_generators
+import maze_search
+from maze_grid import Grid
+from maze_model import MazeModel
+
+def test_pack_bits_round_trip():
+    for count in (0, 1, 7, 8, 9, 100):
+        cells = bytearray(random.getrandbits(1) for _ in range(count))
+        packed = maze_io.pack_bits(cells)
+        assert len(packed) == (count + 7) // 8
+        assert maze_io.unpack_bits(packed, count) == cells
+
+def test_packed_grid_reads_like_grid(tmp_path):
+    model = MazeModel()
+    model.generate_maze(23, 37, 0.2)
+    path = tmp_path / "maze.maz"
+    maze_io.save_packed(path, model.maze)
+    assert path.stat().st_size == maze_io.DATA_OFFSET + 23 * 5
+    with maze_io.PackedGrid(path) as packed:
+        assert (packed.rows, packed.cols, packed.end) == (23, 37, 23 * 37 - 1)
+        assert packed.to_grid() == model.maze
+        assert list(packed[5]) == list(model.maze[5])
+        assert all(packed.cells[i] == model.maze.cells[i] for i in range(23 * 37))
+
+def test_tiled_search_matches_astar(tmp_path):
+    for seed in range(10):
+        random.seed(seed)
+        model = MazeModel()
+        model.generate_maze(41, 41, random.choice([0.0, 0.3]))
+        path = tmp_path / f"maze{seed}.maz"
+        maze_io.save_packed(path, model.maze)
+        with maze_io.PackedGrid(path) as packed:
+            goal = random.randrange(41 * 41)
+            # A tiny buffer forces the frontier to spill to disk
+            search = maze_io.TiledSearch(packed, 0, goal, tile=8, buffer_cells=4)
+            result = search.run()
+            expected = maze_search.AStarSearch(model.maze, 0, goal).run()
+            assert (len(result) if result else 0) == (len(expected) if expected else 0)
+
+def test_tiled_search_spills_frontier():
+    grid = Grid(60, 60, 0)
+    search = maze_io.TiledSearch(grid, 0, 60 * 60 - 1, tile=16, buffer_cells=8)
+    assert len(search.run()) == 119
+    assert search.spilled > 0
+
+def test_tiled_search_spills_64_bit_indices(monkeypatch):
+    # Grids of 2**32 cells or more keep frontier indices as 'Q'; force that
+    # typecode on a small grid so spilled blocks are read back at 8 bytes each
+    monkeypatch.setattr(maze_io, "index_typecode", lambda size: 'Q')
+    grid = Grid(60, 60, 0)
+    search = maze_io.TiledSearch(grid, 0, 60 * 60 - 1, tile=16, buffer_cells=8)
+    assert len(search.run()) == 119
+    assert search.spilled > 0
+
+def test_model_solves_mapped_maze(tmp_path):
+    path = tmp_path / "eller.maz"
+    maze_io.write_packed_rows(path, maze_generators.eller_rows(51, 81, seed=2), 51, 81)
+    model = MazeModel()
+    model.open_mapped(path)
+    assert model.end == (50, 80)
+    assert model.check_solvable()
+    expected = maze_search.AStarSearch(model.maze.to_grid(), 0, model.maze.end).run()
+    assert len(model.solve()) == len(expected)
+    assert model.iterations > 0 and not model.visited
+    model.maze.close()
+
+def test_save_load_round_trip(tmp_path):
+    model = MazeModel()
+    model.generate_maze(31, 45, 0.2, seed=11)
+    model.solve("bidirectional")
+    path = tmp_path / "solved.maz"
+    model.save(path)
+    loaded = MazeModel()
+    loaded.load(path)
+    assert loaded.maze == model.maze
+    assert (loaded.start, loaded.end, loaded.seed) == (model.start, model.end, 11)
+    assert loaded.path == model.path
+    assert loaded.visited == model.visited | model.visited_back
+    with maze_io.PackedGrid(path) as packed:
+        assert packed.seed == 11 and packed.to_grid() == model.maze
+
+def test_seed_reproduces_maze():
+    first, second = MazeModel(), MazeModel()
+    first.generate_maze(41, 41, 0.3)
+    second.generate_maze(41, 41, 0.3, seed=first.seed)
+    assert first.maze == second.maze
+
+def test_version_1_files_still_load(tmp_path):
+    model = MazeModel()
+    model.generate_maze(9, 13, seed=4)
+    path = tmp_path / "v1.maz"
+    header = maze_io.HEADER.pack(maze_io.MAGIC, 1, 0, 9, 13, 0, 9 * 13 - 1, 0, 0)
+    path.write_bytes(header.ljust(maze_io.DATA_OFFSET, b"\0") + maze_io.pack_rows(model.maze.cells, 9, 13))
+    saved = maze_io.load_maze(path)
+    assert saved.grid == model.maze and saved.seed is None and saved.solution is None
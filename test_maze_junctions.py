@@ -0,0 +1,57 @@
+import random
+import maze_bench
+import maze_junctions
+import maze_search
+from maze_grid import Grid, WALL
+from maze_model import MazeModel
+from test_maze_search import random_mazes, check_path
+
+def test_matches_astar_path_lengths():
+    for grid, start, goal in random_mazes(30):
+        rng = random.Random(goal)
+        for start in [start] + [rng.randrange(len(grid.cells)) for _ in range(5)]:
+            expected = maze_search.AStarSearch(grid, start, goal).run()
+            path = maze_junctions.JunctionSearch(grid, start, goal).run()
+            if expected:
+                check_path(grid, path, start, goal)
+                assert len(path) == len(expected)
+            else:
+                assert path is None
+
+def test_perfect_maze_folds_to_one_edge():
+    model = MazeModel()
+    model.generate_maze(101, 101, 0.0, seed=1)
+    graph = maze_junctions.JunctionGraph(model.maze, 0, 101 * 101 - 1)
+    # Only the start-to-end route survives pruning, and it is a single corridor
+    assert len(graph.edges) == 2
+    assert graph.pruned + len(model.solve()) == graph.open_cells
+
+def test_loops_keep_fewer_nodes_than_cells():
+    model = MazeModel()
+    model.generate_maze(201, 201, 0.01, seed=2)
+    graph = maze_junctions.JunctionGraph(model.maze, 0, 201 * 201 - 1)
+    assert len(graph.edges) * 10 < graph.open_cells
+
+def test_open_and_blocked_grids():
+    grid = Grid(20, 30, 0)
+    assert len(maze_junctions.JunctionSearch(grid, 0, 599).run()) == 49
+    model = MazeModel()
+    maze_bench.generate(model, "generate_blocked_maze", 10, 0.0, 0)
+    assert maze_junctions.JunctionSearch(model.maze, 0, 99).run() is None
+    grid.set(0, 0, WALL)  # A walled start still steps out
+    assert len(maze_junctions.JunctionSearch(grid, 0, 599).run()) == 49
+
+def test_model_reuses_graph_until_edit():
+    model = MazeModel()
+    model.generate_maze(41, 41, 0.1, seed=3)
+    model.instrument = True
+    path = model.solve("junction_search")
+    graph = model.junctions
+    assert path == [model.maze.cell(i) for i in maze_junctions.JunctionSearch(model.maze, 0, 41 * 41 - 1, graph=graph).run()]
+    assert model.stats.expanded == model.iterations == len(model.visited)
+    model.solve("junction_search")
+    assert model.junctions is graph
+    model.toggle_wall(path[len(path) // 2])
+    model.solve("junction_search")
+    assert model.junctions is not graph
+    assert len(model.path) == len(model.solve("a_star"))
@@ -0,0 +1,83 @@
+import subprocess
+import sys
+import maze_model
+
+def test_model_imports_without_pygame():
+    code = "import sys, maze_model, maze_solver; print('pygame' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+
+def test_generate_and_solve_headless():
+    model = maze_model.MazeModel()
+    model.generate_maze(20, 20)
+    assert (len(model.maze), len(model.maze[0])) == (21, 21)
+    assert model.check_solvable()
+    path = model.solve()
+    assert path[0] == model.start and path[-1] == model.end
+    assert model.iterations > 0
+
+def test_set_difficulty_without_window():
+    import maze_solver
+    game = maze_solver.MazeGame()
+    game.set_difficulty("Easy", 10, 10)
+    assert game.state == "playing"
+    assert game.play_buttons == []
+    game.restart()
+    assert game.state == "playing"
+
+def test_grid_is_one_byte_per_cell():
+    grid = maze_model.Grid(101, 201)
+    assert len(grid.cells) == 101 * 201
+    assert sys.getsizeof(grid) < 101 * 201 + 200
+    grid.set(3, 4, maze_model.PATH)
+    assert grid[3][4] == grid.get(3, 4) == grid.cells[grid.index((3, 4))] == 0
+    assert grid.cell(grid.index((3, 4))) == (3, 4)
+
+def test_grid_rows_are_read_only_views():
+    grid = maze_model.Grid.from_rows([[0, 1], [1, 0]])
+    assert grid.to_rows() == [[0, 1], [1, 0]]
+    assert grid[-1][1] == 0
+    try:
+        grid[0][0] = 1
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("row views must not be writable")
+
+def test_generated_maze_has_only_walls_and_paths():
+    model = maze_model.MazeModel()
+    model.generate_maze(31, 31, 0.3)
+    assert set(model.maze.cells) == {maze_model.WALL, maze_model.PATH}
+
+def test_solve_with_each_algorithm():
+    model = maze_model.MazeModel()
+    model.generate_maze(25, 25, 0.2)
+    lengths = set()
+    for algorithm in maze_model.ALGORITHMS.values():
+        lengths.add(len(model.solve(algorithm)))
+        assert model.iterations == len(model.visited) + len(model.visited_back)
+    assert len(lengths) == 1
+
+def test_solve_advances_within_frame_budget():
+    import maze_solver
+    game = maze_solver.MazeGame()
+    game.set_difficulty("Medium", 20, 20)
+    game.solve_speed = "Slow"
+    game.start_solving()
+    game.worker.thread.join()  # The search runs ahead; Slow still shows one cell per frame
+    game.update()
+    assert game.state == "solving" and game.iterations == 1
+    game.solve_speed = "Instant"
+    game.update()
+    assert game.state == "solved"
+    assert game.path[0] == game.start and game.path[-1] == game.end
+
+def test_back_cancels_background_solve():
+    import maze_solver
+    game = maze_solver.MazeGame()
+    game.set_difficulty("Huge", 300, 300)
+    game.start_solving()
+    worker = game.worker
+    game.back_to_menu()
+    assert not worker.thread.is_alive()
+    assert game.worker is None and game.state == "menu"
@@ -0,0 +1,82 @@
+import itertools
+import random
+import maze_routing
+import maze_search
+from maze_model import MazeModel
+
+def model_with_checkpoints(count, size=51, seed=2):
+    model = MazeModel()
+    model.generate_maze(size, size, 0.1, seed=seed)
+    grid = model.maze
+    open_cells = [grid.cell(index) for index, value in enumerate(grid.cells) if value == 0]
+    model.checkpoints = random.Random(seed).sample(open_cells[1:-1], count)
+    return model
+
+def random_costs(n, seed):
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(n)]
+    return [[abs(a[0] - b[0]) + abs(a[1] - b[1]) for b in points] for a in points]
+
+def brute_force(cost):
+    end = len(cost) - 1
+    return min(maze_routing.route_length(cost, [0, *order, end]) for order in itertools.permutations(range(1, end)))
+
+def test_held_karp_is_exact():
+    for seed in range(5):
+        cost = random_costs(8, seed)
+        length, order = maze_routing.held_karp(cost)
+        assert sorted(order) == list(range(8)) and order[0] == 0 and order[-1] == 7
+        assert abs(length - brute_force(cost)) < 1e-9
+        assert abs(maze_routing.route_length(cost, order) - length) < 1e-9
+
+def test_two_opt_improves_nearest_neighbor():
+    for seed in range(5):
+        cost = random_costs(40, seed)
+        greedy = maze_routing.nearest_neighbor(cost)
+        improved = maze_routing.two_opt(cost, greedy)
+        assert sorted(improved) == list(range(40)) and improved[0] == 0 and improved[-1] == 39
+        assert maze_routing.route_length(cost, improved) <= maze_routing.route_length(cost, greedy)
+
+def test_distance_matrix_matches_a_star():
+    model = model_with_checkpoints(5)
+    grid = model.maze
+    nodes = [grid.index(cell) for cell in [model.start] + model.checkpoints + [model.end]]
+    matrix = maze_routing.distance_matrix(grid, nodes, workers=1)
+    for i, a in enumerate(nodes):
+        for j, b in enumerate(nodes):
+            assert matrix[i][j] == len(maze_search.AStarSearch(grid, a, b).run()) - 1
+    assert maze_routing.distance_matrix(grid, nodes, workers=2) == matrix
+
+def test_multi_goal_visits_every_checkpoint():
+    for count in (0, 3, maze_routing.EXACT_LIMIT + 3):
+        model = model_with_checkpoints(count)
+        path = model.solve("multi_goal")
+        assert path[0] == model.start and path[-1] == model.end
+        assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+        assert set(model.checkpoints) <= set(path)
+        assert model.route[0] == model.start and model.route[-1] == model.end
+        assert sorted(model.route[1:-1]) == sorted(model.checkpoints)
+
+def test_multi_goal_route_is_shortest():
+    model = model_with_checkpoints(6)
+    grid = model.maze
+    nodes = [grid.index(cell) for cell in [model.start] + model.checkpoints + [model.end]]
+    matrix = maze_routing.distance_matrix(grid, nodes)
+    assert len(model.solve("multi_goal")) - 1 == brute_force(matrix)
+
+def test_unreachable_checkpoint_gives_no_route():
+    model = model_with_checkpoints(2)
+    r, c = model.checkpoints[0]
+    for dr, dc in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+        if 0 <= r + dr < model.maze.rows and 0 <= c + dc < model.maze.cols:
+            model.maze.set(r + dr, c + dc, 1)
+    assert model.solve("multi_goal") == [] and model.route == []
+
+def test_checkpoints_are_part_of_the_cache_key():
+    import maze_cache
+    model = model_with_checkpoints(2)
+    model.cache = maze_cache.SolutionCache()
+    model.solve("multi_goal")
+    model.checkpoints.pop()
+    model.solve("multi_goal")
+    assert (model.cache.hits, model.cache.misses) == (0, 2)
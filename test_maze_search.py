@@ -0,0 +1,132 @@
+import random
+from collections import deque
+import maze_search
+from maze_grid import Grid, PATH
+from maze_model import MazeModel
+
+def bfs_distance(grid, start, goal):
+    # Plain BFS reference: number of cells on a shortest path, 0 if unreachable
+    cols = grid.cols
+    dist = {start: 1}
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        if current == goal:
+            return dist[current]
+        r, c = divmod(current, cols)
+        for nr, nc in ((r, c + 1), (r + 1, c), (r, c - 1), (r - 1, c)):
+            nb = nr * cols + nc
+            if 0 <= nr < grid.rows and 0 <= nc < cols and grid.cells[nb] == PATH and nb not in dist:
+                dist[nb] = dist[current] + 1
+                queue.append(nb)
+    return 0
+
+def random_mazes(count=20):
+    model = MazeModel()
+    for seed in range(count):
+        random.seed(seed)
+        model.generate_maze(random.randint(3, 41), random.randint(3, 41), random.choice([0.0, 0.1, 0.3, 0.5]))
+        yield model.maze, model.maze.index(model.start), model.maze.index(model.end)
+
+def check_path(grid, path, start, goal):
+    assert path[0] == start and path[-1] == goal
+    for a, b in zip(path, path[1:]):
+        assert grid.cells[b] == PATH
+        ar, ac = grid.cell(a)
+        br, bc = grid.cell(b)
+        assert abs(ar - br) + abs(ac - bc) == 1
+
+def test_astar_matches_bfs_length():
+    for grid, start, goal in random_mazes():
+        path = maze_search.AStarSearch(grid, start, goal).run()
+        check_path(grid, path, start, goal)
+        assert len(path) == bfs_distance(grid, start, goal)
+
+def test_astar_unreachable_and_trivial():
+    grid = Grid.from_rows([[0, 1, 0], [1, 1, 0], [0, 0, 0]])
+    search = maze_search.AStarSearch(grid, 0, 8)
+    assert search.run() is None
+    assert search.expanded == 1
+    assert maze_search.AStarSearch(grid, 8, 8).run() == [8]
+
+def test_model_a_star_counts_expansions():
+    model = MazeModel()
+    random.seed(3)
+    model.generate_maze(21, 21)
+    path = model.solve()
+    assert model.iterations == len(model.visited)
+    assert len(path) == bfs_distance(model.maze, 0, model.maze.index(model.end))
+
+def test_jps_matches_astar_length():
+    for grid, start, goal in random_mazes(40):
+        astar = maze_search.AStarSearch(grid, start, goal)
+        jps = maze_search.JumpPointSearch(grid, start, goal)
+        path = jps.run()
+        check_path(grid, path, start, goal)
+        assert len(path) == len(astar.run())
+        assert jps.expanded <= astar.expanded
+
+def test_jps_on_open_grid_with_obstacles():
+    random.seed(7)
+    grid = Grid.from_rows([[1 if random.random() < 0.25 else 0 for _ in range(30)] for _ in range(30)])
+    for _ in range(50):
+        start, goal = random.randrange(900), random.randrange(900)
+        if grid.cells[start] or grid.cells[goal]:
+            continue
+        path = maze_search.JumpPointSearch(grid, start, goal).run()
+        expected = bfs_distance(grid, start, goal)
+        assert (len(path) if path else 0) == expected
+
+def test_bidirectional_matches_astar_length():
+    for grid, start, goal in random_mazes(40):
+        path = maze_search.BidirectionalSearch(grid, start, goal).run()
+        check_path(grid, path, start, goal)
+        assert len(path) == len(maze_search.AStarSearch(grid, start, goal).run())
+
+def test_bidirectional_owner_marks_both_sides():
+    grid = Grid(1, 9, 0)
+    search = maze_search.BidirectionalSearch(grid, 0, 8)
+    assert search.run() == list(range(9))
+    assert search.owner[0] == maze_search.FORWARD and search.owner[8] == maze_search.BACKWARD
+
+def test_connected():
+    grid = Grid.from_rows([[0, 0, 1, 0],
+                           [1, 0, 1, 0],
+                           [0, 0, 1, 0]])
+    assert maze_search.connected(grid, 0, 8)
+    assert not maze_search.connected(grid, 0, 11)
+    assert not maze_search.BidirectionalSearch(grid, 0, 11).run()
+    for grid, start, goal in random_mazes(10):
+        assert maze_search.connected(grid, start, goal) == bool(maze_search.AStarSearch(grid, start, goal).run())
+
+def test_search_stats_counters():
+    for grid, start, goal in random_mazes(10):
+        for engine in (maze_search.AStarSearch, maze_search.JumpPointSearch):
+            stats = maze_search.SearchStats()
+            search = engine(grid, start, goal, stats)
+            path = search.run()
+            assert stats.expanded == search.expanded
+            # Every pop is an expansion, a stale entry or the goal
+            assert stats.pops == stats.expanded + stats.stale_pops + 1
+            assert stats.pushes >= stats.pops and stats.peak_frontier >= 1
+            assert stats.neighbor_checks >= stats.expanded
+            assert set(stats.phases) == {"setup", "search", "trace"}
+            assert len(path) == len(engine(grid, start, goal).run())
+
+def test_search_stats_bidirectional_and_memory():
+    grid, start, goal = next(random_mazes(1))
+    stats = maze_search.SearchStats(trace_memory=True)
+    search = maze_search.BidirectionalSearch(grid, start, goal, stats)
+    search.run()
+    assert stats.pops == stats.expanded == search.expanded
+    assert stats.pushes == len(grid.cells) - search.owner.count(0)
+    assert stats.peak_memory > len(grid.cells)
+
+def test_model_stats_only_when_instrumented():
+    model = MazeModel()
+    model.generate_maze(21, 21, seed=5)
+    model.solve()
+    assert model.stats is None
+    model.instrument = True
+    model.solve("jump_point_search")
+    assert model.stats.expanded == model.iterations and model.stats.peak_memory is None
@@ -1,111 +1,77 @@
-import maze_solver
-import time
 import sys
-import matplotlib.pyplot as plt
+import time
 from statistics import mean, stdev
+import maze_solver
+import maze_bench
 
-LOG_FILE = "mazesolver_test_results.txt"
-
-# Temporary maze generation functions for detailed cases
-def generate_best_case_maze(self, rows, cols):
-    maze = [[1 if i == 0 or i == rows-1 or j == 0 or j == cols-1 else 0 
-             for j in range(cols)] for i in range(rows)]
-    self.maze = maze
-    self.start = (0, 0)
-    self.end = (rows-1, cols-1)
-    self.path = []
-    self.visited = set()
-
-def generate_worst_case_maze(self, rows, cols):
-    if rows % 2 == 0: rows += 1
-    if cols % 2 == 0: cols += 1
-    maze = [[1 for _ in range(cols)] for _ in range(rows)]
-    for i in range(min(rows, cols) // 2):
-        for j in range(i, cols - i): maze[i][j] = 0
-        for j in range(i, cols - i): maze[rows-1-i][j] = 0
-        for j in range(i, rows - i): maze[j][i] = 0
-        for j in range(i, rows - i): maze[j][cols-1-i] = 0
-    center_x, center_y = rows // 2, cols // 2
-    maze[center_x][center_y] = 0
-    self.maze = maze
-    self.start = (0, 0)
-    self.end = (center_x, center_y)
-    self.path = []
-    self.visited = set()
-
-def generate_unsolvable_maze(self, rows, cols):
-    self.generate_maze(rows, cols, 0.1)
-    maze = self.maze
-    maze[rows-1][cols-1] = 1
-    self.maze = maze
+# Experiment harness: python test_maze_solver.py [rows,cols ...] runs the
+# experiments on the given sizes and plots them (needs matplotlib); under
+# pytest it runs a small non-interactive smoke version. For timings that are
+# tracked over time use the regression-gated suite: python maze_bench.py suite
 
-def generate_blocked_maze(self, rows, cols):
-    maze = [[1 for _ in range(cols)] for _ in range(rows)]
-    maze[0][0] = 0
-    maze[rows-1][cols-1] = 0
-    self.maze = maze
-    self.start = (0, 0)
-    self.end = (rows-1, cols-1)
-    self.path = []
-    self.visited = set()
+LOG_FILE = "mazesolver_test_results.txt"
 
-setattr(maze_solver.MazeGame, 'generate_best_case_maze', generate_best_case_maze)
-setattr(maze_solver.MazeGame, 'generate_worst_case_maze', generate_worst_case_maze)
-setattr(maze_solver.MazeGame, 'generate_unsolvable_maze', generate_unsolvable_maze)
-setattr(maze_solver.MazeGame, 'generate_blocked_maze', generate_blocked_maze)
+# Hand-built corpora live in maze_bench; attach them to MazeGame for run_experiment
+for name, generator in maze_bench.GENERATORS.items():
+    setattr(maze_solver.MazeGame, name, generator)
 
-def log_results(test_name, size, density, time_taken, iterations, path_length, memory):
-    with open(LOG_FILE, "a") as f:
+def log_results(test_name, size, density, time_taken, iterations, path_length, memory, log_file=LOG_FILE):
+    with open(log_file, "a") as f:
         f.write(f"Test: {test_name}, Size: {size}, Density: {density:.2f}, "
                 f"Time: {time_taken:.3f}s, Iterations: {iterations}, Path Length: {path_length}, "
                 f"Memory: {memory} bytes\n")
 
-def run_experiment(game, rows, cols, density, num_trials=10, gen_func='generate_maze'):
+def run_experiment(game, rows, cols, density, num_trials=10, gen_func='generate_maze', algorithm='a_star',
+                   log_file=LOG_FILE):
+    # Trial i uses seed i, so every run sees the same mazes; only solving is timed
     times, iters, paths, mems = [], [], [], []
-    for _ in range(num_trials):
+    for trial in range(num_trials):
         if gen_func == 'generate_maze':
-            game.generate_maze(rows, cols, extra_wall_percent=density)
+            game.generate_maze(rows, cols, extra_wall_percent=density, seed=trial)
         else:
             getattr(game, gen_func)(rows, cols)
         if gen_func != 'generate_unsolvable_maze' and gen_func != 'generate_blocked_maze' and not game.check_solvable():
             continue  # Skip unsolvable mazes for normal cases
-        game.path = []
-        game.visited = set()
-        game.iterations = 0
-        start_time = time.time()
-        solver = game.a_star()
+        game.reset_search()
+        start_time = time.perf_counter()
+        solver = getattr(game, algorithm)()
         for _ in solver:
             game.iterations += 1
-        time_taken = time.time() - start_time
+        time_taken = time.perf_counter() - start_time
         path_length = len(game.path)
-        memory = sys.getsizeof(game.maze) + sys.getsizeof(game.visited) + sys.getsizeof(game.path)
+        iterations = game.iterations
+        # Memory: the grid plus everything the solver allocated, measured by an
+        # untimed second solve under tracemalloc (no search, and no peak, when
+        # the disjoint sets reject an unsolvable maze up front)
+        game.instrument = game.trace_memory = True
+        game.solve(algorithm)
+        memory = sys.getsizeof(game.maze) + (game.stats.peak_memory or 0)
+        game.instrument = game.trace_memory = False
+        game.iterations = iterations
         times.append(time_taken)
         iters.append(game.iterations)
         paths.append(path_length)
         mems.append(memory)
-        log_results(f"{gen_func} {rows}x{cols} Density {density}", f"{rows}x{cols}", density, 
-                    time_taken, game.iterations, path_length, memory)
+        log_results(f"{gen_func} {algorithm} {rows}x{cols} Density {density}", f"{rows}x{cols}", density, 
+                    time_taken, game.iterations, path_length, memory, log_file)
     return (mean(times) if times else 0, stdev(times) if len(times) > 1 else 0, 
             mean(iters) if iters else 0, mean(paths) if paths else 0, mean(mems) if mems else 0)
 
-def get_custom_sizes():
+def get_custom_sizes(args):
+    # Sizes given as 'rows,cols' arguments (e.g. 10,10); defaults to 10x10
     sizes = []
-    print("Enter maze sizes as 'rows,cols' (e.g., '10,10'). Type 'done' to finish:")
-    while True:
-        user_input = input("> ").strip().lower()
-        if user_input == "done":
-            break
+    for arg in args:
         try:
-            rows, cols = map(int, user_input.split(","))
-            if rows > 0 and cols > 0:
-                sizes.append((rows, cols))
-            else:
-                print("Rows and columns must be positive integers.")
+            rows, cols = map(int, arg.split(","))
         except ValueError:
-            print("Invalid format. Use 'rows,cols' (e.g., '10,10').")
+            raise SystemExit(f"Invalid size {arg!r}. Use 'rows,cols' (e.g., '10,10').")
+        if rows <= 0 or cols <= 0:
+            raise SystemExit("Rows and columns must be positive integers.")
+        sizes.append((rows, cols))
     return sizes if sizes else [(10, 10)]
 
 def plot_size_graphs(results, sizes):
+    import matplotlib.pyplot as plt
     size_labels = [f"{r}x{c}" for r, c in sizes]
     areas = [r[0] for r in results]
     times = [r[1] for r in results]
@@ -143,6 +109,7 @@ def plot_size_graphs(results, sizes):
     plt.close()
 
 def plot_density_graphs(results, rows, cols):
+    import matplotlib.pyplot as plt
     densities = [r[0] for r in results]
     times = [r[1] for r in results]
     errors = [r[2] for r in results]
@@ -176,6 +143,7 @@ def plot_density_graphs(results, rows, cols):
     plt.close()
 
 def plot_detailed_cases(results):
+    import matplotlib.pyplot as plt
     labels = ["Best (10x10)", "Worst (10x10)", "Edge Min (3x3)", "Edge Unsolvable (10x10)", "Edge Blocked (10x10)"]
     times = [r[1] for r in results]
     errors = [r[2] for r in results]
@@ -211,18 +179,18 @@ def plot_detailed_cases(results):
     plt.savefig("detailed_cases_performance.png")
     plt.close()
 
-def test_experiments():
+def experiments(sizes, log_file=LOG_FILE, num_trials=10, plot=True):
+    # Run every experiment and return the detailed-case results
     game = maze_solver.MazeGame()
-    with open(LOG_FILE, "w") as f:
+    with open(log_file, "w") as f:
         f.write("Test Results\n=================\n")
 
     # Experiment 1: Custom Maze Sizes
-    sizes = get_custom_sizes()
     densities = [0.1]
     size_results = []
     print("\nExperiment 1: Varying Maze Size")
     for rows, cols in sizes:
-        avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, rows, cols, densities[0])
+        avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, rows, cols, densities[0], num_trials=num_trials, log_file=log_file)
         size_results.append((rows * cols, avg_time, std_time, avg_iters, avg_path, avg_mem))
         print(f"Size {rows}x{cols}: Time={avg_time:.3f}s (σ={std_time:.3f}), "
               f"Iters={avg_iters:.0f}, Path={avg_path:.0f}, Mem={avg_mem:.0f} bytes")
@@ -233,40 +201,57 @@ def test_experiments():
     rows, cols = sizes[0]
     print(f"\nExperiment 2: Varying Maze Density ({rows}x{cols})")
     for density in densities:
-        avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, rows, cols, density)
+        avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, rows, cols, density, num_trials=num_trials, log_file=log_file)
         density_results.append((density, avg_time, std_time, avg_iters, avg_path, avg_mem))
         print(f"Density {density:.2f}: Time={avg_time:.3f}s (σ={std_time:.3f}), "
               f"Iters={avg_iters:.0f}, Path={avg_path:.0f}, Mem={avg_mem:.0f} bytes")
 
+    # Experiment 3: Compare solvers on the first custom size
+    print(f"\nExperiment 3: Comparing Solvers ({rows}x{cols})")
+    for label, algorithm in maze_solver.ALGORITHMS.items():
+        avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, rows, cols, 0.1, algorithm=algorithm, num_trials=num_trials, log_file=log_file)
+        print(f"{label}: Time={avg_time:.3f}s (σ={std_time:.3f}), "
+              f"Iters={avg_iters:.0f}, Path={avg_path:.0f}, Mem={avg_mem:.0f} bytes")
+
     # New Section: Best, Worst, and Edge Cases
     detailed_results = []
     print("\nDetailed Test Cases: Best, Worst, and Edge Cases")
     # Best Case
-    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 10, 10, 0, gen_func='generate_best_case_maze')
+    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 10, 10, 0, gen_func='generate_best_case_maze', num_trials=num_trials, log_file=log_file)
     detailed_results.append((10 * 10, avg_time, std_time, avg_iters, avg_path, avg_mem))
     print(f"Best Case (10x10, Open): Time={avg_time:.3f}s (σ={std_time:.3f}), Iters={avg_iters:.0f}, Path={avg_path:.0f}, Mem={avg_mem:.0f} bytes")
     # Worst Case
-    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 10, 10, 0, gen_func='generate_worst_case_maze')
+    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 10, 10, 0, gen_func='generate_worst_case_maze', num_trials=num_trials, log_file=log_file)
     detailed_results.append((10 * 10, avg_time, std_time, avg_iters, avg_path, avg_mem))
     print(f"Worst Case (10x10, Spiral): Time={avg_time:.3f}s (σ={std_time:.3f}), Iters={avg_iters:.0f}, Path={avg_path:.0f}, Mem={avg_mem:.0f} bytes")
     # Edge Case: Minimal Size
-    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 3, 3, 0.1)
+    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 3, 3, 0.1, num_trials=num_trials, log_file=log_file)
     detailed_results.append((3 * 3, avg_time, std_time, avg_iters, avg_path, avg_mem))
     print(f"Edge Case (3x3, Min Size): Time={avg_time:.3f}s (σ={std_time:.3f}), Iters={avg_iters:.0f}, Path={avg_path:.0f}, Mem={avg_mem:.0f} bytes")
     # Edge Case: Unsolvable
-    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 10, 10, 0, gen_func='generate_unsolvable_maze')
+    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 10, 10, 0, gen_func='generate_unsolvable_maze', num_trials=num_trials, log_file=log_file)
     detailed_results.append((10 * 10, avg_time, std_time, avg_iters, avg_path, avg_mem))
     print(f"Edge Case (10x10, Unsolvable): Time={avg_time:.3f}s (σ={std_time:.3f}), Iters={avg_iters:.0f}, Path={avg_path:.0f}, Mem={avg_mem:.0f} bytes")
     # Edge Case: Fully Blocked
-    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 10, 10, 0, gen_func='generate_blocked_maze')
+    avg_time, std_time, avg_iters, avg_path, avg_mem = run_experiment(game, 10, 10, 0, gen_func='generate_blocked_maze', num_trials=num_trials, log_file=log_file)
     detailed_results.append((10 * 10, avg_time, std_time, avg_iters, avg_path, avg_mem))
     print(f"Edge Case (10x10, Fully Blocked): Time={avg_time:.3f}s (σ={std_time:.3f}), Iters={avg_iters:.0f}, Path={avg_path:.0f}, Mem={avg_mem:.0f} bytes")
 
     # Generate Graphs
-    plot_size_graphs(size_results, sizes)
-    plot_density_graphs(density_results, rows, cols)
-    plot_detailed_cases(detailed_results)
-    print(f"\nResults logged to {LOG_FILE}")
+    if plot:
+        plot_size_graphs(size_results, sizes)
+        plot_density_graphs(density_results, rows, cols)
+        plot_detailed_cases(detailed_results)
+    print(f"\nResults logged to {log_file}")
+    return detailed_results
+
+def test_experiments(tmp_path):
+    log_file = tmp_path / "results.txt"
+    detailed = experiments([(15, 15)], log_file, num_trials=2, plot=False)
+    best, worst, minimal, unsolvable, blocked = detailed
+    assert worst[4] > 0 and minimal[4] > 0
+    assert unsolvable[4] == blocked[4] == 0
+    assert log_file.read_text().count("Test: ") > 10
 
 if __name__ == "__main__":
-    test_experiments()
\ No newline at end of file
+    experiments(get_custom_sizes(sys.argv[1:]))
\ No newline at end of file
@@ -0,0 +1,70 @@
+import maze_trace
+from maze_model import MazeModel, ALGORITHMS
+
+def recorded(tmp_path, algorithm, seed=3, size=61):
+    model = MazeModel()
+    model.generate_maze(size, size, 0.1, seed=seed)
+    path = maze_trace.record(model, tmp_path / "solve.mzt", algorithm)
+    return model, path, maze_trace.TraceReplay(tmp_path / "solve.mzt")
+
+def cells_in(replay, value):
+    return {divmod(index, replay.cols) for index, state in enumerate(replay.state) if state == value}
+
+def test_varints_round_trip():
+    values = [0, 1, 127, 128, 300, 2**40]
+    assert list(maze_trace.decode_varints(maze_trace.encode_varints(values))) == values
+    assert [maze_trace.zigzag(delta) for delta in (0, -1, 1, -2)] == [0, 1, 2, 3]
+
+def test_trace_replays_each_solver(tmp_path):
+    for algorithm in ALGORITHMS.values():
+        model, path, replay = recorded(tmp_path, algorithm)
+        assert replay.steps == model.iterations and replay.algorithm == algorithm
+        assert replay.grid() == model.maze
+        assert [divmod(index, replay.cols) for index in replay.path] == path
+        replay.seek(replay.steps)
+        assert cells_in(replay, maze_trace.SEEN) == model.visited
+        assert cells_in(replay, maze_trace.SEEN_BACK) == model.visited_back
+
+def test_seek_backwards_restores_earlier_steps(tmp_path):
+    model, path, replay = recorded(tmp_path, "bidirectional", size=101)
+    snapshots = {}
+    for step in (0, 1, replay.steps // 3, replay.steps):
+        replay.seek(step)
+        snapshots[step] = bytes(replay.state)
+    for step in (replay.steps // 3, 1, 0):
+        replay.seek(step)
+        assert bytes(replay.state) == snapshots[step]
+    assert replay.offset == replay.steps_start and replay.index == replay.start
+
+def test_trace_is_compact(tmp_path):
+    model, path, replay = recorded(tmp_path, "a_star", size=201)
+    assert replay.steps_end - replay.steps_start < 3 * replay.steps
+
+def test_frame_draws_path_only_at_the_end(tmp_path):
+    model, path, replay = recorded(tmp_path, "a_star")
+    colors = bytes([0, 1, 2, 3, 4, 5, 6])
+    middle = replay.path[len(replay.path) // 2]
+    replay.seek(replay.steps - 1)
+    assert replay.frame(colors)[middle] != 4
+    replay.seek(replay.steps)
+    frame = replay.frame(colors)
+    assert frame[middle] == 4 and frame[replay.start] == 5 and frame[replay.end] == 6
+
+def test_unsolvable_trace_has_no_path(tmp_path):
+    model = MazeModel()
+    model.generate_maze(21, 21, seed=2)
+    model.maze.set(19, 19, 1)
+    model.maze.set(19, 18, 1)
+    model.maze.set(18, 19, 1)
+    model.end = (19, 19)
+    assert maze_trace.record(model, tmp_path / "none.mzt") == []
+    assert maze_trace.TraceReplay(tmp_path / "none.mzt").path is None
+
+def test_record_rejects_unknown_algorithm(tmp_path):
+    try:
+        maze_trace.main(["record", "--algorithm", "a_stra", "-o", str(tmp_path / "x.mzt")])
+    except SystemExit as exit:
+        assert exit.code == 2  # argparse usage error
+    else:
+        raise AssertionError("an unknown algorithm should be a usage error")
+    assert not (tmp_path / "x.mzt").exists()
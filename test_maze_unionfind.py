@@ -0,0 +1,73 @@
+import random
+import maze_bench
+import maze_search
+from maze_grid import Grid, WALL, PATH
+from maze_model import MazeModel
+from maze_unionfind import DisjointSet, label
+
+def test_generated_sets_match_search():
+    model = MazeModel()
+    for seed in range(40):
+        rng = random.Random(seed)
+        model.generate_maze(rng.randint(3, 41), rng.randint(3, 41), rng.choice([0.0, 0.1, 0.5]), seed=seed)
+        grid, sets = model.maze, model.components
+        assert sets.is_current(grid)
+        assert sets.size(0) == sets.size(len(grid.cells) - 1) == grid.cells.count(PATH)  # One open region
+        for _ in range(20):
+            a, b = rng.randrange(len(grid.cells)), rng.randrange(len(grid.cells))
+            assert sets.connected(a, b) == maze_search.connected(grid, a, b)
+
+def test_label_matches_search():
+    for seed in range(30):
+        rng = random.Random(seed)
+        model = MazeModel()
+        model.generate_maze(rng.randint(3, 41), rng.randint(3, 41), rng.choice([0.0, 0.1, 0.5]), seed=seed)
+        grid = model.maze
+        for _ in range(30):
+            grid.set(*grid.cell(rng.randrange(len(grid.cells))), rng.choice([WALL, PATH]))
+        sets = label(grid)
+        assert sets.is_current(grid)
+        for _ in range(30):
+            a, b = rng.randrange(len(grid.cells)), rng.randrange(len(grid.cells))
+            assert sets.connected(a, b) == maze_search.connected(grid, a, b)
+    assert label(Grid(30, 40, PATH)).size(0) == 1200
+
+def test_union_find_basics():
+    sets = DisjointSet(Grid(1, 6, PATH))
+    assert sets.union(0, 1) == sets.union(2, 1)
+    sets.union(4, 5)
+    assert sets.size(2) == 3 and sets.size(5) == 2
+    assert sets.find(0) == sets.find(2) != sets.find(4)
+    assert sets.parent[2] >= 0 and sets.parent[sets.find(0)] == -3
+
+def test_wall_edits():
+    model = MazeModel()
+    model.generate_maze(31, 31, 0.0, seed=4)
+    sets = model.components
+    cell = model.solve()[10]
+    model.toggle_wall(cell)  # Perfect maze: walling a path cell cuts start from end
+    assert not sets.is_current(model.maze)
+    assert not model.check_solvable() and model.solve() == []
+    model.toggle_wall(cell)
+    assert model.check_solvable()
+    model.components = sets = DisjointSet(model.maze)
+    for index, value in enumerate(model.maze.cells):
+        if value == PATH:
+            sets.open_cell(index)
+    sets.mark_current()
+    wall = model.maze.cells.index(WALL)
+    model.set_cell(*model.maze.cell(wall), WALL)  # Already a wall: sets stay current
+    assert sets.is_current(model.maze)
+    model.set_cell(0, 0, WALL)
+    assert not sets.is_current(model.maze)
+
+def test_solve_rejects_unsolvable_queries():
+    model = MazeModel()
+    model.generate_maze(41, 41, 0.1, seed=5)
+    model.end = model.maze.cell(model.maze.cells.index(WALL, 41 * 20))
+    assert model.unreachable() and not model.check_solvable()
+    assert model.solve() == [] and model.iterations == 0
+    maze_bench.generate(model, "generate_unsolvable_maze", 21, 0.0, 3)
+    assert not model.components.is_current(model.maze)  # Walled after generation
+    assert model.unreachable() and model.components.is_current(model.maze)  # Relabeled on the query
+    assert model.solve() == [] and model.iterations == 0
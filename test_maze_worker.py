@@ -0,0 +1,66 @@
+import time
+from maze_model import MazeModel, ALGORITHMS
+from maze_worker import SolveWorker
+
+def drain(worker):
+    worker.thread.join()
+    return worker.poll()
+
+def test_worker_matches_solve():
+    model = MazeModel()
+    model.generate_maze(41, 41, 0.1, seed=3)
+    for algorithm in ALGORITHMS.values():
+        model.solve(algorithm)
+        expected = (list(model.path), set(model.visited), set(model.visited_back), model.iterations)
+        model.reset_search()
+        messages = drain(SolveWorker(model, algorithm, batch_size=64).start())
+        cells = [cell for kind, *body in messages if kind == "visited" for cell in body[0]]
+        back_cells = [cell for kind, *body in messages if kind == "visited" for cell in body[1]]
+        assert messages[-1][0] == "done"
+        assert model.path == []  # The worker solved a copy
+        model.adopt_search(messages[-1][1])
+        assert (model.path, model.visited, model.visited_back, model.iterations) == expected
+        assert (set(cells), set(back_cells)) == (model.visited, model.visited_back)
+        assert len(cells) + len(back_cells) == model.iterations
+
+def test_worker_batches_progress():
+    model = MazeModel()
+    model.generate_maze(101, 101, 0.1, seed=5)
+    messages = drain(SolveWorker(model, batch_size=256, batch_seconds=60).start())
+    batches = [len(cells) + len(back) for kind, cells, back in messages[:-1]]
+    assert len(batches) > 1 and max(batches) <= 512
+
+def test_worker_cancel_stops_search():
+    model = MazeModel()
+    model.generate_maze(401, 401, 0.1, seed=7)
+    worker = SolveWorker(model).start()
+    worker.cancel()
+    assert not worker.thread.is_alive()
+    assert all(kind == "visited" for kind, *_ in worker.poll())
+
+def test_worker_reraises_solver_errors():
+    model = MazeModel()
+    model.generate_maze(11, 11, seed=1)
+    worker = SolveWorker(model, "no_such_solver").start()
+    worker.thread.join()
+    try:
+        worker.poll()
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("poll() should raise the solver's error")
+
+def test_worker_cancel_stops_route_planning():
+    # Cancelled while the distance matrix is built, before any cell is expanded
+    model = MazeModel()
+    model.generate_maze(601, 601, 0.1, seed=8)
+    open_cells = [model.maze.cell(index) for index, value in enumerate(model.maze.cells) if value == 0]
+    model.checkpoints = open_cells[1000:-1000:len(open_cells) // 40][:30]
+    for workers in (1, 2):
+        model.route_workers = workers
+        worker = SolveWorker(model, "multi_goal").start()
+        time.sleep(0.2)
+        started = time.perf_counter()
+        assert worker.cancel()
+        assert not worker.thread.is_alive() and time.perf_counter() - started < 1
+        assert worker.poll() == []  # No cells, no "done" and no error